@@ -1,12 +1,27 @@
 from __future__ import annotations
 
-from typing import Final
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Final, NamedTuple
 
 from rdetoolkit.errors import catch_exception_with_message
-from rdetoolkit.models.rde2types import RdeInputDirPaths, RdeOutputResourcePath
+from rdetoolkit.models.rde2types import MetaType, RdeInputDirPaths, RdeOutputResourcePath, RepeatedMetaType
 from rdetoolkit.rde2util import Meta
 
+from modules_xrd.cache_handler import CachedResult, ResultCache
 from modules_xrd.factory import XrdFactory
+from modules_xrd.output_naming import OutputNames
+
+
+class FileResult(NamedTuple):
+    """Metadata parsed from one raw file, handed back for merging into metadata.json."""
+
+    processing_file: Path
+    metadata_def: Path
+    const_meta_info: MetaType
+    repeated_meta_info: RepeatedMetaType
+    region_num: int
 
 
 @catch_exception_with_message()
@@ -26,47 +41,308 @@ def dataset(srcpaths: RdeInputDirPaths, resource_paths: RdeOutputResourcePath) -
 
     Note:
         The actual function names and processing details may vary depending on the project.
+        When batch_mode is enabled in rdeconfig.yaml, every supported raw file is processed in this one call.
+        Each file gets its own structured files and images, and the metadata of all regions of all files
+        is saved together in metadata.json in processing order.
+        With max_workers greater than 1, the files are distributed to a pool of worker processes.
+        When cache_dir is set, the outputs of a file already processed with the same settings are restored from the cache.
+        Output names follow the raw file name and region number; output_name_collision decides what happens
+        when two files of the batch produce the same name.
 
     """
-    region_num: int = 1
     # Get config
-    config, processing_file = XrdFactory.get_config(resource_paths, srcpaths.tasksupport)
+    config, processing_files = XrdFactory.get_config(resource_paths, srcpaths.tasksupport)
+    OutputNames.clear()
+
+    modules: dict[Path, XrdFactory] = {}
+    max_workers = min(config['xrd'].get('max_workers') or 1, len(processing_files), os.cpu_count() or 1)
+    if max_workers > 1:
+        results = structure_files_in_parallel(config, processing_files, srcpaths, resource_paths, max_workers=max_workers)
+    else:
+        results = [structure_file(config, processing_file, srcpaths, resource_paths, modules=modules) for processing_file in processing_files]
+
+    metadata_defs: list[Path] = []
+    const_meta_info: MetaType = {}
+    repeated_meta_info: RepeatedMetaType = {}
+    region_total = 0
+    for result in results:
+        if result.metadata_def not in metadata_defs:
+            metadata_defs.append(result.metadata_def)
+        # A constant keeps the value of the first file that has it, as the measured date of the invoice does.
+        for key, value in result.const_meta_info.items():
+            const_meta_info.setdefault(key, value)
+        merge_repeated_meta(repeated_meta_info, result.repeated_meta_info, region_offset=region_total, region_num=result.region_num)
+        region_total += result.region_num
+
+        if result.metadata_def not in modules:
+            # The objects of files structured by workers are created here for the invoice and metadata.json.
+            file_config = XrdFactory.get_file_config(config, result.processing_file, resource_paths)
+            XrdFactory.get_objects(result.processing_file, srcpaths.tasksupport, file_config, modules=modules)
+
+    # Overwrite invoice
+    # (custom/measurement_measured_date)
+    # The dates of all files are collected in processing order and the invoice is written once.
+    invoice_writer = next(iter(modules.values())).invoice_writer
+    for result in results:
+        invoice_writer.add_measured_date(resource_paths, modules[result.metadata_def].file_format, result.const_meta_info, result.repeated_meta_info)
+    invoice_writer.write_invoice(resource_paths)
+
+    # Save Meta
+    # Add the graph scale meta
+    # Read metadata about graph scale from rdeconfig.yaml and add it to the repeating metadata list.
+    if config.get("main_image_setting"):
+        config['main_image_setting'] = [config['main_image_setting'] for _ in range(region_total)]
+        repeated_meta_info.update(config)
+    module = next(iter(modules.values()))
+    module.meta_parser.save_meta(
+        resource_paths.meta.joinpath("metadata.json"),
+        make_meta(metadata_defs),
+        const_meta_info=const_meta_info,
+        repeated_meta_info=repeated_meta_info,
+    )
+
+
+def structure_file(
+    config: dict,
+    processing_file: Path,
+    srcpaths: RdeInputDirPaths,
+    resource_paths: RdeOutputResourcePath,
+    *,
+    modules: dict[Path, XrdFactory],
+) -> FileResult:
+    """Structure one raw file with objects obtained from the factory.
+
+    Args:
+        config (dict): config data.
+        processing_file (Path): processing file.
+        srcpaths (RdeInputDirPaths): Paths to input resources for processing.
+        resource_paths (RdeOutputResourcePath): Paths to output resources for saving results.
+        modules (dict[Path, XrdFactory]): Objects already created in this process, reused across files.
+
+    Returns:
+        FileResult: The metadata parsed from the file.
+
+    """
+    OutputNames.set_owner(processing_file)
+    file_config = XrdFactory.get_file_config(config, processing_file, resource_paths)
     # Get the class to use
-    metadata_def, module = XrdFactory.get_objects(processing_file, srcpaths.tasksupport, config)
+    metadata_def, module = XrdFactory.get_objects(processing_file, srcpaths.tasksupport, file_config, modules=modules)
+
+    # Restore the outputs of an unchanged file from the cache (if cache_dir is set)
+    cache = ResultCache.from_config(file_config)
+    cache_key = cache.make_key(processing_file, metadata_def, file_config) if cache is not None else ""
+    cached = cache.load(cache_key, resource_paths) if cache is not None else None
+    if cached is not None:
+        return FileResult(processing_file, metadata_def, cached.const_meta_info, cached.repeated_meta_info, cached.region_num)
+
+    region_num = process_file(module, resource_paths, processing_file)
+    result = FileResult(
+        processing_file,
+        metadata_def,
+        module.meta_parser.const_meta_info,
+        dict(module.meta_parser.repeated_meta_info),
+        region_num,
+    )
+    if cache is not None:
+        cache.store(cache_key, resource_paths, processing_file, CachedResult(result.const_meta_info, result.repeated_meta_info, result.region_num))
+    return result
+
+
+def structure_files_in_parallel(
+    config: dict,
+    processing_files: list[Path],
+    srcpaths: RdeInputDirPaths,
+    resource_paths: RdeOutputResourcePath,
+    *,
+    max_workers: int,
+) -> list[FileResult]:
+    """Structure raw files in a process pool.
+
+    Files whose outputs may get the same name (see group_by_output_names) are handed to the same worker
+    and processed there in order, so that the outputs are the same as with serial processing.
+    The results are returned in processing order regardless of completion order.
+
+    Args:
+        config (dict): config data.
+        processing_files (list[Path]): processing files in priority order.
+        srcpaths (RdeInputDirPaths): Paths to input resources for processing.
+        resource_paths (RdeOutputResourcePath): Paths to output resources for saving results.
+        max_workers (int): Maximum number of worker processes.
+
+    Returns:
+        list[FileResult]: The metadata parsed from each file.
+
+    """
+    groups = group_by_output_names(processing_files)
+
+    results: dict[Path, FileResult] = {}
+    with ProcessPoolExecutor(max_workers=min(max_workers, len(groups))) as executor:
+        futures = [executor.submit(_structure_file_group, config, files, srcpaths, resource_paths) for files in groups]
+        for future in futures:
+            results.update((result.processing_file, result) for result in future.result())
+    return [results[processing_file] for processing_file in processing_files]
+
+
+def group_by_output_names(processing_files: list[Path]) -> list[list[Path]]:
+    """Group the raw files whose outputs may get the same name.
+
+    Every output of a file is named after its basename, either as is or followed by "_" and a suffix
+    (region number, scale, name of an extracted file). Two files can therefore only write the same name
+    when their basenames are equal or one is the other followed by "_" (sample.ras and sample_1.ras).
+
+    Args:
+        processing_files (list[Path]): processing files in priority order.
+
+    Returns:
+        list[list[Path]]: Groups of files, each in priority order.
 
+    """
+    parents = {processing_file.stem: processing_file.stem for processing_file in processing_files}
+
+    def find(stem: str) -> str:
+        while parents[stem] != stem:
+            stem = parents[stem]
+        return stem
+
+    for stem in parents:
+        for i, char in enumerate(stem):
+            if char == "_" and stem[:i] in parents:
+                parents[find(stem)] = find(stem[:i])
+
+    groups: dict[str, list[Path]] = {}
+    for processing_file in processing_files:
+        groups.setdefault(find(processing_file.stem), []).append(processing_file)
+    return list(groups.values())
+
+
+def _structure_file_group(
+    config: dict,
+    processing_files: list[Path],
+    srcpaths: RdeInputDirPaths,
+    resource_paths: RdeOutputResourcePath,
+) -> list[FileResult]:
+    """Worker entry point: structure files in order with objects owned by this process."""
+    modules: dict[Path, XrdFactory] = {}
+    return [
+        structure_file(config, processing_file, srcpaths, resource_paths, modules=modules)
+        for processing_file in processing_files
+    ]
+
+
+def process_file(
+    module: XrdFactory,
+    resource_paths: RdeOutputResourcePath,
+    processing_file: Path,
+) -> int:
+    """Structure one raw file.
+
+    Save the structured files and the images of the file, and leave its parsed metadata in module.meta_parser.
+    The invoice is updated by dataset() from the metadata of all files.
+    Any number of regions is supported: the outputs of each region get the region number as suffix,
+    and every repeated metadata list holds one value per region.
+    The images and html are saved concurrently with the rest of the processing and are all written when this returns.
+
+    Args:
+        module (XrdFactory): Objects to process the file with.
+        resource_paths (RdeOutputResourcePath): Paths to output resources for saving results.
+        processing_file (Path): processing file.
+
+    Returns:
+        int: Number of regions in the file.
+
+    """
+    region_num: int = 1
     compressd_files: list[str] = []
-    # Read Input File -> Save Meta -> Struct
-    for data, meta in module.file_reader.read(processing_file):
-        region_num = module.file_reader.get_region_number()
+    repeated_meta_info: RepeatedMetaType = {}
+    try:
+        # Read Input File -> Save Meta -> Struct
+        for region_index, (data, meta) in enumerate(module.file_reader.read(processing_file), 1):
+            region_num = module.file_reader.get_region_number()
 
-        # Get meta
-        const_meta, repeat_meta = module.meta_parser.parse(meta)
+            # Get meta
+            # The parser appends the values of each region, so the values of this region are those past the previous lengths.
+            lengths = {key: len(values) for key, values in module.meta_parser.repeated_meta_info.items()}
+            _, repeat_meta = module.meta_parser.parse(meta)
+            merge_repeated_meta(
+                repeated_meta_info,
+                {key: list(values[lengths.get(key, 0):]) for key, values in repeat_meta.items()},
+                region_offset=region_index - 1,
+                region_num=1,
+            )
+
+            # Save csv (and the binary structured file if configured)
+            module.structured_processor.save_csv(resource_paths, processing_file, data, region_num=region_num, region_index=region_index)
+            module.structured_processor.save_binary(resource_paths, processing_file, data, region_num, region_index=region_index)
+
+            # Plot
+            module.graph_plotter.plot_main(data, resource_paths, processing_file, region_num, region_index=region_index)
 
-        # Save csv
-        module.structured_processor.save_csv(resource_paths, processing_file, data, region_num=region_num)
         # Execute save process for structured files, only when a .rasx file is input,
         # as there are other files(xml, txt) compressed.
-        if processing_file.suffix == ".rasx":
+        if module.file_format == ".rasx":
             compressd_files = module.file_reader.get_files_from_rasx(processing_file)
             module.structured_processor.save_structured_contents(resource_paths, processing_file, compressd_files)
+    finally:
+        module.file_reader.close(processing_file)
 
-        # Plot
-        module.graph_plotter.plot_main(data, resource_paths, processing_file, region_num)
-
-        # Overwrite invoice
-        # (custom/measurement_measured_date)
-        module.invoice_writer.overwrite_invoice_measured_date(resource_paths, processing_file.suffix, const_meta, repeat_meta)
-
-    # Save Meta
-    # Add the graph scale meta
-    # Read metadata about graph scale from rdeconfig.yaml and add it to the repeating metadata list.
-    if config.get("main_image_setting"):
-        config['main_image_setting'] = [config['main_image_setting'] for _ in range(region_num)]
-        module.meta_parser.repeated_meta_info.update(config)
-    module.meta_parser.save_meta(resource_paths.meta.joinpath("metadata.json"), Meta(metadata_def))
+    # Keep one value per region in every repeated metadata list, even when a key is missing from some regions
+    module.meta_parser.repeated_meta_info = repeated_meta_info
 
     # Plot
     # Integrated graph image if needed
-    multi_resion_num: Final[int] = 2
-    if region_num == multi_resion_num:
+    single_region_num: Final[int] = 1
+    if region_num > single_region_num:
         module.graph_plotter.multiplot_main(resource_paths, processing_file)
+
+    # Wait for the images and html before the metadata is saved
+    module.graph_plotter.wait()
+
+    return region_num
+
+
+def merge_repeated_meta(
+    merged: RepeatedMetaType,
+    repeated_meta: RepeatedMetaType,
+    *,
+    region_offset: int,
+    region_num: int,
+) -> None:
+    """Append the repeated metadata of one file to the metadata merged so far.
+
+    Every list is padded with empty strings (which Meta.assign_vals skips) so that
+    the n-th element of every key belongs to the same region.
+
+    Args:
+        merged (RepeatedMetaType): Metadata of the files processed so far. Updated in place.
+        repeated_meta (RepeatedMetaType): Metadata of the file.
+        region_offset (int): Number of regions of the files processed so far.
+        region_num (int): Number of regions in the file.
+
+    """
+    for key in [*merged, *(k for k in repeated_meta if k not in merged)]:
+        values = list(merged.get(key, []))
+        values += [""] * (region_offset - len(values))
+        values += repeated_meta.get(key, [])
+        values += [""] * (region_offset + region_num - len(values))
+        merged[key] = values
+
+
+def make_meta(metadata_defs: list[Path]) -> Meta:
+    """Create the Meta object for metadata.json.
+
+    When the processed files use different metadata definition files, their definitions are combined.
+
+    Args:
+        metadata_defs (list[Path]): Metadata definition files in use.
+
+    Returns:
+        Meta: Meta object.
+
+    """
+    metaobj = Meta(metadata_defs[0])
+    for metadata_def in metadata_defs[1:]:
+        other = Meta(metadata_def)
+        metaobj.metaDef.update(other.metaDef)
+        metaobj.referedmap.update(other.referedmap)
+        metaobj.actions.extend(other.actions)
+    return metaobj
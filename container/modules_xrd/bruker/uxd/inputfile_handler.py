@@ -63,8 +63,9 @@ class FileReader(XrdFileReader):
             raise StructuredError(err_msg)
 
         self.region_num = len(self.data.keys())
+        self._remember_region_number(srcpath)
         for data_key, meta_key in zip(self.data, self.meta, strict=False):
-            yield self.convert_dtype(self.data[data_key]), self.meta[meta_key]
+            yield self.data[data_key], self.meta[meta_key]
 
     def convert_dtype(self, dataframe: pd.DataFrame, *, totype: ToDataTypes = ToDataTypes.FLOAT) -> pd.DataFrame:
         """Convert data type.
@@ -81,21 +82,34 @@ class FileReader(XrdFileReader):
             lambda x: self.__helper_convert_string_numeric(x, totype.value),
         )
 
-    def get_region_number(self, *, input_path: Path | None = None) -> int:
-        """Get the number of regions.
+    def count_regions(self, srcpath: Path) -> int:
+        """Count the regions without converting the measured values.
+
+        A uxd file holds one region when it has header lines and at least one data line after _2THETACOUNTS.
 
         Args:
-            input_path (Path | None): Measurement file path.
+            srcpath (Path): Measurement file path.
 
         Returns:
-            int: Number of regions.
+            int: Number of regions (0 or 1).
 
         """
-        if input_path is None:
-            return self.region_num
-        data_meta_mappings = [df_data for df_data, _ in self.read(input_path)]
-        self.region_num = len(data_meta_mappings)
-        return self.region_num
+        has_meta = False
+        with open(srcpath, "rb") as f:
+            for line_org in f:
+                line = line_org.strip()
+                if line.startswith(b";"):
+                    has_meta = True
+                    continue
+                tokens = line.split(b"=", maxsplit=1)
+                if len(tokens) == self.TWO_TOKENS:
+                    has_meta = True
+                    if tokens[0].strip() == b"_2THETACOUNTS":
+                        break
+            else:
+                return 0
+            # Any non-comment line after _2THETACOUNTS is a data line.
+            return int(has_meta and any(not line.strip().startswith(b";") for line in f))
 
     def split_data_meta(self, contents: list[str]) -> tuple[dict[str, pd.DataFrame], dict[str, ExtendMetaType]]:
         """Private method to split the contents into data and metadata blocks.
@@ -109,24 +123,27 @@ class FileReader(XrdFileReader):
 
         """
         meta_lines: dict = {}
-        data_lines: list = []
+        data_lines: list[str] = []
+        data_line_numbers: list[int] = []
         meta_blocks: dict[str, ExtendMetaType] = {}
         data_blocks: dict[str, pd.DataFrame] = {}
         is_header = True
         data_lines_label: list = []
 
-        for line_org in contents:
+        for line_number, line_org in enumerate(contents, 1):
             line = line_org.strip()
             if line.startswith(";"):
                 meta_lines, data_lines_label = self._split_line_with_semicolon(is_header, line, meta_lines, data_lines_label)
             else:
+                if not is_header:
+                    data_line_numbers.append(line_number)
                 is_header, meta_lines, data_lines = self._split_line_normal(is_header, line, meta_lines, data_lines)
 
         if meta_lines:
             meta_blocks["series_meta1"] = meta_lines
         if data_lines and meta_lines:
             column = self._make_header(data_lines_label)
-            data_blocks["series_value1"] = pd.DataFrame(data_lines, columns=column)
+            data_blocks["series_value1"] = pd.DataFrame(self.parse_value_lines(data_lines, data_line_numbers, "\t"), columns=column)
 
         return data_blocks, meta_blocks
 
@@ -178,9 +195,8 @@ class FileReader(XrdFileReader):
             if tokens[0] == "_2THETACOUNTS":
                 is_header = False
         else:
-            tokens = [s.strip() for s in line.split("\t")]
-            # data section
-            data_lines.append(tokens)
+            # data section (converted in bulk by parse_value_lines)
+            data_lines.append(line)
 
         return is_header, meta_lines, data_lines
 
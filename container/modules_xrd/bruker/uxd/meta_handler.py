@@ -1,7 +1,10 @@
 from __future__ import annotations
 
+import os
+import re
 from collections import defaultdict
 from pathlib import Path
+from typing import ClassVar
 
 from rdetoolkit.models.rde2types import MetaType, RepeatedMetaType
 from rdetoolkit.rde2util import Meta
@@ -20,6 +23,9 @@ class MetaParser(XrdMetaParser):
 
     __mode__ = "uxd"
 
+    # Comment-key maps and their prefix patterns, keyed by (absolute path, mtime) of the metadata definition file.
+    _comment_keys: ClassVar[dict[tuple[str, int], tuple[dict[str, str], re.Pattern[str] | None]]] = {}
+
     def __init__(self, *, metadata_def_json_path: Path | None = None, config: dict[str, str | None]):
         super().__init__(metadata_def_json_path=metadata_def_json_path, config=config)
         self.repeated_meta_info: RepeatedMetaType = defaultdict(list)
@@ -42,7 +48,7 @@ class MetaParser(XrdMetaParser):
             error_msg = "Metadata definition file is missing."
             raise ValueError(error_msg)
 
-        meta_key_from_comment = self._get_meta_key_of_comments(self.metadata_def_json_path)
+        meta_key_from_comment, key_prefix_pattern = self._get_comment_keys(self.metadata_def_json_path)
 
         for k, v in data.items():
             if not isinstance(v, str):
@@ -51,11 +57,32 @@ class MetaParser(XrdMetaParser):
             if not k.startswith(";"):
                 key, value = k, v
             else:
-                key, value = self._separate_key_value_from_comment(k, meta_key_from_comment)
+                key, value = self._separate_key_value_from_comment(k, meta_key_from_comment, key_prefix_pattern)
             self.repeated_meta_info[key].append(value)
 
         return self.const_meta_info, self.repeated_meta_info
 
+    def _get_comment_keys(self, metadata_def_json_path: Path) -> tuple[dict[str, str], re.Pattern[str] | None]:
+        """Get the comment-key map of a metadata definition file and the pattern matching its prefixes.
+
+        They are built once per file and reused by later parse calls and files, until the file is modified.
+
+        Args:
+            metadata_def_json_path (Path): Metadata define file path.
+
+        Returns:
+            tuple[dict[str, str], re.Pattern[str] | None]: Comment-key map and prefix pattern (None if there are no comment keys).
+
+        """
+        cache_key = (os.path.abspath(metadata_def_json_path), os.stat(metadata_def_json_path).st_mtime_ns)
+        comment_keys = self._comment_keys.get(cache_key)
+        if comment_keys is None:
+            meta_key_from_comment = self._get_meta_key_of_comments(metadata_def_json_path)
+            # Alternatives are tried in order, so the first prefix in the definition file wins as before.
+            key_prefix_pattern = re.compile("|".join(map(re.escape, meta_key_from_comment))) if meta_key_from_comment else None
+            comment_keys = self._comment_keys[cache_key] = (meta_key_from_comment, key_prefix_pattern)
+        return comment_keys
+
     def _get_meta_key_of_comments(self, metadata_def_json_path: Path) -> dict:
         """Collect the prefix words of comment sentences that should be registered as meta.
 
@@ -83,28 +110,32 @@ class MetaParser(XrdMetaParser):
 
         return meta_key_from_comment
 
-    def _separate_key_value_from_comment(self, line: str, meta_key_from_comment: dict) -> tuple[str, str]:
+    def _separate_key_value_from_comment(
+        self,
+        line: str,
+        meta_key_from_comment: dict[str, str],
+        key_prefix_pattern: re.Pattern[str] | None,
+    ) -> tuple[str, str]:
         """Separate comment statements into meta's key and value.
 
         Args:
             line (str): Comment statements.
-            meta_key_from_comment (dict): Metadata define Object.
+            meta_key_from_comment (dict[str, str]): Metadata define Object.
+            key_prefix_pattern (re.Pattern[str] | None): Pattern matching the prefixes of meta_key_from_comment.
 
         Returns:
             tuple[str, str]: Meta's key and value.
 
         """
-        key: str = ""
-        value: str = ""
-        line_normalization = line.replace(" ", "").lower()
-        for key_prefix, key_org in meta_key_from_comment.items():
-            if not line_normalization.startswith(key_prefix):
-                continue
-            meta_value = line.strip()
-            for _ in range(len(key_prefix)):
-                meta_value = meta_value[1:].strip()
-            key = key_org
-            value = meta_value
-            break
-
-        return key, value
+        if key_prefix_pattern is None:
+            return "", ""
+        match = key_prefix_pattern.match(line.replace(" ", "").lower())
+        if match is None:
+            return "", ""
+
+        key_prefix = match.group()
+        meta_value = line.strip()
+        # The value follows as many non-whitespace characters as the prefix has, whatever whitespace is between them.
+        prefix_end = re.match(rf"(?:\s*\S){{{len(key_prefix)}}}", meta_value)
+        value = meta_value[prefix_end.end():].strip() if prefix_end else ""
+        return meta_key_from_comment[key_prefix], value
@@ -0,0 +1,223 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import ClassVar, Final, NamedTuple
+
+from rdetoolkit.models.rde2types import MetaType, RdeOutputResourcePath, RepeatedMetaType
+
+from modules_xrd.output_naming import OutputNames, validate_collision_policy
+
+# Change when the outputs of the structured processing change, so that older entries are not restored.
+CACHE_VERSION: Final[str] = "1"
+
+DEFAULT_CACHE_MAX_BYTES: Final[int] = 1 << 30
+
+# xrd settings that do not change the outputs of a file.
+IGNORED_SETTINGS: Final[frozenset[str]] = frozenset({"batch_mode", "max_workers", "render_workers", "output_name_collision", "rasx_xml_validation", "cache_dir", "cache_max_bytes"})
+
+# Output folders (attributes of RdeOutputResourcePath) restored from the cache.
+OUTPUT_DIRS: Final[tuple[str, ...]] = ("struct", "main_image", "other_image")
+
+HASH_CHUNK_SIZE: Final[int] = 1 << 20
+
+
+class CachedResult(NamedTuple):
+    """Metadata parsed from one raw file, stored together with its output files."""
+
+    const_meta_info: MetaType
+    repeated_meta_info: RepeatedMetaType
+    region_num: int
+
+
+class ResultCache:
+    """Cache of the outputs of the structured processing of raw files, stored in a local directory.
+
+    An entry is keyed by the contents and name of the raw file, the metadata definition file and the xrd settings,
+    and holds the structured files, the images and the parsed metadata of the file.
+    When the total size exceeds max_bytes, the least recently used entries are removed. The total is scanned
+    at the first store of a process and then tracked from the sizes stored, so the cache directory is scanned again
+    only when the tracked total exceeds max_bytes (entries stored by other worker processes are counted at that scan).
+
+    Attributes:
+        cache_dir (Path): Directory holding one folder per entry.
+        max_bytes (int): Upper limit of the total size of the entries.
+        collision_policy (str): Collision policy applied to the restored files (see OUTPUT_NAME_COLLISION_POLICIES).
+
+    Example:
+        cache = ResultCache(Path("/cache"), max_bytes=1 << 30)
+        key = cache.make_key(rawfile, metadata_def, config)
+        result = cache.load(key, resource_paths)
+
+    """
+
+    # Total size of the entries of each cache directory, tracked in this process.
+    _tracked_bytes: ClassVar[dict[str, int]] = {}
+
+    def __init__(self, cache_dir: Path, *, max_bytes: int = DEFAULT_CACHE_MAX_BYTES, collision_policy: str | None = None):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.collision_policy = validate_collision_policy(collision_policy)
+
+    @classmethod
+    def from_config(cls, config: dict) -> ResultCache | None:
+        """Create the cache set by cache_dir, cache_max_bytes and output_name_collision in rdeconfig.yaml.
+
+        Args:
+            config (dict): config data.
+
+        Returns:
+            ResultCache | None: The cache, None when cache_dir is not set.
+
+        """
+        cache_dir = config['xrd'].get('cache_dir')
+        if not cache_dir:
+            return None
+        max_bytes = config['xrd'].get('cache_max_bytes')
+        return cls(
+            Path(cache_dir),
+            max_bytes=DEFAULT_CACHE_MAX_BYTES if max_bytes is None else int(max_bytes),
+            collision_policy=config['xrd'].get('output_name_collision'),
+        )
+
+    def make_key(self, processing_file: Path, metadata_def: Path, config: dict) -> str:
+        """Make the key of the outputs of a raw file.
+
+        Args:
+            processing_file (Path): processing file.
+            metadata_def (Path): Metadata definition file used for the file.
+            config (dict): config data for the file.
+
+        Returns:
+            str: Hex digest identifying the outputs.
+
+        """
+        settings = {k: v for k, v in config['xrd'].items() if k not in IGNORED_SETTINGS}
+        digest = hashlib.sha256()
+        for part in (
+            CACHE_VERSION.encode(),
+            processing_file.name.encode(),
+            self._file_hash(processing_file),
+            self._file_hash(metadata_def),
+            json.dumps(settings, sort_keys=True, default=str).encode(),
+        ):
+            digest.update(len(part).to_bytes(8, "little"))
+            digest.update(part)
+        return digest.hexdigest()
+
+    def load(self, key: str, resource_paths: RdeOutputResourcePath) -> CachedResult | None:
+        """Restore the output files of an entry and get its metadata.
+
+        The restored files are recorded in OutputNames like the files written by processing,
+        so that the collision policy applies to them.
+
+        Args:
+            key (str): Key made by make_key.
+            resource_paths (RdeOutputResourcePath): Paths to output resources for saving results.
+
+        Returns:
+            CachedResult | None: The metadata of the entry, None if there is no entry for the key.
+
+        Raises:
+            StructuredError: If a restored file gets the name of an output of another input file and the policy is "error".
+
+        """
+        entry = self.cache_dir / key
+        try:
+            with open(entry / "result.json", encoding="utf-8") as f:
+                result = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        try:
+            sources = [(dirname, src) for dirname in OUTPUT_DIRS if (entry / dirname).is_dir() for src in (entry / dirname).iterdir()]
+            # Every name is checked before a file is written.
+            restored = [(src, OutputNames.claim(getattr(resource_paths, dirname) / src.name, policy=self.collision_policy)) for dirname, src in sources]
+            for src, dst in restored:
+                shutil.copyfile(src, dst)
+            # The modification time of an entry records its last use for eviction.
+            os.utime(entry)
+        except OSError:
+            # Evicted by another process meanwhile; the file is processed again.
+            return None
+        return CachedResult(result["const_meta_info"], result["repeated_meta_info"], result["region_num"])
+
+    def store(
+        self,
+        key: str,
+        resource_paths: RdeOutputResourcePath,
+        processing_file: Path,
+        result: CachedResult,
+    ) -> None:
+        """Store the output files of a raw file and its metadata, then evict entries if the size limit is exceeded.
+
+        The output files are those handed out for the raw file in this run (see OutputNames.outputs_of).
+        Metadata that does not survive JSON unchanged is not cached.
+
+        Args:
+            key (str): Key made by make_key.
+            resource_paths (RdeOutputResourcePath): Paths to output resources for saving results.
+            processing_file (Path): processing file.
+            result (CachedResult): The metadata parsed from the file.
+
+        """
+        contents = json.dumps(result._asdict(), ensure_ascii=False)
+        if json.loads(contents) != result._asdict():
+            return
+
+        output_dirs = {Path(os.path.abspath(getattr(resource_paths, dirname))): dirname for dirname in OUTPUT_DIRS}
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_dir = Path(tempfile.mkdtemp(prefix=".tmp-", dir=self.cache_dir))
+        try:
+            size = len(contents.encode("utf-8"))
+            for path in OutputNames.outputs_of(processing_file):
+                dirname = output_dirs.get(path.parent)
+                if dirname is None or not path.is_file():
+                    continue
+                dst_dir = tmp_dir / dirname
+                dst_dir.mkdir(exist_ok=True)
+                shutil.copyfile(path, dst_dir / path.name)
+                size += path.stat().st_size
+            with open(tmp_dir / "result.json", "w", encoding="utf-8") as f:
+                f.write(contents)
+            # Another process may have stored the same entry meanwhile; either copy is valid.
+            os.rename(tmp_dir, self.cache_dir / key)
+        except OSError:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            return
+
+        tracked = self._tracked_bytes.get(os.path.abspath(self.cache_dir))
+        if tracked is None or tracked + size > self.max_bytes:
+            self.evict()
+        else:
+            self._tracked_bytes[os.path.abspath(self.cache_dir)] = tracked + size
+
+    def evict(self) -> None:
+        """Remove the least recently used entries until the total size is within max_bytes, and track the remaining total."""
+        entries: list[tuple[int, int, Path]] = []
+        for entry in self.cache_dir.iterdir():
+            if entry.name.startswith(".") or not entry.is_dir():
+                continue
+            size = sum(path.stat().st_size for path in entry.rglob("*") if path.is_file())
+            entries.append((entry.stat().st_mtime_ns, size, entry))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry in sorted(entries, key=lambda item: item[0]):
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+        self._tracked_bytes[os.path.abspath(self.cache_dir)] = total
+
+    @staticmethod
+    def _file_hash(path: Path) -> bytes:
+        """Hash the contents of a file."""
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            while chunk := f.read(HASH_CHUNK_SIZE):
+                digest.update(chunk)
+        return digest.digest()
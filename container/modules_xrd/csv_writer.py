@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+import csv
+import io
+import os
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Final
+
+import numpy as np
+import pandas as pd
+
+# Rows formatted at a time.
+CHUNK_ROWS: Final[int] = 1 << 16
+
+# Decimals (integer and fraction digits) written by the digit path. Up to 15 significant digits
+# a decimal maps to exactly one double, so the digits are the shortest repr of the value.
+MAX_FIXED_DIGITS: Final[int] = 15
+
+# Below this magnitude repr switches to the exponent notation.
+MIN_POSITIONAL: Final[float] = 1e-4
+
+# Most decimals looked for in a column without a precision, to write it by the digit path.
+MAX_DETECTED_DECIMALS: Final[int] = 10
+
+# Magnitude up to which every integer is a double, so that the scaled values are rounded in floating point.
+MAX_EXACT_INTEGER: Final[float] = 2.0**52
+
+
+def round_decimals(values: np.ndarray, decimals: int) -> np.ndarray:
+    """Round values to decimals as formatting them does, i.e. float(f"{value:.4f}") for 4 decimals.
+
+    The values are scaled and rounded in bulk. The scaled value is not exact, so where it lies within
+    a few ulps of a half-way point (or beyond the exact integers) the value is formatted instead.
+    np.round would round those values from the inexact scaled value (e.g. 3682.74465 -> 3682.7446).
+
+    Args:
+        values (np.ndarray): Float values.
+        decimals (int): Number of decimals (0 to 15).
+
+    Returns:
+        np.ndarray: The rounded values (NaN and infinities are kept).
+
+    """
+    values = np.asarray(values, dtype=np.float64)
+    scale = 10.0**decimals
+    scaled = values * scale
+    # Dividing the integer by the exact power of ten gives the double nearest to the decimal, as float() does.
+    rounded = np.rint(scaled) / scale
+    distance_to_half = np.abs(np.abs(scaled - np.trunc(scaled)) - 0.5)
+    inexact = np.isfinite(values) & ((distance_to_half <= 4 * np.spacing(np.abs(scaled))) | (np.abs(scaled) >= MAX_EXACT_INTEGER))
+    for i in np.flatnonzero(inexact):
+        rounded[i] = float(f"{values[i]:.{decimals}f}")
+    return rounded
+
+
+def write_csv(
+    save_path: str | Path,
+    dataframe: pd.DataFrame,
+    precision: Sequence[int | None] | None = None,
+    *,
+    chunk_rows: int = CHUNK_ROWS,
+) -> None:
+    """Write a data frame as csv in the same text as DataFrame.to_csv(save_path, index=False).
+
+    Float columns with a precision are rounded to that many decimals by round_decimals before writing,
+    as formatting them with that many decimals does. Values are written in their shortest repr,
+    as pandas does. Rows are formatted in chunks with numpy and written as bytes.
+
+    Args:
+        save_path (str | Path): Path of the csv file.
+        dataframe (pd.DataFrame): The data to save.
+        precision (Sequence[int | None] | None): Decimals of each column. None (or a missing entry) keeps the value as is.
+        chunk_rows (int): Rows formatted at a time.
+
+    """
+    if not all(pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype) for dtype in dataframe.dtypes):
+        dataframe.to_csv(save_path, index=False)
+        return
+
+    precisions = [*(precision or []), *[None] * dataframe.shape[1]][:dataframe.shape[1]]
+    columns = [_column_values(dataframe.iloc[:, i], p) for i, p in enumerate(precisions)]
+
+    header = io.StringIO()
+    csv.writer(header, lineterminator=os.linesep).writerow([str(column) for column in dataframe.columns])
+    with open(save_path, "wb") as f:
+        f.write(header.getvalue().encode("utf-8"))
+        for start in range(0, len(dataframe), chunk_rows):
+            chunk = [values[start:start + chunk_rows] for values in columns]
+            contents = _format_fixed_rows(chunk)
+            f.write(contents if contents is not None else _format_rows(chunk))
+
+
+def _column_values(series: pd.Series, precision: int | None) -> np.ndarray:
+    """Get the values of a column to write, rounded to the precision if it is a float column."""
+    values = series.to_numpy()
+    if values.dtype.kind != "f":
+        return values
+    values = values.astype(np.float64, copy=False)
+    return values if precision is None else round_decimals(values, precision)
+
+
+def _format_rows(columns: list[np.ndarray]) -> bytes:
+    """Format rows with the repr of each value.
+
+    NaN is written as an empty field, quoted when it would leave the row empty, as pandas does.
+
+    """
+    na_rep = '""' if len(columns) == 1 else ""
+    texts = []
+    for values in columns:
+        text = values.astype(str)
+        if values.dtype.kind == "f":
+            text = np.where(np.isnan(values), na_rep, text)
+        texts.append(text)
+    rows = texts[0]
+    for text in texts[1:]:
+        rows = np.strings.add(np.strings.add(rows, ","), text)
+    return "".join(np.strings.add(rows, os.linesep).tolist()).encode("utf-8")
+
+
+def _format_fixed_rows(columns: list[np.ndarray]) -> bytes | None:
+    """Format rows from the decimal digits of the values.
+
+    Every column must be a float column whose values are finite decimals with at most MAX_DETECTED_DECIMALS decimals,
+    within the range where the digits are the shortest repr. Otherwise None is returned and _format_rows is used.
+
+    """
+    blocks: list[tuple[np.ndarray, np.ndarray]] = []
+    for values in columns:
+        decimals = _decimal_places(values) if values.dtype.kind == "f" else None
+        block = None if decimals is None else _fixed_digits(values, decimals)
+        if block is None:
+            return None
+        blocks.append(block)
+
+    n_rows = len(columns[0])
+    separator = (np.full((n_rows, 1), ord(","), dtype=np.uint8), np.ones((n_rows, 1), dtype=bool))
+    terminator = np.frombuffer(os.linesep.encode(), dtype=np.uint8)
+    end = (np.broadcast_to(terminator, (n_rows, len(terminator))), np.ones((n_rows, len(terminator)), dtype=bool))
+    parts = [blocks[0]]
+    for block in blocks[1:]:
+        parts += [separator, block]
+    parts.append(end)
+
+    chars = np.concatenate([part[0] for part in parts], axis=1)
+    keep = np.concatenate([part[1] for part in parts], axis=1)
+    return chars[keep].tobytes()
+
+
+def _decimal_places(values: np.ndarray) -> int | None:
+    """Get the fewest decimals (at least 1) with which every value is written exactly, None if there are more.
+
+    A value is the double nearest to a decimal with that many decimals when the decimal converts back to it.
+
+    """
+    if not np.isfinite(values).all() or (len(values) and np.abs(values).max() * 10.0 >= MAX_EXACT_INTEGER):
+        return None
+    for decimals in range(1, MAX_DETECTED_DECIMALS + 1):
+        scale = 10.0**decimals
+        if np.array_equal(np.rint(values * scale) / scale, values):
+            return decimals
+    return None
+
+
+def _fixed_digits(values: np.ndarray, decimals: int) -> tuple[np.ndarray, np.ndarray] | None:
+    """Lay out the sign, integer digits, point and fraction digits of each value in fixed-width columns.
+
+    Args:
+        values (np.ndarray): Values that are decimals with the given number of decimals (see _decimal_places).
+        decimals (int): Number of decimals (at least 1, as repr always writes a fraction digit).
+
+    Returns:
+        tuple[np.ndarray, np.ndarray] | None: Characters and the mask of those written
+            (leading and trailing zeros are dropped, keeping one digit on each side of the point).
+            None if a value cannot be written this way.
+
+    """
+    if not np.isfinite(values).all() or ((values != 0) & (np.abs(values) < MIN_POSITIONAL)).any():
+        return None
+    units = np.abs(np.rint(values * 10.0**decimals))
+    if len(units) and units.max() >= 10.0**MAX_FIXED_DIGITS:
+        return None
+    units = units.astype(np.int64)
+
+    integer = units // 10**decimals
+    fraction = units % 10**decimals
+    n_integer = len(str(int(integer.max()))) if len(units) else 1
+
+    integer_powers = 10 ** np.arange(n_integer - 1, -1, -1, dtype=np.int64)
+    fraction_powers = 10 ** np.arange(decimals - 1, -1, -1, dtype=np.int64)
+    integer_digits = (integer[:, None] // integer_powers) % 10
+    fraction_digits = (fraction[:, None] // fraction_powers) % 10
+
+    n_rows = len(values)
+    chars = np.concatenate(
+        [
+            np.full((n_rows, 1), ord("-")),
+            integer_digits + ord("0"),
+            np.full((n_rows, 1), ord(".")),
+            fraction_digits + ord("0"),
+        ],
+        axis=1,
+    ).astype(np.uint8)
+    keep = np.concatenate(
+        [
+            np.signbit(values)[:, None],
+            (integer[:, None] >= integer_powers) | (integer_powers == 1),
+            np.ones((n_rows, 1), dtype=bool),
+            (fraction[:, None] % (fraction_powers * 10) != 0) | (fraction_powers == 10 ** (decimals - 1)),
+        ],
+        axis=1,
+    )
+    return chars, keep
@@ -9,35 +9,14 @@ from rdetoolkit.exceptions import StructuredError
 from rdetoolkit.models.rde2types import RdeOutputResourcePath
 from rdetoolkit.rde2util import read_from_json_file
 
-from modules_xrd.bruker.uxd.inputfile_handler import FileReader as UxdFileReader
-from modules_xrd.bruker.uxd.meta_handler import MetaParser as UxdMetaParser
 from modules_xrd.graph_handler import GraphPlotter
 from modules_xrd.inputfile_handler import FileReader as XrdFileReader
 from modules_xrd.invoice_handler import InvoiceWriter
 from modules_xrd.meta_handler import MetaParser as XrdMetaParser
-from modules_xrd.models import ScaleType
-from modules_xrd.rigaku.ras.inputfile_handler import FileReader as RasFileReader
-from modules_xrd.rigaku.ras.meta_handler import MetaParser as RasMetaParser
-from modules_xrd.rigaku.rasx.inputfile_handler import FileReader as RasxFileReader
-from modules_xrd.rigaku.rasx.meta_handler import MetaParser as RasxMetaParser
-from modules_xrd.rigaku.txt.inputfile_handler import FileReader as TxtFileReader
-from modules_xrd.rigaku.txt.meta_handler import MetaParser as TxtMetaParser
+from modules_xrd.reader_registry import ReaderRegistry
+from modules_xrd.scale_type import ScaleType
 from modules_xrd.structured_handler import StructuredDataProcessor
 
-RIGAKU_SUFFIX_CLASS_MAPPING = {
-    "rigaku": {
-        ".ras": (RasFileReader, RasMetaParser),
-        ".rasx": (RasxFileReader, RasxMetaParser),
-        ".txt": (TxtFileReader, TxtMetaParser),
-    },
-}
-
-BRUKER_SUFFIX_CLASS_MAPPING = {
-    "bruker": {
-        ".uxd": (UxdFileReader, UxdMetaParser),
-    },
-}
-
 
 class XrdFactory:
     """Obtain a variety of data for use in the XRD's Structured processing."""
@@ -49,18 +28,40 @@ class XrdFactory:
         meta_parser: XrdMetaParser,
         graph_plotter: GraphPlotter,
         structured_processor: StructuredDataProcessor,
+        *,
+        file_format: str,
     ):
         self.invoice_writer = invoice_writer
         self.file_reader = file_reader
         self.meta_parser = meta_parser
         self.graph_plotter = graph_plotter
         self.structured_processor = structured_processor
+        self.file_format = file_format
+
+    def clear(self, config: dict | None = None) -> None:
+        """Reset the per-file state so that the objects can be reused for the next file of a batch.
+
+        Args:
+            config (dict | None): config data for the next file (see get_file_config). The settings decided
+                from the file contents (e.g. encoding and delimiter of a txt file) are handed to the objects
+                reading the file, so that it is not read with those of the previous file.
+
+        """
+        if config is not None:
+            self.invoice_writer.config = config
+            self.file_reader.config = config
+            self.meta_parser.config = config
+        self.meta_parser.clear()
+        self.graph_plotter.clear()
 
     @staticmethod
-    def get_config(resource_paths: RdeOutputResourcePath, path_tasksupport: Path) -> tuple[Any, Path]:
+    def get_config(resource_paths: RdeOutputResourcePath, path_tasksupport: Path) -> tuple[Any, list[Path]]:
         """Obtain a variety of data.
 
         Obtain configuration data.
+        Only the highest priority file is processed unless batch_mode is enabled in rdeconfig.yaml,
+        in which case every file with a supported extension is processed in priority order.
+        The priority of each extension is that of its reader (see ReaderRegistry).
 
         Args:
             resource_paths (RdeOutputResourcePath): output file.
@@ -68,26 +69,13 @@ class XrdFactory:
 
         Returns:
             config (Any): config data.
-            processing_file (Path): processing file.
+            processing_files (list[Path]): processing files.
 
         """
         if not len(resource_paths.rawfiles):
             err_msg = "No measurement file found."
             raise StructuredError(err_msg)
 
-        # Get priorities
-        ext_priority = {
-            ".rasx": 1,
-            ".ras": 2,
-            ".txt": 3,
-        }
-        sorted_files: list[Path] = sorted(
-            resource_paths.rawfiles,
-            key=lambda f: ext_priority.get(os.path.splitext(f)[1].lower(), float('inf')),
-        )
-        processing_file = sorted_files[0]
-
-        suffix = processing_file.suffix.lower()
         rdeconfig_file = path_tasksupport.joinpath("rdeconfig.yaml")
 
         # Get the graph scale of the representative image from rdeconfig.yaml.
@@ -102,29 +90,77 @@ class XrdFactory:
             err_msg = f"Invalid configuration file: {rdeconfig_file}"
             raise StructuredError(err_msg) from None
 
-        if suffix == ".txt":
-            # Determine the file delimiter.
-            config['xrd']['delimiter_type'] = XrdFileReader.determine_delimiter(processing_file)
+        # Get priorities
+        manufacturer = config['xrd']['manufacturer']
+        sorted_files: list[Path] = sorted(
+            resource_paths.rawfiles,
+            key=lambda f: ReaderRegistry.priority(manufacturer, os.path.splitext(f)[1]),
+        )
+        if not config['xrd'].get('batch_mode'):
+            return config, sorted_files[:1]
 
-            # Get bounds for differential_evolution.
-            invoice_obj = read_from_json_file(resource_paths.invoice_org)
-            invoice_scanning_mode = invoice_obj.get("custom", "").get("scanning_mode_if_not_exist")
-            config["xrd"]["scanning_mode_if_not_exist"] = \
-                invoice_scanning_mode if invoice_scanning_mode is not None else "2Theta-Theta"
+        supported_extensions = ReaderRegistry.suffixes(manufacturer)
+        processing_files = [f for f in sorted_files if f.suffix.lower() in supported_extensions]
+        if not processing_files:
+            err_msg = "No measurement file with a supported extension found."
+            raise StructuredError(err_msg)
+        return config, processing_files
 
-        return config, processing_file
+    @staticmethod
+    def get_file_config(config: dict, processing_file: Path, resource_paths: RdeOutputResourcePath) -> dict:
+        """Obtain the configuration for one processing file.
+
+        Settings that depend on the file contents are added to a copy of the configuration:
+        file_format, the format recognized from the contents (see ReaderRegistry.detect_format),
+        and for .txt the encoding, the delimiter and the scanning mode.
+
+        Args:
+            config (dict): config data.
+            processing_file (Path): processing file.
+            resource_paths (RdeOutputResourcePath): output file.
+
+        Returns:
+            dict: config data for the processing file.
+
+        """
+        file_config = {**config, "xrd": dict(config["xrd"])}
+        # Recognize the format from the leading bytes rather than trusting the extension.
+        file_config['xrd']['file_format'] = ReaderRegistry.detect_format(processing_file, config['xrd']['manufacturer'])
+        if file_config['xrd']['file_format'] != ".txt":
+            return file_config
+
+        # Determine the file encoding and delimiter from the leading lines.
+        file_config['xrd']['encoding'], file_config['xrd']['delimiter_type'] = XrdFileReader.sniff_text_file(processing_file)
+
+        # Get bounds for differential_evolution.
+        invoice_obj = read_from_json_file(resource_paths.invoice_org)
+        invoice_scanning_mode = invoice_obj.get("custom", "").get("scanning_mode_if_not_exist")
+        file_config["xrd"]["scanning_mode_if_not_exist"] = \
+            invoice_scanning_mode if invoice_scanning_mode is not None else "2Theta-Theta"
+
+        return file_config
 
     @staticmethod
-    def get_objects(rawfile: Path, path_tasksupport: Path, config: dict) -> tuple[Path, XrdFactory]:
+    def get_objects(
+        rawfile: Path,
+        path_tasksupport: Path,
+        config: dict,
+        *,
+        modules: dict[Path, XrdFactory] | None = None,
+    ) -> tuple[Path, XrdFactory]:
         """Obtain a variety of data.
 
         Retrieve the class to be executed.
         Obtain the metadata definition file to be used.
+        Both follow the format of the file contents (file_format set by get_file_config), not only its extension.
 
         Args:
             rawfile (Path): measurement file.
             path_tasksupport (Path): tasksupport path.
-            config (dict): config data.
+            config (dict): config data for the file (see get_file_config).
+            modules (dict[Path, XrdFactory] | None): Objects already created in this run, keyed by metadata definition file.
+                When given, they are reused (after clearing their per-file state and handing them the config of the file)
+                instead of being created again.
 
         Returns:
             metadata_def (Path): Metadata file path.
@@ -136,19 +172,11 @@ class XrdFactory:
                 StructuredDataProcessor (class): Template class for parsing structured data.
 
         """
-        suffix = rawfile.suffix.lower()
-
-        # (Only on manufacturer: rigaku, bruker) Input file extension check
-        valid_extensions = {
-            "rigaku": {".ras", ".rasx", ".txt"},
-            "bruker": {".uxd"},
-        }
+        # Input file format check (formats of the readers registered for the manufacturer)
         manufacturer = config['xrd']['manufacturer']
-        if suffix not in valid_extensions.get(manufacturer, set()):
-            err_msg = f"Format Error: Input data extension is incorrect: {suffix}"
-            raise StructuredError(err_msg)
+        suffix = config['xrd'].get('file_format') or ReaderRegistry.detect_format(rawfile, manufacturer)
 
-        # Obtain classes according to manufacturer and file extension.
+        # Obtain classes according to manufacturer and file format.
         class_filereader, class_metaparser = get_classes(manufacturer, suffix)
 
         # Gets the scale type of the graph.
@@ -162,30 +190,44 @@ class XrdFactory:
         # Change the metadata definition file according to the file format.
         metadata_def = path_tasksupport.joinpath(f'metadata-def_{manufacturer}_{suffix[1:]}{delimiter_type}.json')
 
+        if modules is not None and metadata_def in modules:
+            module = modules[metadata_def]
+            module.clear(config)
+            return metadata_def, module
+
         module = XrdFactory(
             InvoiceWriter(config),
             class_filereader(config),
             class_metaparser(metadata_def_json_path=metadata_def, config=config),
-            GraphPlotter(main_image_scaletype, other_image_scaletype),
-            StructuredDataProcessor(),
+            GraphPlotter(
+                main_image_scaletype,
+                other_image_scaletype,
+                decimation_threshold=config['xrd'].get('decimation_threshold'),
+                render_workers=config['xrd'].get('render_workers'),
+                collision_policy=config['xrd'].get('output_name_collision'),
+            ),
+            StructuredDataProcessor(
+                binary_output_format=config['xrd'].get('binary_output_format'),
+                precision=class_filereader.CSV_PRECISION,
+                collision_policy=config['xrd'].get('output_name_collision'),
+                prefix_extracted_files=bool(config['xrd'].get('batch_mode')),
+            ),
+            file_format=suffix,
         )
 
+        if modules is not None:
+            modules[metadata_def] = module
         return metadata_def, module
 
 
 def get_classes(manufacturer: str, suffix: str) -> tuple[type[XrdFileReader], type[XrdMetaParser]]:
-    """Get the appropriate FileReader and MetaParser classes based on the manufacturer and file suffix."""
-    try:
-        match manufacturer:
-            case "rigaku":
-                return RIGAKU_SUFFIX_CLASS_MAPPING[manufacturer][suffix]
-            case "bruker":
-                return BRUKER_SUFFIX_CLASS_MAPPING[manufacturer][suffix]
-            case _:
-                raise KeyError
-    except KeyError:
-        err_msg = f"Unsupported combination of manufacturer '{manufacturer}' and file extension '{suffix}'"
-        raise StructuredError(err_msg) from None
+    """Get the appropriate FileReader and MetaParser classes based on the manufacturer and file suffix.
+
+    The classes are those of the reader registered for the combination, imported on first use,
+    so that a run only loads the reader and parser of the formats it processes.
+
+    """
+    return ReaderRegistry.find(manufacturer, suffix).load_classes()
 
 
 def get_scale_types(main_image_setting: str) -> tuple[ScaleType, ScaleType]:
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import codecs
+from pathlib import Path
+from typing import Final
+
+ZIP_SIGNATURE: Final[bytes] = b"PK\x03\x04"
+RAS_DATA_START: Final[bytes] = b"*RAS_DATA_START"
+UXD_COUNTS_KEY: Final[bytes] = b"_2THETACOUNTS"
+
+# Japanese header keys of Rigaku txt files and the encodings they are written in.
+RIGAKU_TXT_JAPANESE_KEYS: Final[tuple[str, ...]] = ("入射スリット", "受光スリット1", "受光スリット2")
+RIGAKU_TXT_KEY_ENCODINGS: Final[tuple[str, ...]] = ("utf_8", "cp932", "euc_jp")
+
+# Header keys of Rigaku txt files (see metadata-def_rigaku_txt_*.json).
+RIGAKU_TXT_HEADER_KEYS: Final[frozenset[bytes]] = frozenset({
+    b"Comments", b"Sample", b"Goniometer", b"X-Ray", b"ScanningMode", b"StartTime", b"StopTime", b"ScanningType",
+    b"Speed", b"Step", b"Start", b"Stop", b"Attachment", b"Monochromater", b"DS", b"SS", b"RS",
+    *(key.encode(enc) for key in RIGAKU_TXT_JAPANESE_KEYS for enc in RIGAKU_TXT_KEY_ENCODINGS),
+})
+
+
+def is_rasx(head: bytes, path: Path) -> bool:
+    """Check for the signature of a zip archive.
+
+    The archive is not opened here, so that a rasx is opened only once, by RasxArchive,
+    which rejects a zip without root.xml.
+
+    """
+    return head.startswith(ZIP_SIGNATURE)
+
+
+def is_ras(head: bytes, path: Path) -> bool:
+    """Check for the *RAS_DATA_START line that opens a ras file."""
+    return RAS_DATA_START in head
+
+
+def is_uxd(head: bytes, path: Path) -> bool:
+    """Check for _2THETACOUNTS or a file opening with a ';' comment or a '_' keyword line."""
+    if UXD_COUNTS_KEY in head:
+        return True
+    first_line = next((line for line in _lines(head) if line), b"")
+    return first_line.startswith((b";", b"_"))
+
+
+def is_rigaku_txt(head: bytes, path: Path) -> bool:
+    """Check for a Rigaku txt header key (e.g. Sample, ScanningMode, 入射スリット) before the first data line."""
+    for line in _lines(head):
+        if not line:
+            continue
+        # Keys may be Japanese (a non-ASCII leading byte); a line starting with another character is data.
+        if line[:1].isascii() and not line[:1].isalpha():
+            return False
+        if line.split(maxsplit=1)[0] in RIGAKU_TXT_HEADER_KEYS:
+            return True
+    return False
+
+
+def _lines(head: bytes) -> list[bytes]:
+    """Split the leading bytes (cut at a line break by FileReader.read_head) into stripped lines, without the byte order mark."""
+    return [line.strip() for line in head.removeprefix(codecs.BOM_UTF8).splitlines()]
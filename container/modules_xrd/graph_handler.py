@@ -1,25 +1,104 @@
 from __future__ import annotations
 
+import json
+import os
+import threading
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from typing import Final, Literal
+from string import Template
+from typing import TYPE_CHECKING, Final, Literal
 
+import numpy as np
 import pandas as pd
-from matplotlib import pyplot as plt
-from matplotlib.ticker import ScalarFormatter
-from plotly import express as px
 from rdetoolkit.errors import catch_exception_with_message
 from rdetoolkit.exceptions import StructuredError
 from rdetoolkit.models.rde2types import RdeOutputResourcePath
 
 from modules_xrd.interfaces import IGraphPlotter
-from modules_xrd.models import ScaleType
+from modules_xrd.output_naming import OutputNames, region_filepath, validate_collision_policy
+from modules_xrd.scale_type import ScaleType
+
+if TYPE_CHECKING:
+    # matplotlib is imported when the first image is drawn.
+    from matplotlib.axes import Axes
+    from matplotlib.figure import Figure
+
+DEFAULT_DECIMATION_THRESHOLD: Final[int] = 20000
+
+# Images and html are saved in the calling thread unless more workers are configured.
+DEFAULT_RENDER_WORKERS: Final[int] = 1
+
+# Colors of the overlaid regions when there are more of them than colors in the default cycle.
+MULTIPLOT_COLORMAP: Final[str] = "viridis"
+
+PLOTLY_JS_CDN: Final[str] = "https://cdn.plot.ly/plotly-2.34.0.min.js"
+
+# Page written for every region. Only the arrays and the layout are filled in,
+# and the figure is built by plotly.js in the browser.
+HTML_TEMPLATE: Final[Template] = Template("""<html>
+<head><meta charset="utf-8" /></head>
+<body>
+    <div id="graph" class="plotly-graph-div" style="height:100%; width:100%;"></div>
+    <script charset="utf-8" src="$plotly_js"></script>
+    <script type="text/javascript">
+        Plotly.newPlot("graph", [$trace], $layout, {"responsive": true});
+    </script>
+</body>
+</html>
+""")
+
+# Subset of the default plotly template, so that the page looks like the ones plotly.express writes.
+HTML_AXIS_STYLE: Final[dict] = {"gridcolor": "white", "linecolor": "white", "zerolinecolor": "white", "ticks": "", "automargin": True}
+HTML_LAYOUT_STYLE: Final[dict] = {
+    "font": {"color": "#2a3f5f"},
+    "hovermode": "closest",
+    "hoverlabel": {"align": "left"},
+    "paper_bgcolor": "white",
+    "plot_bgcolor": "#E5ECF6",
+    "margin": {"t": 60},
+}
+
+
+def minmax_indices(y: np.ndarray, n_bins: int) -> np.ndarray:
+    """Select the points of a min/max envelope of the data.
+
+    The data is split into n_bins consecutive bins and the minimum and maximum of each bin are kept
+    (plus the first and last points), so that sharp peaks survive the reduction unlike stride sampling.
+
+    Args:
+        y (np.ndarray): y values.
+        n_bins (int): Number of bins (e.g. pixel columns of the output).
+
+    Returns:
+        np.ndarray: Sorted indices of the points to draw. All indices when no reduction is possible.
+
+    """
+    n = len(y)
+    if n <= 2 * n_bins or n_bins < 1 or np.isnan(y).any():
+        return np.arange(n)
+    width = -(-n // n_bins)
+    rows = -(-n // width)
+    padded = np.full(rows * width, np.nan)
+    padded[:n] = y
+    padded = padded.reshape(rows, width)
+    offsets = np.arange(rows) * width
+    selected = np.concatenate(([0, n - 1], offsets + np.nanargmin(padded, axis=1), offsets + np.nanargmax(padded, axis=1)))
+    return np.unique(selected)
 
 
 class GraphPlotter(IGraphPlotter[pd.DataFrame]):
     """Utility for plotting data using various types of plots.
 
     This class provides methods to generate and save different types of plots based on provided data.
-    It supports line plots, log-scale plots, and multi-plots where multiple series are plotted on the same graph.
+    It supports line plots, log-scale plots, and multi-plots where the series of all regions are plotted on the same graph.
+
+    The images of a dataset are one task, which draws the data once and saves it with each scale, and its html is another.
+    With more than one render worker the tasks are run by a thread pool and wait() must be called before the outputs are used.
+    matplotlib is not documented as thread-safe, so each thread draws on its own Figure with a FigureCanvasAgg (pyplot is
+    not used), and the tasks are given arrays reduced in the calling thread rather than the data frames.
+    Drawing holds the GIL for most of its time, so the threads mainly overlap the png encoding and file writes
+    with the drawing of the next dataset and the speedup stays well below the number of workers.
 
     """
 
@@ -27,18 +106,57 @@ class GraphPlotter(IGraphPlotter[pd.DataFrame]):
         self,
         main_image_scaletype: Literal[ScaleType.linear, ScaleType.log],
         other_image_scaletype: Literal[ScaleType.linear, ScaleType.log],
+        *,
+        decimation_threshold: int | None = None,
+        render_workers: int | None = None,
+        collision_policy: str | None = None,
     ):
         """Init.
 
         Args:
             main_image_scaletype (ScaleType): main image scale type (Linear scale, Logarithmic scale).
             other_image_scaletype (ScaleType): other image scale type (Linear scale, Logarithmic scale).
+            decimation_threshold (int | None): Number of points above which the data is reduced to a min/max envelope
+                before drawing images and html. None uses the default, and 0 or less disables the reduction.
+            render_workers (int | None): Number of threads saving images and html concurrently.
+                None uses the default (1), and 1 or less saves them in the calling thread as they are requested.
+                More workers are limited to the number of CPUs.
+            collision_policy (str | None): What to do when two outputs of a run get the same name
+                ("overwrite" or "error", see OUTPUT_NAME_COLLISION_POLICIES). None uses "overwrite".
 
         """
         self.title = ""
         self.multi_df: pd.DataFrame = []
         self.main_image_scaletype = main_image_scaletype
         self.other_image_scaletype = other_image_scaletype
+        self.decimation_threshold = DEFAULT_DECIMATION_THRESHOLD if decimation_threshold is None else decimation_threshold
+        self.render_workers = DEFAULT_RENDER_WORKERS if render_workers is None else render_workers
+        # A matplotlib figure must not be drawn from two threads, so each thread keeps its own.
+        self._local = threading.local()
+        self._executor: ThreadPoolExecutor | None = None
+        self._pending: list[Future] = []
+        self.collision_policy = validate_collision_policy(collision_policy)
+
+    def clear(self) -> None:
+        """Discard the datasets stored for the multiplot."""
+        self.multi_df = []
+
+    @catch_exception_with_message(error_message="Error: Could not draw graph")
+    def wait(self) -> None:
+        """Wait until every requested image and html is saved.
+
+        Raises:
+            Exception: The first error raised while saving them.
+
+        """
+        pending, self._pending = self._pending, []
+        try:
+            for future in pending:
+                future.result()
+        finally:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True, cancel_futures=True)
+                self._executor = None
 
     @catch_exception_with_message(error_message="Error: Could not draw graph")
     def plot_main(
@@ -47,6 +165,8 @@ class GraphPlotter(IGraphPlotter[pd.DataFrame]):
         resource_paths: RdeOutputResourcePath,
         processing_file: Path,
         region_num: int,
+        *,
+        region_index: int | None = None,
     ) -> None:
         """Plot main.
 
@@ -57,17 +177,20 @@ class GraphPlotter(IGraphPlotter[pd.DataFrame]):
             resource_paths (RdeOutputResourcePath): Paths to output resources for saving results.
             processing_file (Path): processing file.
             region_num (int): Number of regions
+            region_index (int | None): Number of the region in the file (1-based).
+                Defaults to the number of regions plotted since the last clear().
 
         """
         single_region_num: Final[int] = 1
-        multi_region_num: Final[int] = 2
 
         self._set_multi_dataset(data)
         image_basename = processing_file.stem
+        if region_index is None:
+            region_index = len(self.multi_df)
         if region_num == single_region_num:
             self._plot_single_region(data, resource_paths, image_basename)
-        elif region_num == multi_region_num:
-            self._plot_multiple_regions(data, resource_paths, image_basename)
+        elif region_num > single_region_num:
+            self._plot_multiple_regions(data, resource_paths, image_basename, region_num, region_index)
 
     @catch_exception_with_message(error_message="Error: Could not draw graph")
     def multiplot_main(
@@ -77,7 +200,7 @@ class GraphPlotter(IGraphPlotter[pd.DataFrame]):
     ) -> None:
         """Multiplot main.
 
-        If there are two regions, the two graphs are displayed together.
+        If there are multiple regions, the graphs of all regions are displayed together.
 
         Args:
             resource_paths (RdeOutputResourcePath): Paths to output resources for saving results.
@@ -88,6 +211,7 @@ class GraphPlotter(IGraphPlotter[pd.DataFrame]):
         save_path = resource_paths.main_image.joinpath(f"{image_basename}_log.png") \
             if self.main_image_scaletype == ScaleType.log \
             else resource_paths.main_image.joinpath(f"{image_basename}.png")
+        OutputNames.claim(save_path, policy=self.collision_policy)
 
         title = self.set_title_from_filename(save_path)
         self.multiplot(save_path, title=title, scale=self.main_image_scaletype)
@@ -116,81 +240,78 @@ class GraphPlotter(IGraphPlotter[pd.DataFrame]):
             scale (ScaleType): Information about the graph scale.
 
         """
-        title = title or self.title or ""
-        col = data.columns
-        xlabel = xlabel or col[0]
-        ylabel = ylabel or col[1]
-        fig, ax = plt.subplots()
+        self.plot_scales(data, htmlpath, [(save_path, title, scale)], xlabel=xlabel, ylabel=ylabel)
 
-        ax.set_xlabel(xlabel)
-        ax.set_ylabel(ylabel)
-        if scale == ScaleType.linear:
-            ax.set_title(title)
-            ax.yaxis.set_major_formatter(ScalarFormatter(useMathText=True))
-            data.plot(ax=ax, x=col[0], y=col[1], legend=False)
-        else:
-            ax.set_title(title)
-            ax.set_yscale("log")
-            data.plot(ax=ax, x=col[0], y=col[1], legend=False)
+    @catch_exception_with_message(error_message="Error: Could not draw graph")
+    def plot_scales(
+        self,
+        data: pd.DataFrame,
+        htmlpath: Path,
+        targets: list[tuple[Path, str | None, ScaleType]],
+        *,
+        xlabel: str | None = None,
+        ylabel: str | None = None,
+    ) -> None:
+        """Draw the data once and save it with each of the given scales.
 
-        fig.savefig(save_path)
+        The images are saved by one task (see _render) and the html by another.
 
-        if scale == ScaleType.linear:
-            self._to_html(data, col[0], col[1], htmlpath)
+        Args:
+            data (pd.DataFrame): measurement data
+            htmlpath (Path): Path for the saved html image, written when a linear scale is among the targets.
+            targets (list[tuple[Path, str | None, ScaleType]]): Save path, title and scale of each image.
+            xlabel (str | None): Label for the x-axis. Defaults to the first column name.
+            ylabel (str | None): Label for the y-axis. Defaults to the second column name.
 
-        plt.cla()
-        plt.close()
+        """
+        col = data.columns
+        targets = [(save_path, title or self.title or "", scale) for save_path, title, scale in targets]
+        lines = [self._decimate(data, self._pixel_columns())]
+        self._submit(self._render, lines, targets, xlabel=xlabel or col[0], ylabel=ylabel or col[1])
+
+        if any(scale == ScaleType.linear for _, _, scale in targets):
+            html_x, html_y = self._decimate(data, self.decimation_threshold // 2)
+            self._submit(self._to_html, html_x, html_y, str(col[0]), str(col[1]), htmlpath)
 
     @catch_exception_with_message(error_message="Error: Could not draw graph")
     def multiplot(
         self,
         save_path: Path,
         *,
-        data_series_1: pd.DataFrame | None = None,
-        data_series_2: pd.DataFrame | None = None,
+        datasets: list[pd.DataFrame] | None = None,
         title: str | None = None,
         xlabel: str | None = None,
         ylabel: str | None = None,
         scale: ScaleType = ScaleType.linear,
     ) -> None:
-        """Plot two series of data on the same graph.
+        """Plot several series of data on the same graph.
 
         Args:
             save_path (Path): Path where the plot will be saved.
-            data_series_1 (pd.DataFrame): First set of data to be plotted.
-            data_series_2 (pd.DataFrame): Second set of data to be plotted.
+            datasets (list[pd.DataFrame] | None): Sets of data to be plotted, in region order.
+                Defaults to the data of every region plotted by plot_main (reduced to the points drawn).
             title (str | None): Title of the graph. Defaults to an empty string.
-            xlabel (str | None): Label for the x-axis. Defaults to an empty string.
+            xlabel (str | None): Label for the x-axis. Defaults to the column name of the first data series.
             ylabel (str | None): Label for the y-axis. Defaults to the column name of the first data series.
             scale (ScaleType): Information about the graph scale.
 
         """
-        title, data_series_1, data_series_2 = self._set_data_title(title, data_series_1, data_series_2)
+        multi_region_num: Final[int] = 2
+
+        title, datasets = self._set_data_title(title, datasets)
 
-        if data_series_1 is None or data_series_2 is None:
+        if len(datasets) < multi_region_num:
             err_msg = "Error: No input data to multi graphing."
             raise StructuredError(err_msg)
 
-        col_series_1 = data_series_1.columns
-        col_series_2 = data_series_2.columns
-        xlabel = xlabel or col_series_1[0]
-        ylabel = ylabel or col_series_1[1]
-
-        fig, ax = plt.subplots()
-
-        ax.set_ylabel(ylabel)
-        if scale == ScaleType.linear:
-            ax.set_title(title)
-            ax.yaxis.set_major_formatter(ScalarFormatter(useMathText=True))
-            data_series_1.plot(ax=ax, x=col_series_1[0], y=col_series_1[1], legend=False)
-            data_series_2.plot(ax=ax, x=col_series_2[0], y=col_series_2[1], legend=False)
-        else:
-            ax.set_title(title + "(log)")
-            ax.set_yscale("log")
-            data_series_1.plot(ax=ax, x=col_series_1[0], y=col_series_1[1], legend=False)
-            data_series_2.plot(ax=ax, x=col_series_2[0], y=col_series_2[1], legend=False)
-
-        fig.savefig(save_path)
+        col_series_1 = datasets[0].columns
+        self._submit(
+            self._render,
+            [self._decimate(df, self._pixel_columns()) for df in datasets],
+            [(save_path, title if scale == ScaleType.linear else title + "(log)", scale)],
+            xlabel=xlabel or col_series_1[0],
+            ylabel=ylabel or col_series_1[1],
+        )
 
     @catch_exception_with_message(error_message="Type error: illegal type detected")
     def set_title_from_filename(self, filepath: str | Path) -> str:
@@ -210,68 +331,187 @@ class GraphPlotter(IGraphPlotter[pd.DataFrame]):
     def _set_data_title(
         self,
         title: str | None = None,
-        data_series_1: pd.DataFrame | None = None,
-        data_series_2: pd.DataFrame | None = None,
-    ) -> tuple[str, pd.DataFrame | None, pd.DataFrame | None]:
+        datasets: list[pd.DataFrame] | None = None,
+    ) -> tuple[str, list[pd.DataFrame]]:
         """Set the title and multi region data.
 
         Args:
             title (str | None): Title of the graph. Defaults to an empty string.
-            data_series_1 (pd.DataFrame): First set of data to be plotted.
-            data_series_2 (pd.DataFrame): Second set of data to be plotted.
+            datasets (list[pd.DataFrame] | None): Sets of data to be plotted.
 
         Returns:
             title (str): Title of the graph. Defaults to an empty string.
-            data_series_1 (pd.DataFrame): First set of data to be plotted.
-            data_series_2 (pd.DataFrame): Second set of data to be plotted.
+            datasets (list[pd.DataFrame]): Sets of data to be plotted. Defaults to the stored datasets.
 
         """
         if title is None:
             title = self.title if self.title else ""
 
-        if data_series_1 is None and len(self.multi_df) > 1:
-            data_series_1 = self.multi_df[0]
-        if data_series_2 is None and len(self.multi_df) > 1:
-            data_series_2 = self.multi_df[1]
+        if datasets is None:
+            datasets = list(self.multi_df)
 
-        return title, data_series_1, data_series_2
+        return title, datasets
 
     def _set_multi_dataset(self, data: pd.DataFrame) -> None:
         """Methods to store datasets to be graphed into instance variables.
 
+        Only the points drawn in the images are kept (the min/max envelope made by _decimate),
+        so that the full data of every region is not held until the multiplot is saved.
+
         Args:
             data (pd.DataFrame): data to be graphed
 
         """
-        self.multi_df.append(data)
+        x, y = self._decimate(data, self._pixel_columns())
+        self.multi_df.append(pd.DataFrame({data.columns[0]: x, data.columns[1]: y}, copy=False))
 
     def _plot_single_region(self, data: pd.DataFrame, resource_paths: RdeOutputResourcePath, image_basename: str) -> None:
         """Plot for a single region."""
         main_save_path, other_save_path = self._make_imagefilename(self.main_image_scaletype, resource_paths, image_basename)
+        for save_path in (main_save_path, other_save_path):
+            OutputNames.claim(save_path, policy=self.collision_policy)
         htmlpath = self._savefilename(resource_paths.struct.joinpath(f"{image_basename}.html"), region_num=1, scale=None)
-        for save_path, scale in ((main_save_path, self.main_image_scaletype), (other_save_path, self.other_image_scaletype)):
-            title = self.set_title_from_filename(save_path)
-            self.plot(data, htmlpath, save_path, title=title, scale=scale)
+        targets = [
+            (save_path, self.set_title_from_filename(save_path), scale)
+            for save_path, scale in ((main_save_path, self.main_image_scaletype), (other_save_path, self.other_image_scaletype))
+        ]
+        self.plot_scales(data, htmlpath, targets)
 
-    def _plot_multiple_regions(self, data: pd.DataFrame, resource_paths: RdeOutputResourcePath, image_basename: str) -> None:
+    def _plot_multiple_regions(
+        self,
+        data: pd.DataFrame,
+        resource_paths: RdeOutputResourcePath,
+        image_basename: str,
+        region_num: int,
+        region_index: int,
+    ) -> None:
         """Plot for multiple regions."""
+        htmlpath = self._savefilename(resource_paths.struct.joinpath(f"{image_basename}.html"), region_num=region_num, scale=None, region_index=region_index)
+        targets = []
         for scale in [self.other_image_scaletype, self.main_image_scaletype]:
-            save_path = self._savefilename(resource_paths.other_image.joinpath(f"{image_basename}.png"), region_num=2, scale=scale)
-            htmlpath = self._savefilename(resource_paths.struct.joinpath(f"{image_basename}.html"), region_num=2, scale=None)
-            title = self.set_title_from_filename(save_path)
-            self.plot(data, htmlpath, save_path, title=title, scale=scale)
+            save_path = self._savefilename(
+                resource_paths.other_image.joinpath(f"{image_basename}.png"), region_num=region_num, scale=scale, region_index=region_index,
+            )
+            targets.append((save_path, self.set_title_from_filename(save_path), scale))
+        self.plot_scales(data, htmlpath, targets)
+
+    def _submit(self, task: Callable[..., None], *args: object, **kwargs: object) -> None:
+        """Run a task saving an image or html, in the thread pool if there is more than one render worker."""
+        max_workers = min(self.render_workers, os.cpu_count() or 1)
+        if max_workers <= 1:
+            task(*args, **kwargs)
+            return
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="graph")
+        self._pending.append(self._executor.submit(task, *args, **kwargs))
+
+    def _render(self, lines: list[tuple[np.ndarray, np.ndarray]], targets: list[tuple[Path, str, ScaleType]], *, xlabel: str, ylabel: str) -> None:
+        """Draw the lines once and save an image with each of the given scales.
+
+        Args:
+            lines (list[tuple[np.ndarray, np.ndarray]]): x and y values of each line, as returned by _decimate.
+            targets (list[tuple[Path, str, ScaleType]]): Save path, title and scale of each image.
+            xlabel (str): Label for the x-axis.
+            ylabel (str): Label for the y-axis.
+
+        """
+        ax = self._draw(lines, xlabel=xlabel, ylabel=ylabel)
+        for save_path, title, scale in targets:
+            self._save(ax, save_path, title=title, scale=scale)
+
+    def _decimate(self, data: pd.DataFrame, n_bins: int) -> tuple[np.ndarray, np.ndarray]:
+        """Get the x and y values to draw, reduced to a min/max envelope when there are too many points.
+
+        Args:
+            data (pd.DataFrame): measurement data (first column x, second column y).
+            n_bins (int): Number of bins of the envelope.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: x and y values, not sharing memory with the data frame.
+
+        """
+        x = data.iloc[:, 0].to_numpy()
+        y = data.iloc[:, 1].to_numpy()
+        if self.decimation_threshold <= 0 or len(y) <= self.decimation_threshold:
+            return x.copy(), y.copy()
+        indices = minmax_indices(y, n_bins)
+        return x[indices], y[indices]
+
+    def _pixel_columns(self) -> int:
+        """Get the width of the saved images in pixels."""
+        figure = self._get_figure()
+        return int(figure.get_figwidth() * figure.dpi)
+
+    def _get_figure(self) -> Figure:
+        """Get the figure of the current thread, creating it on the Agg canvas on first use."""
+        figure: Figure | None = getattr(self._local, "figure", None)
+        if figure is None:
+            # matplotlib is imported when the first image is drawn, not when the module is.
+            from matplotlib.backends.backend_agg import FigureCanvasAgg  # noqa: PLC0415
+            from matplotlib.figure import Figure  # noqa: PLC0415
+
+            figure = self._local.figure = Figure()
+            FigureCanvasAgg(figure)
+        return figure
+
+    def _draw(self, lines: list[tuple[np.ndarray, np.ndarray]], *, xlabel: str, ylabel: str) -> Axes:
+        """Draw lines on the figure of the current thread, replacing what was drawn before.
+
+        Args:
+            lines (list[tuple[np.ndarray, np.ndarray]]): x and y values of each line.
+            xlabel (str): Label for the x-axis.
+            ylabel (str): Label for the y-axis.
+
+        Returns:
+            Axes: The axes the lines were drawn on.
+
+        """
+        import matplotlib as mpl  # noqa: PLC0415  (imported with the figure, see _get_figure)
+
+        figure = self._get_figure()
+        figure.clear()
+        ax = figure.add_subplot()
+        ax.set_xlabel(xlabel)
+        ax.set_ylabel(ylabel)
+        colors = None
+        if len(lines) > len(mpl.rcParams["axes.prop_cycle"]):
+            colors = mpl.colormaps[MULTIPLOT_COLORMAP](np.linspace(0, 1, len(lines)))
+        for i, (x, y) in enumerate(lines):
+            ax.plot(x, y, color=None if colors is None else colors[i])
+        return ax
+
+    def _save(self, ax: Axes, save_path: Path, *, title: str, scale: ScaleType) -> None:
+        """Save the drawn figure with the given title and y-axis scale.
 
-    def _savefilename(self, filepath: str | Path, region_num: int, scale: ScaleType | None) -> Path:
+        Args:
+            ax (Axes): The axes returned by _draw.
+            save_path (Path): Path where the image will be saved.
+            title (str): Title of the graph.
+            scale (ScaleType): Information about the graph scale.
+
+        """
+        if scale == ScaleType.linear:
+            from matplotlib.ticker import ScalarFormatter  # noqa: PLC0415  (imported with the figure, see _get_figure)
+
+            ax.set_yscale("linear")
+            ax.yaxis.set_major_formatter(ScalarFormatter(useMathText=True))
+        else:
+            ax.set_yscale("log")
+        ax.set_title(title)
+        self._get_figure().savefig(save_path)
+
+    def _savefilename(self, filepath: str | Path, region_num: int, scale: ScaleType | None, *, region_index: int = 1) -> Path:
         """Rename the destination file path.
 
-        When supporting multiple regions, the file name of files with the same name
-        is changed to a filename with an index appended at the end.
+        When supporting multiple regions, the region number is appended to the file name.
         If the scale of the graph is log, the filename is renamed to indicate this.
+        The name is checked against the collision policy without looking at the file system.
 
         Args:
             filepath (str | Path): The file path to be changed.
             region_num (int): Number of regions.
             scale (ScaleType): Information about the graph scale.
+            region_index (int): Number of the region in the file (1-based).
 
         Raises:
             StructuredError: An exception occurs if an invalid number of regions is passed.
@@ -280,34 +520,9 @@ class GraphPlotter(IGraphPlotter[pd.DataFrame]):
             Path: save file name.
 
         """
-        single_region_num: Final[int] = 1
-        multi_region_num: Final[int] = 2
-
-        if isinstance(filepath, str):
-            filepath = Path(filepath)
-
-        if region_num > multi_region_num or region_num < single_region_num:
-            err_msg = f"illegal region number: {region_num}"
-            raise StructuredError(err_msg)
-
-        dirname = filepath.parent
-        basename = filepath.stem
-        suffix = filepath.suffix
         scale_suffix = "_log" if scale == ScaleType.log else ""
-
-        if region_num == single_region_num:
-            new_filename = f"{basename}{scale_suffix}{suffix}"
-            return dirname / new_filename
-
-        idx = 1
-        while True:
-            new_filename = f"{basename}_{idx}{scale_suffix}{suffix}"
-            new_filepath = dirname / new_filename
-            if not new_filepath.exists():
-                break
-            idx += 1
-
-        return new_filepath
+        new_filepath = region_filepath(filepath, region_num, region_index=region_index, scale_suffix=scale_suffix)
+        return OutputNames.claim(new_filepath, policy=self.collision_policy)
 
     def _make_imagefilename(
         self,
@@ -335,16 +550,37 @@ class GraphPlotter(IGraphPlotter[pd.DataFrame]):
 
         return main_save_path, other_save_path
 
-    def _to_html(self, data: pd.DataFrame, col_x: str, col_y: str, htmlpath: Path) -> None:
+    def _to_html(self, x: np.ndarray, y: np.ndarray, col_x: str, col_y: str, htmlpath: Path) -> None:
         """Output graph images in html.
 
+        The values are embedded as JSON arrays in a page that draws them with plotly.js loaded from the CDN.
+
         Args:
-            data (pd.DataFrame): Graph data to be output.
-            col_x (str): label or position.
-            col_y (str): label or position.
+            x (np.ndarray): x values to be output.
+            y (np.ndarray): y values to be output.
+            col_x (str): Label for the x-axis.
+            col_y (str): Label for the y-axis.
             htmlpath (Path): Output path of the html file.
 
         """
-        fig = px.line(data, x=col_x, y=col_y)
-        with open(htmlpath, "w") as f:
-            f.write(fig.to_html(include_plotlyjs="cdn"))
+        trace = {
+            "type": "scatter",
+            "mode": "lines",
+            "x": x.tolist(),
+            "y": y.tolist(),
+            "line": {"color": "#636efa"},
+            "hovertemplate": f"{col_x}=%{{x}}<br>{col_y}=%{{y}}<extra></extra>",
+            "showlegend": False,
+        }
+        layout = {
+            **HTML_LAYOUT_STYLE,
+            "xaxis": {**HTML_AXIS_STYLE, "title": {"text": col_x}},
+            "yaxis": {**HTML_AXIS_STYLE, "title": {"text": col_y}},
+        }
+        with open(htmlpath, "w", encoding="utf-8") as f:
+            f.write(HTML_TEMPLATE.substitute(plotly_js=PLOTLY_JS_CDN, trace=self._to_script_json(trace), layout=self._to_script_json(layout)))
+
+    @staticmethod
+    def _to_script_json(obj: dict) -> str:
+        """Serialize an object to JSON that can be embedded in a script element."""
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).replace("</", "<\\/")
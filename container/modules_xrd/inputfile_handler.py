@@ -1,7 +1,11 @@
+import os
 from pathlib import Path
-from typing import Literal
+from typing import ClassVar, Literal
 
+import numpy as np
 import pandas as pd
+from charset_normalizer import detect
+from rdetoolkit.exceptions import StructuredError
 from rdetoolkit.rde2util import CharDecEncoding
 
 from modules_xrd.interfaces import IInputFileParser
@@ -19,10 +23,62 @@ class FileReader(IInputFileParser):
 
     """
 
+    # Decimals of each column written to the structured csv (None keeps the value as read).
+    CSV_PRECISION: ClassVar[tuple[int | None, ...]] = (None, None)
+
+    # Number of leading bytes from which the encoding and the delimiter of a text file are decided.
+    SNIFF_SIZE: ClassVar[int] = 1 << 16
+
     def __init__(self, config: dict):
         self.data: dict[str, pd.DataFrame] = {}
         self.region_num = 0
         self.config = config
+        # Region counts of the files this reader has seen, keyed by path, mtime and size.
+        self._region_index: dict[tuple[str, int, int], int] = {}
+
+    def get_region_number(self, *, input_path: Path | None = None) -> int:
+        """Get the number of regions.
+
+        When a path is given, the count recorded by a previous read of the same unchanged file is reused,
+        otherwise the file is scanned by count_regions.
+
+        Args:
+            input_path (Path | None): Measurement file path.
+
+        Returns:
+            int: Number of regions.
+
+        """
+        if input_path is None:
+            return self.region_num
+        key = self._region_index_key(input_path)
+        if key not in self._region_index:
+            self._region_index[key] = self.count_regions(input_path)
+        self.region_num = self._region_index[key]
+        return self.region_num
+
+    def count_regions(self, srcpath: Path) -> int:
+        """Count the regions of a file.
+
+        Readers override this with a scan that does not convert the measured values.
+
+        Args:
+            srcpath (Path): Measurement file path.
+
+        Returns:
+            int: Number of regions.
+
+        """
+        return sum(1 for _ in self.read(srcpath))
+
+    def _remember_region_number(self, srcpath: Path) -> None:
+        """Record the region number of a file that has just been read."""
+        self._region_index[self._region_index_key(srcpath)] = self.region_num
+
+    def _region_index_key(self, srcpath: Path) -> tuple[str, int, int]:
+        """Make the key of the region index from the file identity."""
+        stat = os.stat(srcpath)
+        return os.path.abspath(srcpath), stat.st_mtime_ns, stat.st_size
 
     @staticmethod
     def determine_delimiter(file_path: Path) -> Literal["\t", " "]:
@@ -30,32 +86,154 @@ class FileReader(IInputFileParser):
 
         MEMO: If there are the same number of tabs and spaces,
             they should be tab-separated. (That's absurd.)
-        MEMO: Redundant writing.
 
         Args:
             file_path (Path): measurement file.
 
         Returns:
-            tuple[str, str]: [(r'\t' or ' '), ('_tab' or '_space')]
+            Literal["\t", " "]: delimiter.
+
+        """
+        return FileReader.sniff_text_file(file_path)[1]
+
+    @classmethod
+    def sniff_text_file(cls, file_path: Path) -> tuple[str, Literal["\t", " "]]:
+        r"""Decide the encoding and the delimiter of a text file from its leading lines.
+
+        Only the first SNIFF_SIZE bytes, cut at the last line break, are examined, which covers
+        the header block and the first data lines. When they do not give one of the usual encodings,
+        the whole file is examined by CharDecEncoding as before.
+
+        Args:
+            file_path (Path): measurement file.
+
+        Returns:
+            tuple[str, Literal["\t", " "]]: encoding and delimiter (tab when there are as many tabs as spaces).
 
         """
-        tab_count = 0
-        space_count = 0
+        head = cls.read_head(file_path)
+        enc = cls._fix_encoding(cls.sniff_encoding(head) or CharDecEncoding.detect_text_file_encoding(file_path))
 
-        enc = CharDecEncoding.detect_text_file_encoding(file_path)
+        text = head.decode(enc, errors="replace")
+        if text.count(" ") > text.count("\t"):
+            return enc, " "
+        return enc, "\t"
+
+    @classmethod
+    def read_head(cls, file_path: Path) -> bytes:
+        """Read the first SNIFF_SIZE bytes of a file, cut at the last line break when the file is longer.
+
+        The encoding and delimiter of text files and the format of input files (see ReaderRegistry.detect_format)
+        are decided from these bytes.
+
+        Args:
+            file_path (Path): measurement file.
+
+        Returns:
+            bytes: Leading bytes of the file.
+
+        """
+        with open(file_path, "rb") as f:
+            head = f.read(cls.SNIFF_SIZE)
+            if f.read(1):
+                head = head[:head.rfind(b"\n") + 1] or head
+        return head
+
+    @staticmethod
+    def sniff_encoding(head: bytes) -> str | None:
+        """Decide the encoding of a text file from its leading bytes.
+
+        Args:
+            head (bytes): Leading bytes of the file (see read_head).
+
+        Returns:
+            str | None: One of the usual encodings (CharDecEncoding.USUAL_ENCs, with shift_jis read as cp932),
+                None when the leading bytes do not give one of them.
+
+        """
+        detected = detect(head)["encoding"]
+        enc = detected.replace("-", "_").lower() if detected else ""
+        if enc not in CharDecEncoding.USUAL_ENCs:
+            return None
+        return "cp932" if enc == "shift_jis" else enc
+
+    @classmethod
+    def read_text(cls, file_path: Path, encoding: str | None = None) -> str:
+        """Read a text file at once and decode it.
+
+        The encoding decided by sniff_text_file is used when given. If the rest of the file
+        cannot be decoded with it, the encoding is detected from the whole file.
+
+        Args:
+            file_path (Path): measurement file.
+            encoding (str | None): encoding of the file, detected from the whole file when None.
+
+        Returns:
+            str: contents of the file.
+
+        """
+        with open(file_path, "rb") as f:
+            contents = f.read()
+        if encoding:
+            try:
+                return contents.decode(encoding)
+            except UnicodeDecodeError:
+                pass
+        return contents.decode(cls._fix_encoding(CharDecEncoding.detect_text_file_encoding(file_path)))
+
+    @staticmethod
+    def _fix_encoding(enc: str) -> str:
+        """Correct a falsely detected character code."""
         if enc in ["macroman", "mac_roman"]:
-            # False character code detection
-            enc = "cp932"
+            return "cp932"
+        return enc
 
-        with open(file_path, encoding=enc) as file:
-            for line in file:
-                tab_count += line.count('\t')
-                space_count += line.count(' ')
+    @staticmethod
+    def parse_value_lines(lines: list[str], line_numbers: list[int], delimiter: str, *, columns: int = 2) -> np.ndarray:
+        """Parse measured value lines into a float64 array in bulk.
+
+        Args:
+            lines (list[str]): Measured value lines (stripped).
+            line_numbers (list[int]): Line number in the file of each line, used in error messages.
+            delimiter (str): Delimiter between the values.
+            columns (int): Number of values in a line.
+
+        Returns:
+            np.ndarray: Array of shape (len(lines), columns).
+
+        Raises:
+            StructuredError: If a line does not hold exactly columns numeric values. The line and column are reported.
 
-        if space_count > tab_count:
-            return " "
-        return "\t"
+        """
+        if "" not in lines:
+            try:
+                values = np.loadtxt(lines, dtype=np.float64, delimiter=delimiter, comments=None, ndmin=2)
+            except ValueError:
+                pass
+            else:
+                if values.shape == (len(lines), columns):
+                    return values
+
+        # Locate the offending value (and convert what loadtxt is stricter about than float).
+        rows = []
+        for line, line_number in zip(lines, line_numbers, strict=True):
+            tokens = [s.strip() for s in line.split(delimiter)]
+            if len(tokens) != columns:
+                err_msg = f"Expected {columns} values but found {len(tokens)} at line {line_number}: {line}"
+                raise StructuredError(err_msg)
+            row = []
+            for column, token in enumerate(tokens, 1):
+                try:
+                    row.append(float(token))
+                except ValueError:
+                    err_msg = f"Failed to convert {token} to float at line {line_number}, column {column}"
+                    raise StructuredError(err_msg) from None
+            rows.append(row)
+        return np.array(rows, dtype=np.float64).reshape(-1, columns)
 
     def get_files_from_rasx(self, rasx_path: Path) -> list[str]:
         """Substance is in rigaku/rasx/inputfile_handler.py (only .rasx)."""
         return []
+
+    def close(self, srcpath: Path) -> None:
+        """Release resources held for the input file (only .rasx holds any)."""
@@ -3,16 +3,18 @@ from __future__ import annotations
 from abc import ABC, abstractmethod
 from collections.abc import Generator
 from pathlib import Path
-from typing import Generic, TypeVar
+from typing import TYPE_CHECKING, Generic, TypeAlias, TypeVar
 
 import pandas as pd
 from rdetoolkit.models.rde2types import MetaType, RdeOutputResourcePath, RepeatedMetaType
 from rdetoolkit.rde2util import Meta
 
-from modules_xrd.models import MeasurementConditions
+if TYPE_CHECKING:
+    # The pydantic_xml models are imported by the rasx modules that use them.
+    from modules_xrd.models import MeasurementConditions
 
 T = TypeVar("T")
-ExtendMetaType = MetaType | MeasurementConditions
+ExtendMetaType: TypeAlias = "MetaType | MeasurementConditions"
 
 
 class IInputFileParser(ABC):
@@ -15,6 +15,8 @@ class InvoiceWriter:
     """Invoice overwriter.
 
     Overwrite invoice.json files depending on conditions.
+    The updates of every region and file of a run are collected in memory by add_measured_date
+    and written by write_invoice, so that invoice.json is read, validated and written once.
 
     """
 
@@ -24,43 +26,80 @@ class InvoiceWriter:
 
     def __init__(self, config: dict):
         self.config: dict = config
+        self.pending_updates: dict[str, str] = {}
+        self._invoice_obj: dict[str, Any] | None = None
 
-    def overwrite_invoice_measured_date(
+    def add_measured_date(
         self,
         resource_paths: RdeOutputResourcePath,
         suffix: str,
         const_meta: MetaType,
         repeat_meta: RepeatedMetaType,
     ) -> None:
-        """Overwrite invoice if needed.
+        """Collect the measurement date of a file to be written to the invoice by write_invoice.
 
-        The date is to be obtained from the output device and output to invoice.
-        The measurement date and time are written automatically to the invoice.json file
-        # based on the file meta data output from the device, so I added a process to write it to invoice.json.
+        The first date found is kept, as it was when each file wrote the invoice in turn.
 
         Args:
             resource_paths (RdeOutputResourcePath): Paths to output resources for saving results.
-            suffix (str): Input file extension.
+            suffix (str): Input file format (extension of the format, e.g. ".ras").
             const_meta (MetaType): Metadata defined as constant.
             repeat_meta (RepeatedMetaType): Metadata defined as variable.
 
         """
-        invoice_obj = read_from_json_file(resource_paths.invoice_org)
+        if self._invoice_obj is None:
+            self._invoice_obj = read_from_json_file(resource_paths.invoice_org)
         update_invoice_term_info = self._get_update_mesurement_date_dpf_metadata(
             suffix,
-            invoice_obj,
+            self._invoice_obj,
             const_meta,
             repeat_meta,
         )
-        if update_invoice_term_info:
+        for key, value in update_invoice_term_info.items():
+            self.pending_updates.setdefault(key, value)
+
+    def write_invoice(self, resource_paths: RdeOutputResourcePath) -> None:
+        """Write the collected updates to invoice.json, validated against the invoice schema once.
+
+        Args:
+            resource_paths (RdeOutputResourcePath): Paths to output resources for saving results.
+
+        """
+        if self.pending_updates:
+            invoice_obj = self._invoice_obj if self._invoice_obj is not None else read_from_json_file(resource_paths.invoice_org)
             overwrite_invoicefile_for_dpfterm(
                 invoice_obj,
                 resource_paths.invoice_org,
                 resource_paths.invoice_schema_json,
-                update_invoice_term_info,
+                self.pending_updates,
             )
             invoice_org_obj = InvoiceFile(resource_paths.invoice_org)
             invoice_org_obj.overwrite(resource_paths.invoice.joinpath("invoice.json"))
+        self.pending_updates = {}
+        self._invoice_obj = None
+
+    def overwrite_invoice_measured_date(
+        self,
+        resource_paths: RdeOutputResourcePath,
+        suffix: str,
+        const_meta: MetaType,
+        repeat_meta: RepeatedMetaType,
+    ) -> None:
+        """Overwrite invoice if needed.
+
+        The date is to be obtained from the output device and output to invoice.
+        The measurement date and time are written automatically to the invoice.json file
+        # based on the file meta data output from the device, so I added a process to write it to invoice.json.
+
+        Args:
+            resource_paths (RdeOutputResourcePath): Paths to output resources for saving results.
+            suffix (str): Input file format (extension of the format, e.g. ".ras").
+            const_meta (MetaType): Metadata defined as constant.
+            repeat_meta (RepeatedMetaType): Metadata defined as variable.
+
+        """
+        self.add_measured_date(resource_paths, suffix, const_meta, repeat_meta)
+        self.write_invoice(resource_paths)
 
     def overwrite_invoice_sample_name(
         self,
@@ -138,12 +177,14 @@ class InvoiceWriter:
                 keywd = ";contentof"
                 date_expressions = self._extract_date(repeat_meta, keywd)
 
+        # Regions without the item hold "" in the repeated metadata.
+        repeat_value = next((value for value in repeat_meta.get(keywd, []) if value != ""), None)
         mesurement_date_value = invoice_obj["custom"].get("measurement_measured_date")
         if const_meta.get(keywd) and not mesurement_date_value:
             update_invoice_term_info["measurement_measured_date"] = str(const_meta[keywd])
-        elif repeat_meta.get(keywd) and not mesurement_date_value:
+        elif repeat_value is not None and not mesurement_date_value:
             if date_expressions is None:
-                update_invoice_term_info["measurement_measured_date"] = str(repeat_meta[keywd][0])
+                update_invoice_term_info["measurement_measured_date"] = str(repeat_value)
             else:
                 update_invoice_term_info["measurement_measured_date"] = str(date_expressions)
         return update_invoice_term_info
@@ -168,7 +209,7 @@ class InvoiceWriter:
             (\d{1,2})       # 1 or 2 digits number
             )""", re.VERBOSE)
 
-        sentence = repeat_meta[keywd][0]
+        sentence = next((value for value in repeat_meta.get(keywd, []) if value != ""), None)
         if isinstance(sentence, str):
             hit_date = date_type.search(sentence)
             if hit_date:
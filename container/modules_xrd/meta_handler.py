@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from collections import defaultdict
 from pathlib import Path
 
 from rdetoolkit import rde2util
@@ -26,6 +27,11 @@ class MetaParser(IMetaParser[ExtendMetaType]):
         self.metadata_def_json_path = metadata_def_json_path
         self.config: dict = config
 
+    def clear(self) -> None:
+        """Discard the metadata parsed so far."""
+        self.const_meta_info = {}
+        self.repeated_meta_info = defaultdict(list)
+
     def save_meta(
         self,
         save_path: Path,
@@ -8,15 +8,23 @@ Profile*.xml is not applicable because it stores only measurement data.
 """
 from __future__ import annotations
 
-from enum import Enum
-
 from pydantic import BaseModel, field_validator
 from pydantic_xml import BaseXmlModel, attr, element
 
+from modules_xrd import scale_type
+
+# ScaleType lives in scale_type so that it is imported without pydantic_xml, and is kept here for existing imports.
+ScaleType = scale_type.ScaleType
+
+
+def normalize_wave_type(value: str) -> str:
+    """Spell out the greek letters of a wave type (e.g. Ka1 -> K_alpha1)."""
+    return value.replace("a", "_alpha").replace("b", "_beta")
+
 
-class ScaleType(Enum):
-    log = "log"
-    linear = "linear"
+def normalize_axis_name(value: str) -> str:
+    """Unify the notations of the 2theta/theta scan axis."""
+    return value.replace("TwoThetaTheta", "2Theta-Theta").replace("2θ/θ", "2Theta-Theta")
 
 
 class Data0(BaseXmlModel):
@@ -87,7 +95,7 @@ class XrayGenerator(BaseXmlModel, BaseModel, search_mode='unordered'):
     def replace_geek_char(cls, v: str | None) -> str | None:
         """Replace geek char."""
         if v:
-            return v.replace("a", "_alpha").replace("b", "_beta")
+            return normalize_wave_type(v)
         return v
 
 
@@ -174,7 +182,7 @@ class ScanInformation(BaseXmlModel, BaseModel, search_mode='unordered'):
     def replace_geek_char(cls, v: str) -> str:
         """Replace geek char."""
         if v is not None:
-            return v.replace("TwoThetaTheta", "2Theta-Theta").replace("2θ/θ", "2Theta-Theta")
+            return normalize_axis_name(v)
         return v
 
 
@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import ClassVar, Final
+
+from rdetoolkit.exceptions import StructuredError
+from rdetoolkit.rdelogger import get_logger
+
+logger = get_logger(__name__, file_path="data/logs/rdesys.log")
+
+# What happens when two outputs of a run get the same name (e.g. raw files sharing a basename in batch mode).
+# overwrite: the later output replaces the earlier one. error: processing stops with a StructuredError.
+OUTPUT_NAME_COLLISION_POLICIES: Final[tuple[str, ...]] = ("overwrite", "error")
+
+DEFAULT_OUTPUT_NAME_COLLISION: Final[str] = "overwrite"
+
+
+def validate_collision_policy(policy: str | None) -> str:
+    """Check the output_name_collision setting.
+
+    Args:
+        policy (str | None): Setting value. None or "" uses the default.
+
+    Returns:
+        str: The policy.
+
+    Raises:
+        StructuredError: If the policy is not supported.
+
+    """
+    if not policy:
+        return DEFAULT_OUTPUT_NAME_COLLISION
+    if policy not in OUTPUT_NAME_COLLISION_POLICIES:
+        err_msg = f"Unsupported output_name_collision: {policy}"
+        raise StructuredError(err_msg)
+    return policy
+
+
+def region_filepath(filepath: str | Path, region_num: int, *, region_index: int = 1, scale_suffix: str = "") -> Path:
+    """Make the output path of a region from the region number, without looking at the file system.
+
+    A file with a single region keeps the name (sample.csv). Otherwise the region number is appended
+    (sample_1.csv, sample_2.csv, ...). The scale suffix (e.g. "_log") follows the region number.
+
+    Args:
+        filepath (str | Path): Output path named after the raw file.
+        region_num (int): Number of regions in the file.
+        region_index (int): Number of the region (1-based).
+        scale_suffix (str): Suffix appended after the region number.
+
+    Returns:
+        Path: Output path of the region.
+
+    Raises:
+        StructuredError: If the region number is invalid.
+
+    """
+    filepath = Path(filepath)
+    if region_num < 1 or not 1 <= region_index <= region_num:
+        err_msg = f"illegal region number: {region_index}/{region_num}"
+        raise StructuredError(err_msg)
+
+    region_suffix = "" if region_num == 1 else f"_{region_index}"
+    return filepath.with_name(f"{filepath.stem}{region_suffix}{scale_suffix}{filepath.suffix}")
+
+
+class OutputNames:
+    """Output paths handed out during a run, to apply the collision policy without probing the file system.
+
+    Each path is recorded with the input file being processed (see set_owner). A path handed out again
+    for another input file is a collision; for the same input file it is not (e.g. a file extracted from
+    each region of a rasx under the same name).
+    Files present before the run are not looked at. dataset() clears the record at the start of a run,
+    and each worker process records the files it writes
+    (files whose outputs may share a name go to the same worker, see group_by_output_names).
+
+    Example:
+        OutputNames.set_owner(processing_file)
+        save_path = OutputNames.claim(region_filepath(path, 2, region_index=1), policy="error")
+        outputs = OutputNames.outputs_of(processing_file)
+
+    """
+
+    _claimed: ClassVar[dict[str, str]] = {}
+    # Paths of each input file, in the order they were handed out (values unused).
+    _outputs: ClassVar[dict[str, dict[str, None]]] = {}
+    _owner: ClassVar[str] = ""
+
+    @classmethod
+    def set_owner(cls, processing_file: Path) -> None:
+        """Record the following output paths as outputs of an input file.
+
+        Args:
+            processing_file (Path): The input file being processed.
+
+        """
+        cls._owner = str(processing_file)
+
+    @classmethod
+    def claim(cls, filepath: Path, *, policy: str = DEFAULT_OUTPUT_NAME_COLLISION) -> Path:
+        """Record an output path of the run.
+
+        With the "overwrite" policy, a collision is logged as a warning and the later output replaces the earlier one.
+
+        Args:
+            filepath (Path): Output path.
+            policy (str): Collision policy (see OUTPUT_NAME_COLLISION_POLICIES).
+
+        Returns:
+            Path: The output path.
+
+        Raises:
+            StructuredError: If the path was already handed out in this run for another input file and the policy is "error".
+
+        """
+        key = os.path.abspath(filepath)
+        owner = cls._claimed.get(key)
+        if owner is not None and owner != cls._owner:
+            if policy == "error":
+                err_msg = f"Output file name collision: {filepath.name} is written by more than one input file ({Path(owner).name}, {Path(cls._owner).name})"
+                raise StructuredError(err_msg)
+            logger.warning("Output file name collision: %s of %s overwrites that of %s", filepath.name, Path(cls._owner).name, Path(owner).name)
+            del cls._outputs[owner][key]
+        cls._claimed[key] = cls._owner
+        cls._outputs.setdefault(cls._owner, {})[key] = None
+        return filepath
+
+    @classmethod
+    def outputs_of(cls, processing_file: Path) -> list[Path]:
+        """Get the output paths handed out for an input file in this run, except those taken over by a later input file.
+
+        Args:
+            processing_file (Path): The input file.
+
+        Returns:
+            list[Path]: Absolute output paths in the order they were handed out.
+
+        """
+        return [Path(key) for key in cls._outputs.get(str(processing_file), {})]
+
+    @classmethod
+    def clear(cls) -> None:
+        """Forget the output paths handed out so far."""
+        cls._claimed.clear()
+        cls._outputs.clear()
+        cls._owner = ""
@@ -0,0 +1,297 @@
+from __future__ import annotations
+
+import importlib
+from collections.abc import Iterable
+from importlib.metadata import entry_points
+from pathlib import Path
+from typing import Any, ClassVar, Final, NamedTuple
+
+from rdetoolkit.exceptions import StructuredError
+
+from modules_xrd.inputfile_handler import FileReader as XrdFileReader
+
+# Group of the entry points through which installed packages add readers.
+# An entry point refers to a ReaderSpec or an iterable of them, e.g. in pyproject.toml:
+#   [project.entry-points."rde_xrd.readers"]
+#   xrdml = "xrd_panalytical.readers:XRDML_READER"
+READER_ENTRY_POINT_GROUP: Final[str] = "rde_xrd.readers"
+
+# What a reader supports besides read().
+# streaming: regions are converted and handed out one at a time.
+# random_access: parts of the file (e.g. archive members) are read without reading the rest.
+# region_count_index: the number of regions is counted without converting the measured values.
+READER_CAPABILITIES: Final[frozenset[str]] = frozenset({"streaming", "random_access", "region_count_index"})
+
+# Priority of readers that do not set one. Lower values are processed first.
+DEFAULT_PRIORITY: Final[int] = 100
+
+
+class ReaderSpec(NamedTuple):
+    """A file format and the classes that process it.
+
+    Classes and functions are given as "module:name" and imported on first use,
+    so that declaring a reader does not import it.
+
+    Attributes:
+        manufacturer (str): Value of manufacturer in rdeconfig.yaml the reader is used for.
+        suffixes (tuple[str, ...]): Lower-case file extensions with the leading dot.
+        file_reader (str): FileReader class.
+        meta_parser (str): MetaParser class.
+        priority (int): Order of the format when several input files are given (lower first).
+            Without batch_mode only the first file is processed.
+        sniffers (tuple[str, ...]): Functions taking the leading bytes of a file (see FileReader.read_head)
+            and its path, and returning whether the contents are of this format. They should decide from
+            the leading bytes and not read the file again (e.g. open a zip archive).
+        capabilities (frozenset[str]): Subset of READER_CAPABILITIES.
+
+    """
+
+    manufacturer: str
+    suffixes: tuple[str, ...]
+    file_reader: str
+    meta_parser: str
+    priority: int = DEFAULT_PRIORITY
+    sniffers: tuple[str, ...] = ()
+    capabilities: frozenset[str] = frozenset()
+
+    def load_classes(self) -> tuple[type, type]:
+        """Import the FileReader and MetaParser classes.
+
+        Returns:
+            tuple[type, type]: FileReader and MetaParser classes.
+
+        """
+        return import_object(self.file_reader), import_object(self.meta_parser)
+
+    def sniff(self, head: bytes, path: Path) -> bool | None:
+        """Check the leading bytes of a file with the sniffers of the reader.
+
+        Args:
+            head (bytes): Leading bytes of the file.
+            path (Path): The file.
+
+        Returns:
+            bool | None: Whether a sniffer recognizes the contents, None if the reader has no sniffer.
+
+        """
+        if not self.sniffers:
+            return None
+        return any(import_object(sniffer)(head, path) for sniffer in self.sniffers)
+
+
+BUILTIN_READERS: Final[tuple[ReaderSpec, ...]] = (
+    ReaderSpec(
+        "rigaku", (".rasx",),
+        "modules_xrd.rigaku.rasx.inputfile_handler:FileReader", "modules_xrd.rigaku.rasx.meta_handler:MetaParser",
+        priority=1, sniffers=("modules_xrd.format_sniffer:is_rasx",), capabilities=frozenset({"random_access", "region_count_index"}),
+    ),
+    ReaderSpec(
+        "rigaku", (".ras",),
+        "modules_xrd.rigaku.ras.inputfile_handler:FileReader", "modules_xrd.rigaku.ras.meta_handler:MetaParser",
+        priority=2, sniffers=("modules_xrd.format_sniffer:is_ras",), capabilities=frozenset({"streaming", "region_count_index"}),
+    ),
+    ReaderSpec(
+        "rigaku", (".txt",),
+        "modules_xrd.rigaku.txt.inputfile_handler:FileReader", "modules_xrd.rigaku.txt.meta_handler:MetaParser",
+        priority=3, sniffers=("modules_xrd.format_sniffer:is_rigaku_txt",), capabilities=frozenset({"region_count_index"}),
+    ),
+    ReaderSpec(
+        "bruker", (".uxd",),
+        "modules_xrd.bruker.uxd.inputfile_handler:FileReader", "modules_xrd.bruker.uxd.meta_handler:MetaParser",
+        priority=1, sniffers=("modules_xrd.format_sniffer:is_uxd",), capabilities=frozenset({"region_count_index"}),
+    ),
+)
+
+
+class ReaderRegistry:
+    """Readers available for each manufacturer and file extension.
+
+    The built-in readers are completed by those of the READER_ENTRY_POINT_GROUP entry points, which are
+    looked up on first use. A reader added later (by an entry point or register) replaces an earlier one
+    for the same manufacturer and extension, so that a package can also take over a built-in format.
+
+    Example:
+        spec = ReaderRegistry.find("rigaku", ".rasx")
+        class_filereader, class_metaparser = spec.load_classes()
+
+    """
+
+    _readers: ClassVar[dict[tuple[str, str], ReaderSpec] | None] = None
+
+    @classmethod
+    def register(cls, spec: ReaderSpec) -> None:
+        """Add a reader.
+
+        Args:
+            spec (ReaderSpec): The reader.
+
+        Raises:
+            StructuredError: If the reader is not declared correctly.
+
+        """
+        cls._add(cls._get_readers(), spec, source=spec.file_reader)
+
+    @classmethod
+    def find(cls, manufacturer: str, suffix: str) -> ReaderSpec:
+        """Get the reader of a file extension.
+
+        Args:
+            manufacturer (str): Manufacturer set in rdeconfig.yaml.
+            suffix (str): File extension.
+
+        Returns:
+            ReaderSpec: The reader.
+
+        Raises:
+            StructuredError: If no reader is registered for the combination.
+
+        """
+        spec = cls._get_readers().get((manufacturer, suffix.lower()))
+        if spec is None:
+            err_msg = f"Unsupported combination of manufacturer '{manufacturer}' and file extension '{suffix}'"
+            raise StructuredError(err_msg)
+        return spec
+
+    @classmethod
+    def detect_format(cls, rawfile: Path, manufacturer: str) -> str:
+        """Decide the format of an input file from its contents.
+
+        The leading bytes of the file are checked with the sniffers of the reader of its extension first,
+        then with those of the other readers of the manufacturer in priority order, so that a misnamed file
+        is processed by the reader of its contents. A reader without sniffers is trusted for its extension.
+
+        Args:
+            rawfile (Path): Input file.
+            manufacturer (str): Manufacturer set in rdeconfig.yaml.
+
+        Returns:
+            str: Extension of the format (e.g. ".ras"), used to select the reader and the metadata definition.
+
+        Raises:
+            StructuredError: If the contents match no reader of the manufacturer.
+
+        """
+        suffix = rawfile.suffix.lower()
+        head = XrdFileReader.read_head(rawfile)
+        spec = cls._get_readers().get((manufacturer, suffix))
+        if spec is not None and spec.sniff(head, rawfile) is not False:
+            return suffix
+        for other in cls.readers(manufacturer):
+            if other is not spec and other.sniff(head, rawfile):
+                return other.suffixes[0]
+
+        err_msg = f"Format Error: Input data extension is incorrect: {suffix}"
+        if spec is not None:
+            err_msg = f"Format Error: The contents of {rawfile.name} are not in the {suffix} format (checked the first {XrdFileReader.SNIFF_SIZE} bytes)"
+        # Name the format when the file belongs to another manufacturer (e.g. a uxd file with manufacturer: rigaku).
+        hint = next(((name, other) for (name, _), other in cls._get_readers().items() if name != manufacturer and other.sniff(head, rawfile)), None)
+        if hint is not None:
+            err_msg += f"; the contents look like a {hint[1].suffixes[0]} file of manufacturer '{hint[0]}'"
+        raise StructuredError(err_msg)
+
+    @classmethod
+    def readers(cls, manufacturer: str) -> list[ReaderSpec]:
+        """Get the readers of a manufacturer in priority order.
+
+        Args:
+            manufacturer (str): Manufacturer set in rdeconfig.yaml.
+
+        Returns:
+            list[ReaderSpec]: The readers.
+
+        """
+        specs = dict.fromkeys(spec for (name, _), spec in cls._get_readers().items() if name == manufacturer)
+        return sorted(specs, key=lambda spec: spec.priority)
+
+    @classmethod
+    def suffixes(cls, manufacturer: str) -> set[str]:
+        """Get the file extensions supported for a manufacturer.
+
+        Args:
+            manufacturer (str): Manufacturer set in rdeconfig.yaml.
+
+        Returns:
+            set[str]: Lower-case file extensions with the leading dot.
+
+        """
+        return {suffix for name, suffix in cls._get_readers() if name == manufacturer}
+
+    @classmethod
+    def priority(cls, manufacturer: str, suffix: str) -> float:
+        """Get the processing order of a file extension.
+
+        Args:
+            manufacturer (str): Manufacturer set in rdeconfig.yaml.
+            suffix (str): File extension.
+
+        Returns:
+            float: Priority of the reader (lower first), infinity for unsupported extensions.
+
+        """
+        spec = cls._get_readers().get((manufacturer, suffix.lower()))
+        return float("inf") if spec is None else spec.priority
+
+    @classmethod
+    def clear(cls) -> None:
+        """Forget the registered readers. The built-in readers and entry points are loaded again on next use."""
+        cls._readers = None
+
+    @classmethod
+    def _get_readers(cls) -> dict[tuple[str, str], ReaderSpec]:
+        """Get the readers keyed by manufacturer and extension, loading the entry points on first use."""
+        if cls._readers is None:
+            readers: dict[tuple[str, str], ReaderSpec] = {}
+            for spec in BUILTIN_READERS:
+                cls._add(readers, spec, source="built-in")
+            for entry_point in entry_points(group=READER_ENTRY_POINT_GROUP):
+                loaded = entry_point.load()
+                for spec in [loaded] if isinstance(loaded, ReaderSpec) else cls._as_specs(loaded, entry_point.name):
+                    cls._add(readers, spec, source=f"entry point {entry_point.name}")
+            cls._readers = readers
+        return cls._readers
+
+    @staticmethod
+    def _as_specs(loaded: Any, name: str) -> Iterable[Any]:
+        """Check that an entry point refers to an iterable of readers."""
+        if isinstance(loaded, Iterable) and not isinstance(loaded, str | bytes):
+            return loaded
+        err_msg = f"Invalid reader entry point {name}: expected a ReaderSpec or an iterable of them"
+        raise StructuredError(err_msg)
+
+    @staticmethod
+    def _add(readers: dict[tuple[str, str], ReaderSpec], spec: Any, *, source: str) -> None:
+        """Validate a reader and add it for each of its extensions."""
+        if not isinstance(spec, ReaderSpec):
+            err_msg = f"Invalid reader from {source}: expected a ReaderSpec, got {type(spec).__name__}"
+            raise StructuredError(err_msg)
+        invalid = [suffix for suffix in spec.suffixes if not suffix.startswith(".") or suffix != suffix.lower()]
+        if not spec.manufacturer or not spec.suffixes or invalid:
+            err_msg = f"Invalid reader from {source}: manufacturer and lower-case extensions starting with '.' are required"
+            raise StructuredError(err_msg)
+        unknown = set(spec.capabilities) - READER_CAPABILITIES
+        if unknown:
+            err_msg = f"Invalid reader from {source}: unknown capabilities {sorted(unknown)}"
+            raise StructuredError(err_msg)
+        for suffix in spec.suffixes:
+            readers[(spec.manufacturer, suffix)] = spec
+
+
+def import_object(object_path: str) -> Any:
+    """Import a class or function given as "module:name".
+
+    Args:
+        object_path (str): Module path and name separated by a colon.
+
+    Returns:
+        Any: The class or function.
+
+    Raises:
+        StructuredError: If the module or the name cannot be imported.
+
+    """
+    module_name, _, name = object_path.partition(":")
+    try:
+        return getattr(importlib.import_module(module_name), name)
+    except (ImportError, AttributeError) as e:
+        err_msg = f"Cannot import {object_path}: {e}"
+        raise StructuredError(err_msg) from None
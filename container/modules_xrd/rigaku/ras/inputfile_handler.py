@@ -1,13 +1,16 @@
 from __future__ import annotations
 
+import io
 import re
-from collections.abc import Generator
+from collections.abc import Generator, Iterable
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 from rdetoolkit.exceptions import StructuredError
 from rdetoolkit.rde2util import CharDecEncoding
 
+from modules_xrd.csv_writer import round_decimals
 from modules_xrd.inputfile_handler import FileReader as XrdFileReader
 from modules_xrd.interfaces import ExtendMetaType
 
@@ -26,6 +29,12 @@ class FileReader(XrdFileReader):
 
     __mode__ = "ras"
 
+    HEADER_START = "*RAS_HEADER_START"
+    HEADER_END = "*RAS_HEADER_END"
+    INT_START = "*RAS_INT_START"
+    INT_END = "*RAS_INT_END"
+    SCAN_CHUNK_SIZE = 1 << 20
+
     def __init__(self, config: dict):
         super().__init__(config)
         self.meta: dict[str, ExtendMetaType] = {}
@@ -44,32 +53,33 @@ class FileReader(XrdFileReader):
             StructuredError: If the file is formatted incorrectly.
 
         """
-        enc = CharDecEncoding.detect_text_file_encoding(srcpath)
-        with open(srcpath, encoding=enc) as f:
-            self.data, self.meta = self.split_data_meta(f.read())
-        if not self.data or not self.meta:
+        if not self.get_region_number(input_path=srcpath):
             err_msg = f"Cannot read the file because it is formatted incorrectly: {srcpath}"
             raise StructuredError(err_msg)
 
-        self.region_num = len(self.data.keys())
-        for data_key, meta_key in zip(self.data, self.meta, strict=False):
-            yield self.convert_dtype(self.data[data_key]), self.meta[meta_key]
-
-    def get_region_number(self, *, input_path: Path | None = None) -> int:
-        """Get the number of regions.
-
-        Args:
-            input_path (Path | None): Measurement file path.
-
-        Returns:
-            int: Number of regions.
-
-        """
-        if input_path is None:
-            return self.region_num
-        data_meta_mappings = [df_data for df_data, _ in self.read(input_path)]
-        self.region_num = len(data_meta_mappings)
-        return self.region_num
+        # Regions are converted and handed out one at a time so that only the current one is held in memory.
+        # The encoding is decided from the leading bytes (see sniff_text_file) rather than from the whole file.
+        self.data, self.meta = {}, {}
+        enc = self.sniff_encoding(self.read_head(srcpath)) or "utf_8"
+        region_count = 0
+        try:
+            for region in self._read_regions(srcpath, enc):
+                region_count += 1
+                yield region
+        except UnicodeDecodeError:
+            # A character past the leading bytes is not in their encoding (e.g. a Japanese comment in a later region):
+            # the regions not handed out yet are read with the encoding detected from the whole file.
+            enc = CharDecEncoding.detect_text_file_encoding(srcpath)
+            yield from self._read_regions(srcpath, enc, skip=region_count)
+
+    def _read_regions(self, srcpath: Path, enc: str, *, skip: int = 0) -> Generator[tuple[pd.DataFrame, ExtendMetaType], None, None]:
+        """Decode the file with the given encoding and convert its regions one at a time, except the first skip regions."""
+        with open(srcpath, encoding=enc) as f:
+            for i, (header_lines, data_lines) in enumerate(self.scan_regions(f), start=1):
+                if i <= skip:
+                    continue
+                self.meta[f"series_meta{i}"] = header_lines
+                yield self.make_dataframe(header_lines, data_lines), header_lines
 
     def split_data_meta(self, contents: str) -> tuple[dict[str, pd.DataFrame], dict[str, ExtendMetaType]]:
         """Private method to split the contents into data and metadata blocks.
@@ -84,21 +94,135 @@ class FileReader(XrdFileReader):
         """
         meta_blocks: dict[str, ExtendMetaType] = {}
         data_blocks: dict[str, pd.DataFrame] = {}
+        for i, (header_lines, data_lines) in enumerate(self.scan_regions(io.StringIO(contents)), start=1):
+            meta_blocks[f"series_meta{i}"] = header_lines
+            data_blocks[f"series_value{i}"] = self.make_dataframe(header_lines, data_lines)
 
-        data_pattern = re.findall(r"\*RAS_INT_START\n(.*?)\*RAS_INT_END", contents, re.DOTALL)
-        header_pattern = re.findall(r"\*RAS_HEADER_START\n(.*?)\*RAS_HEADER_END", contents, re.DOTALL)
-        for i, (data_section, header_section) in enumerate(zip(data_pattern, header_pattern, strict=False), start=1):
-            meta_blocks[f"series_meta{i}"] = header_section.strip().split("\n")
-            header = self.make_header(meta_blocks[f"series_meta{i}"])
+        return data_blocks, meta_blocks
 
-            # convert measured values to dataframes
-            data_list = [line.split() for line in data_section.strip().split("\n")]
-            df = pd.DataFrame(data_list)
-            df[1] = (df[1].astype(float) * df[2].astype(float)).apply(lambda x: f"{x:.4f}")
-            df = df.drop(2, axis=1)
-            data_blocks[f"series_value{i}"] = df.set_axis(header, axis="columns")
+    def scan_regions(self, lines: Iterable[str]) -> Generator[tuple[list[str], list[str]], None, None]:
+        """Scan the file line by line and yield the header and data lines of each region.
 
-        return data_blocks, meta_blocks
+        Each *RAS_INT block is paired with the *RAS_HEADER block immediately preceding it,
+        so a file whose header and data blocks do not alternate is rejected instead of misaligned.
+
+        Args:
+            lines (Iterable[str]): Lines of the ras file (e.g. an open file handle).
+
+        Yields:
+            tuple[list[str], list[str]]: Header lines and measured value lines of one region.
+
+        Raises:
+            StructuredError: If the header and data blocks are not paired or a block is not closed.
+
+        """
+        state = "outside"
+        header_lines: list[str] = []
+        data_lines: list[str] = []
+        for line_org in lines:
+            line = line_org.strip()
+            if not line:
+                continue
+            if state == "header":
+                if line == self.HEADER_END:
+                    state = "pending"
+                else:
+                    header_lines.append(line)
+            elif state == "data":
+                if line == self.INT_END:
+                    yield header_lines, data_lines
+                    state, header_lines, data_lines = "outside", [], []
+                else:
+                    data_lines.append(line)
+            else:
+                state = self._next_block_state(state, line)
+
+        if state in ("header", "data"):
+            err_msg = f"Cannot read the file because a {state} block is not closed"
+            raise StructuredError(err_msg)
+
+    def _next_block_state(self, state: str, line: str) -> str:
+        """Decide the scanner state after a line outside of any block.
+
+        Args:
+            state (str): "outside" or "pending" (a header has been read and waits for its data block).
+            line (str): Stripped line.
+
+        Returns:
+            str: Next scanner state.
+
+        Raises:
+            StructuredError: If a header block is not followed by its data block, or vice versa.
+
+        """
+        if line == self.HEADER_START:
+            if state == "pending":
+                err_msg = "Cannot read the file because *RAS_HEADER_START appears twice without *RAS_INT_START"
+                raise StructuredError(err_msg)
+            return "header"
+        if line == self.INT_START:
+            if state != "pending":
+                err_msg = "Cannot read the file because *RAS_INT_START appears without *RAS_HEADER_START"
+                raise StructuredError(err_msg)
+            return "data"
+        return state
+
+    def count_regions(self, srcpath: Path) -> int:
+        """Count the regions by scanning the raw bytes for *RAS_INT_START markers.
+
+        Args:
+            srcpath (Path): The path of the ras file.
+
+        Returns:
+            int: Number of regions.
+
+        """
+        marker = self.INT_START.encode()
+        count = 0
+        tail = b""
+        with open(srcpath, "rb") as f:
+            while chunk := f.read(self.SCAN_CHUNK_SIZE):
+                buffer = tail + chunk
+                count += buffer.count(marker)
+                # Keep a short tail so that a marker split across two chunks is still found.
+                tail = buffer[-(len(marker) - 1):]
+        return count
+
+    def make_dataframe(self, header_lines: list[str], data_lines: Iterable[str]) -> pd.DataFrame:
+        """Convert the lines of one region into a data frame.
+
+        Args:
+            header_lines (list[str]): Header lines of the region.
+            data_lines (Iterable[str]): Measured value lines of the region.
+
+        Returns:
+            pd.DataFrame: Angle and intensity x attenuation with the constructed header.
+
+        """
+        header = self.make_header(header_lines)
+        values = self.parse_numeric_block(data_lines)
+        # Intensity x attenuation is rounded to 4 decimals, as f"{value:.4f}" does.
+        intensity = round_decimals(values[:, 1] * values[:, 2], 4)
+        return pd.DataFrame(np.column_stack((values[:, 0], intensity)), columns=header)
+
+    def parse_numeric_block(self, data_section: Iterable[str]) -> np.ndarray:
+        """Parse a *RAS_INT block into a float64 array in bulk.
+
+        Args:
+            data_section (Iterable[str]): Lines between *RAS_INT_START and *RAS_INT_END.
+
+        Returns:
+            np.ndarray: Array of shape (n, 3) holding angle, intensity and attenuation.
+
+        Raises:
+            StructuredError: If the block contains non-numeric values or too few columns.
+
+        """
+        try:
+            return np.loadtxt(data_section, dtype=np.float64, usecols=(0, 1, 2), ndmin=2)
+        except (ValueError, IndexError) as e:
+            err_msg = f"Failed to convert measured values to float: {e}"
+            raise StructuredError(err_msg) from None
 
     def make_header(self, header_info: ExtendMetaType) -> list[str]:
         """Make a header using provided header information.
@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+import os
+import zipfile
+from pathlib import Path
+from typing import IO, ClassVar
+
+from rdetoolkit.exceptions import StructuredError
+
+from modules_xrd.models import Data0, Data1, Root
+
+
+class RasxArchive:
+    """An open .rasx archive shared by everything that reads from it during a run.
+
+    The zip file is opened once, its central directory and root.xml are parsed once,
+    and members are served from that index to the file reader and the structured data processor.
+
+    Attributes:
+        path (Path): rasx raw file.
+        members (dict[str, zipfile.ZipInfo]): Central directory entries keyed by member name.
+
+    Example:
+        archive = RasxArchive.open(Path("sample.rasx"))
+        for name in archive.files:
+            contents = archive.read(name)
+        RasxArchive.close_all()
+
+    """
+
+    _sessions: ClassVar[dict[str, RasxArchive]] = {}
+
+    def __init__(self, rasx_path: Path):
+        self.path = Path(rasx_path)
+        try:
+            self._zip = zipfile.ZipFile(str(rasx_path), "r")
+        except zipfile.BadZipFile:
+            err_msg = f"A file with an invalid configuration has been inputted: {rasx_path}"
+            raise StructuredError(err_msg) from None
+        self.members: dict[str, zipfile.ZipInfo] = {info.filename: info for info in self._zip.infolist()}
+        self._files: list[str] | None = None
+
+    @classmethod
+    def open(cls, rasx_path: Path | str) -> RasxArchive:
+        """Get the shared session of a rasx file, opening it on first use.
+
+        Args:
+            rasx_path (Path | str): rasx raw file.
+
+        Returns:
+            RasxArchive: The open archive.
+
+        """
+        key = os.path.abspath(rasx_path)
+        session = cls._sessions.get(key)
+        if session is None:
+            session = cls._sessions[key] = cls(Path(rasx_path))
+        return session
+
+    @classmethod
+    def close_session(cls, rasx_path: Path | str) -> None:
+        """Close the shared session of a rasx file if it is open.
+
+        Args:
+            rasx_path (Path | str): rasx raw file.
+
+        """
+        session = cls._sessions.pop(os.path.abspath(rasx_path), None)
+        if session is not None:
+            session.close()
+
+    @classmethod
+    def close_all(cls) -> None:
+        """Close every shared session."""
+        for key in list(cls._sessions):
+            cls.close_session(key)
+
+    def close(self) -> None:
+        """Close the zip handle."""
+        self._zip.close()
+
+    @property
+    def files(self) -> list[str]:
+        """Data files listed in the ContentHashList of root.xml (parsed on first access).
+
+        Raises:
+            StructuredError: If an input rasx has an invalid configuration.
+
+        """
+        if self._files is None:
+            root_xml_files = [name for name in self.members if name.startswith("root.")]
+            if not root_xml_files:
+                err_msg = "A file with an invalid configuration has been inputted."
+                raise StructuredError(err_msg)
+            self._files = self._filter_list_from_rootxml_content(Root.from_xml(self.read(root_xml_files[0])))
+        return self._files
+
+    def read(self, file_name: str) -> bytes:
+        """Read a member of the archive.
+
+        Args:
+            file_name (str): name of the target file
+
+        Returns:
+            bytes: contents of the member
+
+        """
+        return self._zip.read(self._get_member(file_name))
+
+    def open_member(self, file_name: str) -> IO[bytes]:
+        """Open a member of the archive as a binary stream.
+
+        Args:
+            file_name (str): name of the target file
+
+        Returns:
+            IO[bytes]: stream of the decompressed member
+
+        """
+        return self._zip.open(self._get_member(file_name))
+
+    def _get_member(self, file_name: str) -> zipfile.ZipInfo:
+        """Look up a member in the central directory index."""
+        try:
+            return self.members[file_name]
+        except KeyError:
+            err_msg = f"File not found in rasx: {file_name}"
+            raise StructuredError(err_msg) from None
+
+    def _filter_list_from_rootxml_content(self, root_xml_obj: Root | None) -> list[str]:
+        """Filter list from rootxml content.
+
+        Args:
+            root_xml_obj (Root | None): Root xml object.
+
+        Returns:
+            list[str]: Filtered list.
+
+        Raises:
+            StructuredError: If the file is formatted incorrectly.
+
+        Note:
+            The files contained in the rasx are those stored in the ContentHashList of root.xml.
+            Since rasx only contains two elements, it filters by data0 and data1.
+
+        """
+        if root_xml_obj is None or (root_xml_obj.data0 is None and root_xml_obj.data1 is None):
+            err_msg = "A file with an invalid configuration has been inputted."
+            raise StructuredError(err_msg)
+
+        filtered_list = []
+        filtered_list.extend(self._extract_paths_from_data(root_xml_obj.data0, "Data0"))
+        filtered_list.extend(self._extract_paths_from_data(root_xml_obj.data1, "Data1"))
+
+        if not filtered_list:
+            err_msg = "A file with an invalid configuration has been inputted."
+            raise StructuredError(err_msg)
+
+        return filtered_list
+
+    def _extract_paths_from_data(self, data_obj: Data0 | Data1 | None, data_prefix: str) -> list[str]:
+        """Extract paths from a data object.
+
+        Args:
+            data_obj: The data object containing contenthashlist.
+            data_prefix (str): The prefix to be added to the data paths.
+
+        Returns:
+            list[str]: A list of data paths.
+
+        """
+        if data_obj is None:
+            return []
+
+        paths = []
+        for contentslist in data_obj.contenthashlist:
+            dataname = contentslist.get("Name")
+            if dataname:
+                datapath = os.path.join(data_prefix, dataname)
+                paths.append(datapath)
+
+        return paths
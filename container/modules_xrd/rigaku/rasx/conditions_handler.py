@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+import io
+from collections.abc import Collection
+from typing import Any, Final
+
+from pydantic import BaseModel
+from pydantic_xml.element.native import etree
+from rdetoolkit.exceptions import StructuredError
+
+from modules_xrd.models import (
+    Axis,
+    Category,
+    Detector,
+    Distance,
+    GeneralInformation,
+    MeasurementConditions,
+    Optics,
+    ScanInformation,
+    String,
+    XrayGenerator,
+    normalize_axis_name,
+    normalize_wave_type,
+)
+
+ROOT_TAG: Final[str] = "MeasurementConditions"
+
+# Elements the MeasurementConditions model requires (ScanInformation/AxisName is checked with the field).
+REQUIRED_SECTIONS: Final[tuple[str, ...]] = ("GeneralInformation", "HWConfigurations", "Axes", "ScanInformation", "RASHeader")
+REQUIRED_HWCONFIGURATIONS: Final[tuple[str, ...]] = ("Categories", "Distances", "XrayGenerator", "Detector")
+
+# Text accepted for boolean elements, as pydantic reads them.
+TRUE_VALUES: Final[frozenset[str]] = frozenset({"1", "on", "t", "true", "y", "yes"})
+FALSE_VALUES: Final[frozenset[str]] = frozenset({"0", "off", "f", "false", "n", "no"})
+
+
+def parse_measurement_conditions(xml_data: bytes | str, *, validate: bool = False) -> dict[str, Any]:
+    """Read MesurementConditions*.xml into the mapping MeasurementConditions.model_dump() returns.
+
+    The XML is read with iterparse of the XML backend pydantic_xml uses (lxml if installed, otherwise ElementTree),
+    collecting the first element of each top-level section as its end tag is reached. The elements and attributes
+    of a section are those of the fields of the corresponding model in modules_xrd.models (in the same order,
+    with the same defaults), and WaveType and AxisName are normalized as the model validators do. The elements the model
+    requires are checked, so that a file the model rejects is not read with defaults. With validate, the pydantic model is built instead.
+
+    Args:
+        xml_data (bytes | str): textualized XML data
+        validate (bool): Validate the XML against the MeasurementConditions model.
+
+    Returns:
+        dict[str, Any]: Nested mapping of the metadata (sections, lists of repeated elements and leaf values).
+
+    Raises:
+        StructuredError: If the XML is not a MesurementConditions file or lacks an element the model requires
+            (e.g. a truncated file).
+
+    """
+    if validate:
+        return MeasurementConditions.from_xml(xml_data.encode("utf-8") if isinstance(xml_data, str) else xml_data).model_dump()
+
+    sections: dict[str, etree.Element] = {}
+    depth = 0
+    source = io.BytesIO(xml_data.encode("utf-8") if isinstance(xml_data, str) else xml_data)
+    try:
+        for event, elem in etree.iterparse(source, events=("start", "end")):
+            if event == "start":
+                depth += 1
+                if depth == 1 and elem.tag != ROOT_TAG:
+                    err_msg = f"Could not read metadata [xml]: unexpected root element {elem.tag}"
+                    raise StructuredError(err_msg)
+                continue
+            depth -= 1
+            if depth == 1:
+                # The first section of each name is used, as pydantic_xml does.
+                sections.setdefault(elem.tag, elem)
+    except etree.ParseError as e:
+        err_msg = f"Could not read metadata [xml]: {e}"
+        raise StructuredError(err_msg) from None
+
+    _check_required(REQUIRED_SECTIONS, sections)
+    hwconfigurations = sections["HWConfigurations"]
+    _check_required(REQUIRED_HWCONFIGURATIONS, {child.tag for child in hwconfigurations}, parent="HWConfigurations/")
+    # The lists the model requires have at least one element.
+    for path, container, name in (
+        ("Axes/", sections["Axes"], "Axis"),
+        ("HWConfigurations/Categories/", hwconfigurations.find("Categories"), "Category"),
+        ("HWConfigurations/Distances/", hwconfigurations.find("Distances"), "Distance"),
+    ):
+        _check_required((name,), {child.tag for child in container}, parent=path)
+
+    return {
+        "generalinformation": _element_values(sections.get("GeneralInformation"), GeneralInformation),
+        "hwconfigurations": {
+            "categories": _list_values(hwconfigurations.find("Categories"), "category", "Category", Category),
+            "distances": _list_values(hwconfigurations.find("Distances"), "distance", "Distance", Distance),
+            "xraygenerator": _optional_element_values(hwconfigurations.find("XrayGenerator"), XrayGenerator),
+            "detector": _optional_element_values(hwconfigurations.find("Detector"), Detector),
+            "optics": _element_values(hwconfigurations.find("Optics"), Optics) if hwconfigurations.find("Optics") is not None else "",
+        },
+        "axes": _list_values(sections.get("Axes"), "axis", "Axis", Axis),
+        "scaninformation": _element_values(sections.get("ScanInformation"), ScanInformation),
+        "rasheader": _list_values(sections.get("RASHeader"), "Pair", "Pair", String),
+        "sampleinformation": _text(sections.get("SampleInformation")) or "",
+    }
+
+
+def _check_required(names: tuple[str, ...], tags: Collection[str], *, parent: str = "") -> None:
+    """Check that the elements the model requires are among the tags read."""
+    for name in names:
+        if name not in tags:
+            err_msg = f"Could not read metadata [xml]: {parent}{name} is missing"
+            raise StructuredError(err_msg)
+
+
+def _element_values(element: etree.Element | None, model: type[BaseModel]) -> dict[str, Any]:
+    """Read the child elements named after the fields of a model (the defaults for missing ones)."""
+    values: dict[str, Any] = {}
+    for name, field in model.model_fields.items():
+        text = _text(element.find(name)) if element is not None else None
+        if not text:
+            if field.is_required():
+                err_msg = f"Could not read metadata [xml]: {name} is missing"
+                raise StructuredError(err_msg)
+            values[name] = field.get_default(call_default_factory=True)
+        elif field.annotation is bool:
+            values[name] = _to_bool(name, text)
+        else:
+            values[name] = text
+
+    if values.get("WaveType") and model is XrayGenerator:
+        values["WaveType"] = normalize_wave_type(values["WaveType"])
+    if model is ScanInformation:
+        values["AxisName"] = normalize_axis_name(values["AxisName"])
+    return values
+
+
+def _optional_element_values(element: etree.Element | None, model: type[BaseModel]) -> dict[str, Any] | None:
+    """Read an element like _element_values, None when it is missing."""
+    return None if element is None else _element_values(element, model)
+
+
+def _attribute_values(element: etree.Element, model: type[BaseModel]) -> dict[str, Any]:
+    """Read the attributes named after the fields of a model (the defaults for missing ones)."""
+    return {name: element.get(name, field.get_default(call_default_factory=True)) for name, field in model.model_fields.items()}
+
+
+def _list_values(element: etree.Element | None, key: str, tag: str, model: type[BaseModel]) -> dict[str, Any] | None:
+    """Read the repeated child elements of a container (e.g. Categories/Category) into {key: [...]}."""
+    if element is None:
+        return None
+    if model is String:
+        return {key: [_element_values(child, model) for child in element.iterfind(tag)]}
+    return {key: [_attribute_values(child, model) for child in element.iterfind(tag)]}
+
+
+def _text(element: etree.Element | None) -> str | None:
+    """Get the text of an element up to its first child."""
+    return None if element is None else element.text
+
+
+def _to_bool(name: str, text: str) -> bool:
+    """Convert the text of a boolean element."""
+    if text.lower() in TRUE_VALUES:
+        return True
+    if text.lower() in FALSE_VALUES:
+        return False
+    err_msg = f"Could not read metadata [xml]: {name} is not a boolean: {text}"
+    raise StructuredError(err_msg)
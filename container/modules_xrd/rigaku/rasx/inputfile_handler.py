@@ -1,17 +1,19 @@
 from __future__ import annotations
 
 import os
-import zipfile
 from collections.abc import Generator
 from pathlib import Path
-from typing import cast
+from typing import Any
 
+import numpy as np
 import pandas as pd
 from rdetoolkit.exceptions import StructuredError
 
 from modules_xrd.inputfile_handler import FileReader as XrdFileReader
 from modules_xrd.interfaces import ExtendMetaType
-from modules_xrd.models import Data0, Data1, MeasurementConditions, Root
+from modules_xrd.rigaku.rasx.archive_handler import RasxArchive
+from modules_xrd.rigaku.rasx.conditions_handler import parse_measurement_conditions
+from modules_xrd.rigaku.rasx.profile_handler import read_profile
 
 
 class FileReader(XrdFileReader):
@@ -22,10 +24,11 @@ class FileReader(XrdFileReader):
 
     Args:
         Attributes:
-        data (dict[str, pd.DataFrame]): Stores the measurement data contained in Profile*.xml files,
-                                        converted into pandas.DataFrame format.
-        meta (dict[str, list[str]]): Stores the settings file used during measurement,
-                                     contained in MeasurementConditions*.xml files, as an ExtendMetaType.
+        data (dict[str, pd.DataFrame]): Stores the measurement data contained in Profile*.txt files,
+                                        as angle and intensity x attenuation columns.
+        meta (dict[str, dict[str, Any]]): Stores the settings file used during measurement,
+                                          contained in MeasurementConditions*.xml files, as the mapping
+                                          MeasurementConditions.model_dump() returns.
 
     """
 
@@ -33,7 +36,7 @@ class FileReader(XrdFileReader):
 
     def __init__(self, config: dict):
         super().__init__(config)
-        self.meta: dict[str, MeasurementConditions] = {}
+        self.meta: dict[str, dict[str, Any]] = {}
 
     def read(self, srcpath: Path) -> Generator[tuple[pd.DataFrame, ExtendMetaType], None, None]:
         """Read the structured file and returns separated data and metadata.
@@ -76,29 +79,26 @@ class FileReader(XrdFileReader):
         self.region_num = len([f for f in self.get_files_from_rasx(input_path) if "Profile" in f])
         return self.region_num
 
-    def get_metadata(self, rasx_path: Path) -> dict[str, MeasurementConditions]:
+    def get_metadata(self, rasx_path: Path) -> dict[str, dict[str, Any]]:
         """Get metadata from compressed files.
 
         Args:
             rasx_path (Path): rasx raw file
 
         Yields:
-            Tuple[str, MeasurementConditions]: the target file name and metadata within the compressed file
+            Tuple[str, dict[str, Any]]: the target file name and metadata within the compressed file
 
         Note:
-            If you change the data class MeasurementConditions to a dictionary type:
-            >>> rasx = SimpleRasxHangler('test.rasx')
-            >>> for filename, meta in rasx.get_metadata():
-            >>>     # convert dataclass to dict
-            >>>     print(meta.dict())
+            The XML is read directly into the mapping MeasurementConditions.model_dump() returns.
+            When rasx_xml_validation is enabled in rdeconfig.yaml, the MeasurementConditions model is built
+            and validated instead.
 
         """
         metadata_files = [f for f in self.get_files_from_rasx(rasx_path) if "MesurementConditions" in f]
-        self.metadata_map: dict[str, MeasurementConditions] = {}
+        self.metadata_map: dict[str, dict[str, Any]] = {}
         for filename in metadata_files:
             xml_data = self.open_file(filename, rasx_path)
             convert_xml_to_meta = self.__extract_metadata_from_xml(xml_data)
-            convert_xml_to_meta = cast(MeasurementConditions, convert_xml_to_meta)
             if convert_xml_to_meta is not None:
                 self.metadata_map[filename] = convert_xml_to_meta
             else:
@@ -115,36 +115,42 @@ class FileReader(XrdFileReader):
         Return:
             Tuple[str, pd.DataFrame]: the target file name and mesurementdata within the compressed file
 
+        Note:
+            The arrays of each profile are sized from the DataCount of the metadata of the same region,
+            when the metadata has been read.
+
         """
         files = [f for f in self.get_files_from_rasx(rasx_path) if "Profile" in f]
+        data_counts = [self._get_data_count(meta) for meta in self.meta.values()]
         self.data_maps: dict[str, pd.DataFrame] = {}
-        for file in files:
-            data = self.open_compressedfile_dataframe(file, rasx_path)
+        for i, file in enumerate(files):
+            data = self.open_compressedfile_dataframe(file, rasx_path, data_count=data_counts[i] if i < len(data_counts) else None)
             self.data_maps[file] = data
         return self.data_maps
 
-    def make_header(self, header_info: MeasurementConditions) -> list[str]:
+    def make_header(self, header_info: dict[str, Any]) -> list[str]:
         """Make a header using provided header information.
 
         Args:
-            header_info (MeasurementConditions): The header information dictionary.
+            header_info (dict[str, Any]): The header information dictionary.
 
         Returns:
             list[str]: The constructed header string.
 
         """
+        scaninformation = header_info["scaninformation"]
         x_label = self.config['xrd']['meas_scan_axis_x']
         if not x_label:
-            x_label = header_info.scaninformation.AxisName
+            x_label = scaninformation["AxisName"]
         x_unit = self.config['xrd']['meas_scan_unit_x']
         if not x_unit:
-            x_unit = header_info.scaninformation.PositionUnit
+            x_unit = scaninformation["PositionUnit"]
         y_label = self.config['xrd']['meas_scan_axis_y']
         if not y_label:
             y_label = "Intensity"
         y_unit = self.config['xrd']['meas_scan_unit_y']
         if not y_unit:
-            y_unit = header_info.scaninformation.IntensityUnit
+            y_unit = scaninformation["IntensityUnit"]
         return [f"{x_label} ({x_unit})", f"{y_label} ({y_unit})"]
 
     def reformat_dataframe(
@@ -153,28 +159,23 @@ class FileReader(XrdFileReader):
         *,
         header: list[str] | None = None,
     ) -> pd.DataFrame:
-        """Reformat data frames. Multiply the second and third columns of measured data and add a header.
+        """Reformat data frames. Add a header to the angle and intensity x attenuation columns.
 
         Args:
-            data (pd.DataFrame): Data frame to be reformatted.
+            data (pd.DataFrame): Data frame read by open_compressedfile_dataframe.
             header (list[str] | None): header of the CSV file.
 
         Returns:
             pd.DataFrame: Reformatted data frame.
 
         """
-        data[3] = data.iloc[:, 1] * data.iloc[:, 2]
-        reformat_dataframe = pd.concat([data.iloc[:, 0].round(4), data.iloc[:, 3]], axis=1)
-        if header:
-            reformat_dataframe.columns = header
-        else:
+        if not header:
             _meta = list(self.metadata_map.values())[0]
             header = [
-                _meta.scaninformation.AxisName,
-                f"Intensity[{_meta.scaninformation.IntensityUnit}]",
+                _meta["scaninformation"]["AxisName"],
+                f"Intensity[{_meta['scaninformation']['IntensityUnit']}]",
             ]
-            reformat_dataframe.columns = header
-        return reformat_dataframe
+        return data.set_axis(header, axis=1)
 
     def get_files_from_rasx(self, rasx_path: Path) -> list[str]:
         """Get all file names in a .rasx file.
@@ -190,15 +191,10 @@ class FileReader(XrdFileReader):
             (such as not containing the correct file), an exception will be raised.
 
         Note:
-            The files contained in the rasx are those stored in the ContentHashList of root.xml.
-            Since rasx only contains two elements, it filters by data0 and data1.
+            root.xml is parsed only once per archive session.
 
         """
-        with zipfile.ZipFile(str(rasx_path), "r") as rasx:
-            root_xml_files = [name for name in rasx.namelist() if name.startswith("root.")]
-            contents = self.open_file(root_xml_files[0], rasx_path)
-        instance = Root.from_xml(contents)
-        return self.__filter_list_from_rootxml_content(instance)
+        return RasxArchive.open(rasx_path).files
 
     def open_file(self, file_name: str, rasx_path: Path) -> bytes | str:
         """Open a specific file stored in a .rasx file.
@@ -212,85 +208,55 @@ class FileReader(XrdFileReader):
 
         """
         _, ext = os.path.splitext(file_name)
-        with zipfile.ZipFile(str(rasx_path), "r") as rasx, rasx.open(file_name) as frasx:
-            contents = frasx.read()
+        contents = RasxArchive.open(rasx_path).read(file_name)
 
         if ext in [".rasx", ".zip"]:
             return contents
         return contents.decode("utf-8")
 
-    def open_compressedfile_dataframe(self, file_name: str, rasx_path: Path) -> pd.DataFrame:
-        """Get a text file from a compressed file (rasx) and create a data frame.
+    def open_compressedfile_dataframe(self, file_name: str, rasx_path: Path, *, data_count: int | None = None) -> pd.DataFrame:
+        """Get a profile from a compressed file (rasx) as a data frame of angle and intensity x attenuation.
+
+        The profile is decoded from the member stream straight into arrays (see read_profile),
+        and the angle is rounded to 4 decimals in place.
 
         Args:
             file_name (str): text file to be converted into a data frame
             rasx_path (Path): rasx raw file
+            data_count (int | None): Number of points of the profile, None if unknown.
 
         Returns:
             pd.DataFrame: data frame read from file
 
         """
-        with zipfile.ZipFile(str(rasx_path), "r") as cmpf, cmpf.open(file_name) as f:
-            return pd.read_csv(f, sep="\t", header=None)
+        with RasxArchive.open(rasx_path).open_member(file_name) as f:
+            angle, intensity = read_profile(f, data_count=data_count)
+        if angle.dtype.kind == "f":
+            np.round(angle, 4, out=angle)
+        return pd.DataFrame({0: angle, 1: intensity}, copy=False)
 
-    def __filter_list_from_rootxml_content(self, root_xml_obj: Root | None) -> list[str]:
-        """Filter list from rootxml content.
+    def _get_data_count(self, meta: dict[str, Any]) -> int | None:
+        """Get the number of points of a region from ScanInformation/DataCount, None if it is not a number."""
+        data_count = meta["scaninformation"]["DataCount"]
+        return int(data_count) if data_count.isdigit() else None
 
-        Args:
-            root_xml_obj (Root | None): Root xml object.
-
-        Returns:
-            list[str]: Filtered list.
-
-        Raises:
-            StructuredError: If the file is formatted incorrectly.
-
-        """
-        if root_xml_obj is None or (root_xml_obj.data0 is None and root_xml_obj.data1 is None):
-            err_msg = "A file with an invalid configuration has been inputted."
-            raise StructuredError(err_msg)
-
-        filtered_list = []
-        filtered_list.extend(self._extract_paths_from_data(root_xml_obj.data0, "Data0"))
-        filtered_list.extend(self._extract_paths_from_data(root_xml_obj.data1, "Data1"))
-
-        if not filtered_list:
-            err_msg = "A file with an invalid configuration has been inputted."
-            raise StructuredError(err_msg)
-
-        return filtered_list
-
-    def _extract_paths_from_data(self, data_obj: Data0 | Data1 | None, data_prefix: str) -> list[str]:
-        """Extract paths from a data object.
+    def close(self, srcpath: Path) -> None:
+        """Close the archive session of the rasx file.
 
         Args:
-            data_obj: The data object containing contenthashlist.
-            data_prefix (str): The prefix to be added to the data paths.
-
-        Returns:
-            list[str]: A list of data paths.
+            srcpath (Path): rasx raw file
 
         """
-        if data_obj is None:
-            return []
-
-        paths = []
-        for contentslist in data_obj.contenthashlist:
-            dataname = contentslist.get("Name")
-            if dataname:
-                datapath = os.path.join(data_prefix, dataname)
-                paths.append(datapath)
-
-        return paths
+        RasxArchive.close_session(srcpath)
 
-    def __extract_metadata_from_xml(self, xml_data: bytes | str) -> MeasurementConditions | None:
+    def __extract_metadata_from_xml(self, xml_data: bytes | str) -> dict[str, Any] | None:
         """Extract metadata from XML data stored in compressed files (.rasx).
 
         Args:
             xml_data (bytes | str): textualized XML data
 
         Returns:
-            MeasurementConditions: stores and returns metadata from XML into the data class MeasurementConditions.
+            dict[str, Any]: metadata from XML, in the layout of the data class MeasurementConditions.
 
         """
-        return MeasurementConditions.from_xml(xml_data)
+        return parse_measurement_conditions(xml_data, validate=bool(self.config['xrd'].get('rasx_xml_validation')))
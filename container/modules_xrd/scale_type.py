@@ -0,0 +1,10 @@
+from __future__ import annotations
+
+from enum import Enum
+
+
+class ScaleType(Enum):
+    """Scale of the y-axis of the graph images."""
+
+    log = "log"
+    linear = "linear"
@@ -1,16 +1,37 @@
 from __future__ import annotations
 
 import os
-import zipfile
+import re
 from pathlib import Path
 from typing import Final
 
+import numpy as np
 import pandas as pd
 from rdetoolkit.exceptions import StructuredError
 from rdetoolkit.models.rde2types import RdeOutputResourcePath
 from rdetoolkit.rde2util import CharDecEncoding
 
+from modules_xrd.csv_writer import write_csv
 from modules_xrd.interfaces import IStructuredDataProcessor
+from modules_xrd.output_naming import OutputNames, region_filepath, validate_collision_policy
+
+BINARY_OUTPUT_FORMATS: Final[tuple[str, ...]] = ("npz", "parquet")
+
+
+def split_axis_label(column: str) -> tuple[str, str]:
+    """Split a column name made by make_header into the axis label and unit.
+
+    Args:
+        column (str): Column name such as "2Theta-Theta (deg)".
+
+    Returns:
+        tuple[str, str]: Axis label and unit ("" when the name has no unit).
+
+    """
+    match = re.fullmatch(r"(?P<label>.*?)\s*(?:\((?P<unit>[^()]*)\))?\s*", str(column))
+    if match is None:
+        return str(column).strip(), ""
+    return match.group("label"), match.group("unit") or ""
 
 
 class StructuredDataProcessor(IStructuredDataProcessor):
@@ -32,9 +53,38 @@ class StructuredDataProcessor(IStructuredDataProcessor):
 
     """
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        *,
+        binary_output_format: str | None = None,
+        precision: tuple[int | None, ...] | None = None,
+        collision_policy: str | None = None,
+        prefix_extracted_files: bool = False,
+    ) -> None:
+        """Init.
+
+        Args:
+            binary_output_format (str | None): Format of the binary structured files written alongside the csv
+                ("npz" or "parquet"). None or "" writes csv only.
+            precision (tuple[int | None, ...] | None): Decimals of each column of the csv (see FileReader.CSV_PRECISION).
+            collision_policy (str | None): What to do when two outputs of a run get the same name
+                ("overwrite" or "error", see OUTPUT_NAME_COLLISION_POLICIES). None uses "overwrite".
+            prefix_extracted_files (bool): Name the files extracted from an input file after it (sample_Profile0.txt),
+                so that the files of several inputs processed in one run do not overwrite each other.
+
+        Raises:
+            StructuredError: If the format or the policy is not supported.
+
+        """
         self.df_series_1 = pd.DataFrame()
         self.df_series_2 = pd.DataFrame()
+        if binary_output_format and binary_output_format not in BINARY_OUTPUT_FORMATS:
+            err_msg = f"Unsupported binary_output_format: {binary_output_format}"
+            raise StructuredError(err_msg)
+        self.binary_output_format = binary_output_format or None
+        self.precision = precision
+        self.collision_policy = validate_collision_policy(collision_policy)
+        self.prefix_extracted_files = prefix_extracted_files
 
     def save_csv(
             self,
@@ -42,6 +92,8 @@ class StructuredDataProcessor(IStructuredDataProcessor):
             processing_file: Path,
             dataframe: pd.DataFrame,
             region_num: int,
+            *,
+            region_index: int = 1,
     ) -> None:
         """Save csv.
 
@@ -50,13 +102,81 @@ class StructuredDataProcessor(IStructuredDataProcessor):
             processing_file (Path): processing file.
             dataframe (pd.DataFrame): The data to save.
             region_num (int): Region numbers.
+            region_index (int): Number of the region in the file (1-based).
 
         """
         rename_save_path = self.reindex_savefilename(
             resource_paths.struct.joinpath(f"{processing_file.stem}.csv"),
             region_num=region_num,
+            region_index=region_index,
+        )
+        write_csv(rename_save_path, dataframe, self.precision)
+
+    def save_binary(
+        self,
+        resource_paths: RdeOutputResourcePath,
+        processing_file: Path,
+        dataframe: pd.DataFrame,
+        region_num: int,
+        *,
+        region_index: int = 1,
+    ) -> Path | None:
+        """Save the data as a typed columnar file in the format set by binary_output_format.
+
+        The file is named like the csv (with the npz or parquet extension) and holds float64 columns
+        together with the axis label and unit of each column and the region number.
+
+        - npz: arrays "values" (n x columns), "columns", "labels", "units" and "region".
+        - parquet: one column per csv column with "label" and "unit" field metadata, and "region"
+          and "source" in the schema metadata. Requires pyarrow.
+
+        Args:
+            resource_paths (RdeOutputResourcePath): Paths to output resources for saving results.
+            processing_file (Path): processing file.
+            dataframe (pd.DataFrame): The data to save.
+            region_num (int): Region numbers.
+            region_index (int): Number of the region in the file (1-based).
+
+        Returns:
+            Path | None: Saved file, None when binary output is disabled.
+
+        """
+        if self.binary_output_format is None:
+            return None
+        save_path = self.reindex_savefilename(
+            resource_paths.struct.joinpath(f"{processing_file.stem}.{self.binary_output_format}"),
+            region_num=region_num,
+            region_index=region_index,
+        )
+        columns = [str(column) for column in dataframe.columns]
+        labels, units = zip(*(split_axis_label(column) for column in columns), strict=True) if columns else ((), ())
+        values = dataframe.to_numpy(dtype=np.float64)
+
+        if self.binary_output_format == "npz":
+            with open(save_path, "wb") as f:
+                np.savez(
+                    f,
+                    values=values,
+                    columns=np.array(columns, dtype=str),
+                    labels=np.array(labels, dtype=str),
+                    units=np.array(units, dtype=str),
+                    region=np.int64(region_index),
+                )
+            return save_path
+
+        try:
+            # pyarrow is optional, needed only for this format.
+            import pyarrow as pa  # noqa: PLC0415
+            import pyarrow.parquet as pq  # noqa: PLC0415
+        except ImportError:
+            err_msg = "pyarrow is required for binary_output_format: parquet"
+            raise StructuredError(err_msg) from None
+        schema = pa.schema(
+            [pa.field(column, pa.float64(), metadata={"label": label, "unit": unit}) for column, label, unit in zip(columns, labels, units, strict=True)],
+            metadata={"region": str(region_index), "source": processing_file.name},
         )
-        dataframe.to_csv(rename_save_path, index=False)
+        pq.write_table(pa.Table.from_arrays([pa.array(values[:, i]) for i in range(len(columns))], schema=schema), save_path)
+        return save_path
 
     def save_structured_contents(
         self,
@@ -73,51 +193,35 @@ class StructuredDataProcessor(IStructuredDataProcessor):
 
         Note:
             In RDE, the structured folder includes all files that are not included in main_image or other_image and should be outputted.
+            With prefix_extracted_files, the name of the processing file is put in front of each name (e.g. sample_Profile0.txt).
 
         """
         for cmpfile in compressed_files:
             basename = self._get_basename(cmpfile)
+            if self.prefix_extracted_files:
+                basename = f"{processing_file.stem}_{basename}"
             contents = self._read_compressed_contents(str(cmpfile), str(processing_file)) \
                 if processing_file is not None \
                 else self._read_text_contents(cmpfile)
-            self._write_contents(resource_paths.struct.joinpath(basename), contents)
+            save_path = OutputNames.claim(resource_paths.struct.joinpath(basename), policy=self.collision_policy)
+            self._write_contents(save_path, contents)
 
-    def reindex_savefilename(self, filepath: str | Path, region_num: int) -> Path:
+    def reindex_savefilename(self, filepath: str | Path, region_num: int, *, region_index: int = 1) -> Path:
         """Indexing file names.
 
+        The name is made from the region number (see region_filepath) and checked against
+        the collision policy, without looking at the file system.
+
         Args:
             filepath (str | Path): File name before renaming.
             region_num (int): Region numbers.
+            region_index (int): Number of the region in the file (1-based).
 
         Returns:
             Path: Renamed file name.
 
         """
-        single_region_num: Final[int] = 1
-        multi_region_num: Final[int] = 2
-
-        if isinstance(filepath, str):
-            filepath = Path(filepath)
-
-        if region_num > multi_region_num or region_num < single_region_num:
-            err_msg = f"illegal region number: {region_num}"
-            raise StructuredError(err_msg)
-        if region_num == single_region_num:
-            return filepath
-
-        dirname = filepath.parent
-        basename = filepath.stem
-        suffix = filepath.suffix
-
-        idx = 1
-        while True:
-            new_filename = f"{basename}_{idx}{suffix}"
-            new_filepath = dirname / new_filename
-            if not new_filepath.exists():
-                break
-            idx += 1
-
-        return new_filepath
+        return OutputNames.claim(region_filepath(filepath, region_num, region_index=region_index), policy=self.collision_policy)
 
     def _get_basename(self, src_path: str | Path) -> str:
         """Get the basename of the source path."""
@@ -127,8 +231,10 @@ class StructuredDataProcessor(IStructuredDataProcessor):
 
     def _read_compressed_contents(self, src_path: str, compressed_filepath: str) -> str:
         """Read the contents of a compressed file."""
-        with zipfile.ZipFile(compressed_filepath, "r") as rasx, rasx.open(src_path) as frasx:
-            contents_bytes = frasx.read()
+        # The rasx modules (and pydantic_xml) are imported only when a rasx is processed.
+        from modules_xrd.rigaku.rasx.archive_handler import RasxArchive  # noqa: PLC0415
+
+        contents_bytes = RasxArchive.open(compressed_filepath).read(src_path)
         _, ext = os.path.splitext(src_path)
         contents = contents_bytes.decode("utf-8") if ext not in [".rasx", ".zip"] else ""
         if not contents and isinstance(contents_bytes, bytes):
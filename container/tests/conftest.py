@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import json
+import shutil
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+import yaml
+from rdetoolkit import workflows
+
+from modules.datasets_process import dataset
+
+TESTS_DIR = Path(__file__).parent
+INPUTS_DIR = TESTS_DIR / "data" / "inputs"
+EXPECTED_DIR = TESTS_DIR / "data" / "expected"
+TEMPLATE_DIR = TESTS_DIR.parents[1] / "template"
+INVOICE_SAMPLE = TESTS_DIR.parents[1] / "tryout" / "invoice_sample.json"
+
+
+def make_data_dir(root: Path, inputs: list[Path], *, manufacturer: str = "rigaku", settings: dict | None = None) -> Path:
+    """Lay out data/ like an RDE job: inputdata, invoice and the tasksupport of the template."""
+    data_dir = root / "data"
+    for name in ("inputdata", "invoice", "tasksupport"):
+        (data_dir / name).mkdir(parents=True)
+    for path in (TEMPLATE_DIR / manufacturer / "tasksupport").iterdir():
+        shutil.copy(path, data_dir / "tasksupport")
+
+    invoice = json.loads(INVOICE_SAMPLE.read_text(encoding="utf-8"))
+    invoice["custom"]["measurement_measured_date"] = None
+    (data_dir / "invoice" / "invoice.json").write_text(json.dumps(invoice, ensure_ascii=False, indent=4), encoding="utf-8")
+
+    config_path = data_dir / "tasksupport" / "rdeconfig.yaml"
+    config = yaml.safe_load(config_path.read_text(encoding="utf-8"))
+    config["xrd"].update(settings or {})
+    config_path.write_text(yaml.safe_dump(config, allow_unicode=True, sort_keys=False), encoding="utf-8")
+
+    for path in inputs:
+        shutil.copy(path, data_dir / "inputdata")
+    return data_dir
+
+
+@pytest.fixture
+def run_structuring(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Callable[..., tuple[Path, dict]]:
+    """Run the structured processing of main.py on input files in a temporary job directory.
+
+    The returned function takes the input files (names in tests/data/inputs or paths), the manufacturer and
+    xrd settings to add to rdeconfig.yaml, and returns the data directory and the status of the run.
+    When the run stops with a StructuredError, the status is "failed" with the message of data/job.failed.
+    """
+    runs = iter(range(1 << 10))
+
+    def run(inputs: list[str | Path], *, manufacturer: str = "rigaku", settings: dict | None = None) -> tuple[Path, dict]:
+        root = tmp_path / f"job{next(runs)}"
+        data_dir = make_data_dir(root, [INPUTS_DIR / path for path in inputs], manufacturer=manufacturer, settings=settings)
+        monkeypatch.chdir(root)
+        try:
+            status = json.loads(workflows.run(custom_dataset_function=dataset))["statuses"][0]
+        except SystemExit:
+            status = {"status": "failed", "error_message": (data_dir / "job.failed").read_text(encoding="utf-8")}
+        return data_dir, status
+
+    return run
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import json
+import os
+import zipfile
+from pathlib import Path
+
+import pytest
+from rdetoolkit import workflows
+
+from modules.datasets_process import dataset, group_by_output_names
+from modules_xrd.meta_handler import MetaParser
+from tests.conftest import INPUTS_DIR, make_data_dir
+
+
+def read_outputs(data_dir: Path) -> dict[str, bytes]:
+    """Read the structured files and metadata.json, and list the images."""
+    outputs = {f"structured/{path.name}": path.read_bytes() for path in (data_dir / "structured").iterdir()}
+    outputs["meta/metadata.json"] = (data_dir / "meta" / "metadata.json").read_bytes()
+    for dirname in ("main_image", "other_image"):
+        outputs.update((f"{dirname}/{path.name}", b"") for path in (data_dir / dirname).iterdir())
+    return outputs
+
+
+@pytest.mark.parametrize("inputs", [["one_region.rasx", "two_regions.rasx"], ["two_regions.ras", "one_region.rasx", "tab.txt", "space.txt"]])
+def test_parallel_outputs_match_serial(run_structuring, monkeypatch, inputs):
+    serial_dir, status = run_structuring(inputs, settings={"batch_mode": True})
+    assert status["status"] == "success", status
+
+    monkeypatch.setattr(os, "cpu_count", lambda: 4)
+    parallel_dir, status = run_structuring(inputs, settings={"batch_mode": True, "max_workers": 4})
+    assert status["status"] == "success", status
+
+    assert read_outputs(parallel_dir) == read_outputs(serial_dir)
+
+
+def test_extracted_rasx_files_are_named_after_each_input(run_structuring):
+    data_dir, status = run_structuring(["one_region.rasx", "two_regions.rasx"], settings={"batch_mode": True})
+
+    assert status["status"] == "success", status
+    names = {path.name for path in (data_dir / "structured").iterdir()}
+    assert {"one_region_Profile0.txt", "one_region_MesurementConditions0.xml", "two_regions_Profile0.txt", "two_regions_MesurementConditions0.xml"} <= names
+    assert "Profile0.txt" not in names
+
+
+def test_extracted_rasx_files_keep_their_names_for_a_single_input(run_structuring):
+    data_dir, status = run_structuring(["one_region.rasx"])
+
+    assert status["status"] == "success", status
+    assert {"Profile0.txt", "MesurementConditions0.xml"} <= {path.name for path in (data_dir / "structured").iterdir()}
+
+
+def test_files_whose_outputs_may_share_a_name_are_grouped():
+    files = [Path(name) for name in ["a.rasx", "b.ras", "a_1.ras", "a.txt", "a_b_c.txt", "ab.ras", "b_log.uxd", "c.ras"]]
+
+    groups = group_by_output_names(files)
+
+    assert [[path.name for path in group] for group in groups] == [
+        ["a.rasx", "a_1.ras", "a.txt", "a_b_c.txt"],
+        ["b.ras", "b_log.uxd"],
+        ["ab.ras"],
+        ["c.ras"],
+    ]
+
+
+def test_constant_metadata_keeps_the_value_of_the_first_file(tmp_path, monkeypatch):
+    """A constant that differs between the files keeps the value of the first file processed, as the invoice date does."""
+    inputs = []
+    for name, sample in [("a.rasx", "S0"), ("b.rasx", "S9")]:
+        inputs.append(tmp_path / name)
+        with zipfile.ZipFile(INPUTS_DIR / "one_region.rasx") as src, zipfile.ZipFile(inputs[-1], "w") as dst:
+            for member in src.namelist():
+                dst.writestr(member, src.read(member).replace(b"<SampleName>S0</SampleName>", f"<SampleName>{sample}</SampleName>".encode()))
+    data_dir = make_data_dir(tmp_path / "job", inputs, settings={"batch_mode": True})
+    metadata_def_path = data_dir / "tasksupport" / "metadata-def_rigaku_rasx.json"
+    metadata_def = json.loads(metadata_def_path.read_text(encoding="utf-8"))
+    for item in metadata_def.values():
+        item.pop("variable", None)
+    metadata_def_path.write_text(json.dumps(metadata_def, ensure_ascii=False), encoding="utf-8")
+    saved = []
+    save_meta = MetaParser.save_meta
+    monkeypatch.setattr(MetaParser, "save_meta", lambda self, *args, **kwargs: saved.append(kwargs["const_meta_info"]) or save_meta(self, *args, **kwargs))
+    monkeypatch.chdir(data_dir.parent)
+
+    status = json.loads(workflows.run(custom_dataset_function=dataset))["statuses"][0]
+
+    assert status["status"] == "success", status
+    assert [const_meta_info["SampleName"] for const_meta_info in saved] == ["S0"]
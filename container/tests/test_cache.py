@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import shutil
+
+import pytest
+
+import modules.datasets_process
+from modules_xrd.cache_handler import ResultCache
+from tests.conftest import INPUTS_DIR
+from tests.test_batch import read_outputs
+
+
+@pytest.fixture(autouse=True)
+def forget_tracked_sizes(monkeypatch):
+    monkeypatch.setattr(ResultCache, "_tracked_bytes", {})
+
+
+def entry_names(cache_dir) -> list[set[str]]:
+    return [{path.name for path in entry.rglob("*") if path.is_file()} - {"result.json"} for entry in cache_dir.iterdir()]
+
+
+def test_cached_outputs_are_restored_without_processing(tmp_path, run_structuring, monkeypatch):
+    inputs = ["two_regions.ras", "one_region.rasx", "tab.txt"]
+    settings = {"batch_mode": True, "cache_dir": str(tmp_path / "cache")}
+    data_dir, status = run_structuring(inputs, settings=settings)
+    assert status["status"] == "success", status
+
+    def process_file(*_args, **_kwargs):
+        err_msg = "processed again"
+        raise AssertionError(err_msg)
+
+    monkeypatch.setattr(modules.datasets_process, "process_file", process_file)
+    cached_dir, status = run_structuring(inputs, settings=settings)
+
+    assert status["status"] == "success", status
+    assert read_outputs(cached_dir) == read_outputs(data_dir)
+
+
+def test_entry_holds_exactly_the_outputs_of_its_file(tmp_path, run_structuring):
+    # The outputs of a_b.ras (a_b_1.csv, ...) start with the name of a.ras.
+    shutil.copy(INPUTS_DIR / "one_region.ras", tmp_path / "a.ras")
+    shutil.copy(INPUTS_DIR / "two_regions.ras", tmp_path / "a_b.ras")
+    cache_dir = tmp_path / "cache"
+
+    _, status = run_structuring([tmp_path / "a_b.ras", tmp_path / "a.ras"], settings={"batch_mode": True, "cache_dir": str(cache_dir)})
+
+    assert status["status"] == "success", status
+    names = sorted(entry_names(cache_dir), key=len)
+    assert names[0] == {"a.csv", "a.html", "a.png", "a_log.png"}
+    assert "a_b_1.csv" in names[1]
+    assert not names[0] & names[1]
+
+
+def test_restored_outputs_are_checked_for_collisions(tmp_path, run_structuring):
+    shutil.copy(INPUTS_DIR / "two_regions.ras", tmp_path / "sample.ras")
+    shutil.copy(INPUTS_DIR / "two_regions.rasx", tmp_path / "sample.rasx")
+    inputs = [tmp_path / "sample.ras", tmp_path / "sample.rasx"]
+    settings = {"batch_mode": True, "cache_dir": str(tmp_path / "cache")}
+    _, status = run_structuring(inputs, settings=settings)
+    assert status["status"] == "success", status
+
+    _, status = run_structuring(inputs, settings={**settings, "output_name_collision": "error"})
+
+    assert status["status"] == "failed"
+    assert "Output file name collision: sample_" in status["error_message"]
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path, run_structuring):
+    settings = {"batch_mode": True, "cache_dir": str(tmp_path / "cache")}
+    _, status = run_structuring(["one_region.ras", "tab.txt"], settings=settings)
+    assert status["status"] == "success", status
+    sizes = [sum(path.stat().st_size for path in entry.rglob("*") if path.is_file()) for entry in (tmp_path / "cache").iterdir()]
+    shutil.rmtree(tmp_path / "cache")
+
+    _, status = run_structuring(["one_region.ras", "tab.txt"], settings={**settings, "cache_max_bytes": max(sizes)})
+
+    assert status["status"] == "success", status
+    assert list(entry_names(tmp_path / "cache")) == [{"tab.csv", "tab.html", "tab.png", "tab_log.png"}]
+
+
+def test_cache_directory_is_scanned_only_when_the_tracked_total_exceeds_the_limit(tmp_path, run_structuring, monkeypatch):
+    evict = ResultCache.evict
+    scans = []
+    monkeypatch.setattr(ResultCache, "evict", lambda self: scans.append(self) or evict(self))
+
+    _, status = run_structuring(
+        ["one_region.ras", "two_regions.ras", "tab.txt", "space.txt"],
+        settings={"batch_mode": True, "cache_dir": str(tmp_path / "cache")},
+    )
+
+    assert status["status"] == "success", status
+    # The first store scans the directory, and the others add their sizes to the tracked total.
+    assert len(scans) == 1
+    assert len(list((tmp_path / "cache").iterdir())) == 4
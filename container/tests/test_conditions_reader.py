@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import xml.etree.ElementTree as ET
+import zipfile
+
+import pytest
+from rdetoolkit.exceptions import StructuredError
+
+from modules_xrd.rigaku.rasx.conditions_handler import parse_measurement_conditions
+from tests.conftest import INPUTS_DIR
+
+
+def read_conditions() -> bytes:
+    with zipfile.ZipFile(INPUTS_DIR / "one_region.rasx") as archive:
+        return archive.read("Data0/MesurementConditions0.xml")
+
+
+def remove(xml_data: bytes, path: str) -> bytes:
+    """Remove the element at the path (the children of a container when the path ends with /*)."""
+    root = ET.fromstring(xml_data)
+    parent_path, _, name = path.rpartition("/")
+    parent = root.find(parent_path) if parent_path else root
+    for child in parent.findall(name):
+        parent.remove(child)
+    return ET.tostring(root)
+
+
+def test_conditions_are_read_like_the_model():
+    xml_data = read_conditions()
+
+    assert parse_measurement_conditions(xml_data) == parse_measurement_conditions(xml_data, validate=True)
+
+
+@pytest.mark.parametrize(
+    "path",
+    [
+        "GeneralInformation",
+        "HWConfigurations",
+        "HWConfigurations/Categories",
+        "HWConfigurations/Distances",
+        "HWConfigurations/XrayGenerator",
+        "HWConfigurations/Detector",
+        "HWConfigurations/Categories/*",
+        "HWConfigurations/Distances/*",
+        "Axes/*",
+        "ScanInformation",
+        "RASHeader",
+    ],
+)
+def test_elements_the_model_requires_are_checked(path):
+    xml_data = remove(read_conditions(), path)
+
+    with pytest.raises(Exception, match="Field required"):
+        parse_measurement_conditions(xml_data, validate=True)
+    with pytest.raises(StructuredError, match=f"{path.removesuffix('/*').split('/')[-1]}.* is missing"):
+        parse_measurement_conditions(xml_data)
+
+
+def test_truncated_conditions_are_rejected():
+    xml_data = read_conditions()
+    # Cut in the middle of the file, and after the first sections with the root element closed.
+    sections_only = remove(remove(remove(xml_data, "ScanInformation"), "RASHeader"), "Axes")
+
+    with pytest.raises(StructuredError, match="Could not read metadata"):
+        parse_measurement_conditions(xml_data[: len(xml_data) // 2])
+    with pytest.raises(StructuredError, match="Axes is missing"):
+        parse_measurement_conditions(sections_only)
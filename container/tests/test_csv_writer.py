@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules_xrd.csv_writer import round_decimals, write_csv
+
+
+def test_round_decimals_rounds_as_formatting():
+    """Values whose scaled product lies near a half-way point are rounded as f"{value:.4f}" does, unlike np.round."""
+    values = np.round(np.random.default_rng(0).uniform(0, 40000, 100_000), 3) * 2.4466
+    values = np.concatenate([values, [1505.2225 * 2.4466, 12803.2145 * 2.4466, 0.00005, 2.5, -0.00015, 1e17]])
+
+    expected = np.array([float(f"{value:.4f}") for value in values])
+
+    assert np.array_equal(round_decimals(values, 4), expected)
+    assert not np.array_equal(np.round(values, 4), expected)
+
+
+def test_round_decimals_keeps_non_finite_values():
+    rounded = round_decimals(np.array([np.nan, np.inf, -np.inf, 1.23456]), 4)
+
+    assert np.isnan(rounded[0])
+    assert rounded[1:].tolist() == [np.inf, -np.inf, 1.2346]
+
+
+@pytest.mark.parametrize(
+    "values",
+    [
+        np.round(np.random.default_rng(1).uniform(-1000, 1000, 5000), 4),
+        np.round(np.random.default_rng(2).uniform(0, 40000, 5000), 3) * 2.4466,
+        np.array([0.0, -0.0, 1e-4, 0.5, 10.0, 1e14, 123456789.123, 1e-5, np.nan, 1e20]),
+    ],
+)
+def test_write_csv_matches_pandas(tmp_path, values):
+    """The text is the same as DataFrame.to_csv whether the digit path or the repr path is taken."""
+    dataframe = pd.DataFrame({"x": np.arange(len(values)) * 0.01 + 10.0, "y": values})
+
+    write_csv(tmp_path / "fast.csv", dataframe, chunk_rows=1000)
+    dataframe.to_csv(tmp_path / "pandas.csv", index=False)
+
+    assert (tmp_path / "fast.csv").read_bytes() == (tmp_path / "pandas.csv").read_bytes()
+
+
+def test_write_csv_rounds_precision_columns_as_formatting(tmp_path):
+    """A column with a precision is written as float(f"{value:.4f}") would be."""
+    values = np.round(np.random.default_rng(3).uniform(0, 40000, 5000), 3) * 2.4466
+    dataframe = pd.DataFrame({"x": np.arange(len(values)) * 0.01, "y": values})
+
+    write_csv(tmp_path / "fast.csv", dataframe, (None, 4))
+
+    rows = (tmp_path / "fast.csv").read_text().splitlines()[1:]
+    assert [row.split(",")[1] for row in rows] == [repr(float(f"{value:.4f}")) for value in values]
@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import yaml
+
+from modules_xrd.factory import XrdFactory
+from tests.conftest import INPUTS_DIR, make_data_dir
+
+# Its utf-8 bytes also decode as cp932 (to "驟ｸ蛹悶メ繧ｿ繝ｳ"), so a file read with the encoding of another file is not rejected.
+JAPANESE_SAMPLE = "酸化チタン"
+
+
+def write_txt(path, encoding):
+    """Write tab.txt with a Japanese sample name in the given encoding."""
+    contents = (INPUTS_DIR / "tab.txt").read_text(encoding="utf-8").replace("Sample\tS1", f"Sample\t{JAPANESE_SAMPLE}")
+    path.write_bytes(contents.encode(encoding))
+
+
+def test_reused_reader_gets_the_settings_of_each_file(tmp_path):
+    data_dir = make_data_dir(tmp_path, [])
+    resource_paths = SimpleNamespace(invoice_org=data_dir / "invoice" / "invoice.json")
+    config = yaml.safe_load((data_dir / "tasksupport" / "rdeconfig.yaml").read_text(encoding="utf-8"))
+    modules = {}
+
+    for encoding in ("shift_jis", "utf_8"):
+        path = tmp_path / f"{encoding}.txt"
+        write_txt(path, encoding)
+        file_config = XrdFactory.get_file_config(config, path, resource_paths)
+        _, module = XrdFactory.get_objects(path, data_dir / "tasksupport", file_config, modules=modules)
+
+        assert module.file_reader.config["xrd"]["encoding"] == file_config["xrd"]["encoding"]
+        assert module.meta_parser.config is file_config
+        [(_, meta)] = module.file_reader.read(path)
+        assert JAPANESE_SAMPLE in str(meta)
+
+    assert len(modules) == 1
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import shutil
+import zipfile
+
+import pytest
+from rdetoolkit.exceptions import StructuredError
+
+from modules_xrd.format_sniffer import is_ras, is_rasx, is_rigaku_txt, is_uxd
+from modules_xrd.inputfile_handler import FileReader
+from modules_xrd.reader_registry import ReaderRegistry
+from tests.conftest import INPUTS_DIR
+from tests.test_outputs import expected_csv
+
+SNIFFERS = {".rasx": is_rasx, ".ras": is_ras, ".txt": is_rigaku_txt, ".uxd": is_uxd}
+
+
+@pytest.mark.parametrize("name", ["one_region.ras", "one_region.rasx", "tab.txt", "space.txt", "sample.uxd"])
+def test_only_the_sniffer_of_the_format_matches(name):
+    path = INPUTS_DIR / name
+    head = FileReader.read_head(path)
+
+    assert {suffix for suffix, sniffer in SNIFFERS.items() if sniffer(head, path)} == {path.suffix}
+
+
+@pytest.mark.parametrize(
+    ("name", "misnamed", "manufacturer", "expected"),
+    [
+        ("one_region.rasx", "sample.ras", "rigaku", ".rasx"),
+        ("one_region.ras", "sample.txt", "rigaku", ".ras"),
+        ("tab.txt", "sample.ras", "rigaku", ".txt"),
+        ("space.txt", "sample.rasx", "rigaku", ".txt"),
+        ("sample.uxd", "sample.UXD", "bruker", ".uxd"),
+    ],
+)
+def test_misnamed_file_is_detected_from_its_contents(tmp_path, name, misnamed, manufacturer, expected):
+    path = tmp_path / misnamed
+    shutil.copy(INPUTS_DIR / name, path)
+
+    assert ReaderRegistry.detect_format(path, manufacturer) == expected
+
+
+def test_file_of_another_manufacturer_is_rejected_with_a_hint(tmp_path):
+    path = tmp_path / "sample.ras"
+    shutil.copy(INPUTS_DIR / "sample.uxd", path)
+
+    with pytest.raises(StructuredError, match=r"not in the \.ras format.*\.uxd file of manufacturer 'bruker'"):
+        ReaderRegistry.detect_format(path, "rigaku")
+
+
+def test_unknown_contents_are_rejected(tmp_path):
+    path = tmp_path / "sample.ras"
+    path.write_bytes(bytes(range(256)) * 4)
+
+    with pytest.raises(StructuredError, match="not in the .ras format"):
+        ReaderRegistry.detect_format(path, "rigaku")
+
+
+def test_rasx_is_detected_without_opening_the_archive(tmp_path, monkeypatch):
+    path = tmp_path / "sample.ras"
+    shutil.copy(INPUTS_DIR / "one_region.rasx", path)
+
+    def open_zip(*_args, **_kwargs):
+        err_msg = "the archive is opened"
+        raise AssertionError(err_msg)
+
+    monkeypatch.setattr(zipfile, "ZipFile", open_zip)
+
+    assert ReaderRegistry.detect_format(path, "rigaku") == ".rasx"
+
+
+def test_zip_without_root_xml_is_rejected_by_the_rasx_reader(tmp_path, run_structuring):
+    path = tmp_path / "sample.rasx"
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.writestr("Data0/Profile0.txt", "10.0\t1\t1\n")
+
+    _, status = run_structuring([path])
+
+    assert status["status"] == "failed"
+    assert "invalid configuration" in status["error_message"]
+
+
+def test_misnamed_rasx_is_structured_like_the_original(tmp_path, run_structuring):
+    path = tmp_path / "one_region.ras"
+    shutil.copy(INPUTS_DIR / "one_region.rasx", path)
+
+    data_dir, status = run_structuring([path])
+
+    assert status["status"] == "success", status
+    assert (data_dir / "structured" / "one_region.csv").read_bytes() == expected_csv("one_region.rasx", "one_region.csv")
+
+
+@pytest.mark.parametrize("encoding", ["utf_8", "cp932", "euc_jp"])
+def test_txt_with_only_japanese_header_keys_is_detected(tmp_path, encoding):
+    data_lines = (INPUTS_DIR / "space.txt").read_text(encoding="utf-8").splitlines()[4:]
+    path = tmp_path / "sample.txt"
+    path.write_bytes("\n".join(["入射スリット 1/2", "受光スリット1 8.0", "受光スリット2 0.3", *data_lines]).encode(encoding))
+
+    assert is_rigaku_txt(FileReader.read_head(path), path)
+    assert ReaderRegistry.detect_format(path, "rigaku") == ".txt"
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+from modules_xrd.graph_handler import GraphPlotter
+from modules_xrd.output_naming import OutputNames
+from modules_xrd.scale_type import ScaleType
+
+
+def make_resource_paths(tmp_path: Path) -> SimpleNamespace:
+    dirs = {name: tmp_path / name for name in ("struct", "main_image", "other_image")}
+    for path in dirs.values():
+        path.mkdir()
+    return SimpleNamespace(**dirs)
+
+
+def make_data(n: int, *, offset: float = 0.0) -> pd.DataFrame:
+    x = np.linspace(10, 80, n)
+    y = 100 + 1000 * np.exp(-((x - 30 - offset) / 0.05) ** 2) + np.sin(x * 50)
+    return pd.DataFrame({"2Theta (deg)": x, "Intensity (cps)": y})
+
+
+def test_multiplot_keeps_only_the_points_drawn(tmp_path):
+    OutputNames.clear()
+    resource_paths = make_resource_paths(tmp_path)
+    plotter = GraphPlotter(ScaleType.linear, ScaleType.log, render_workers=1)
+    datasets = [make_data(100_000), make_data(100_000, offset=5)]
+
+    for region_index, data in enumerate(datasets, 1):
+        plotter.plot_main(data, resource_paths, Path("sample.ras"), 2, region_index=region_index)
+    plotter.multiplot_main(resource_paths, Path("sample.ras"))
+    plotter.wait()
+
+    assert (resource_paths.main_image / "sample.png").is_file()
+    for stored, data in zip(plotter.multi_df, datasets, strict=True):
+        assert len(stored) <= 2 * plotter._pixel_columns() + 2
+        assert list(stored.columns) == list(data.columns)
+        # The peaks survive the reduction.
+        assert stored.iloc[:, 1].max() == data.iloc[:, 1].max()
+
+
+def test_images_of_every_scale_are_saved_from_one_drawing(tmp_path, monkeypatch):
+    OutputNames.clear()
+    resource_paths = make_resource_paths(tmp_path)
+    plotter = GraphPlotter(ScaleType.linear, ScaleType.log, render_workers=1)
+    draw = plotter._draw
+    drawn = []
+    monkeypatch.setattr(plotter, "_draw", lambda *args, **kwargs: drawn.append(draw(*args, **kwargs)) or drawn[-1])
+
+    plotter.plot_main(make_data(1000), resource_paths, Path("sample.ras"), 1)
+    plotter.wait()
+
+    assert len(drawn) == 1
+    assert {path.name for path in resource_paths.main_image.iterdir()} == {"sample.png"}
+    assert {path.name for path in resource_paths.other_image.iterdir()} == {"sample_log.png"}
+
+
+def test_render_workers_are_given_arrays_and_save_the_same_images(tmp_path, monkeypatch):
+    """With several workers the tasks get the reduced arrays (no data frame) and save what one thread saves."""
+    monkeypatch.setattr("os.cpu_count", lambda: 2)
+    outputs = {}
+    for workers in (1, 2):
+        OutputNames.clear()
+        (tmp_path / str(workers)).mkdir()
+        resource_paths = make_resource_paths(tmp_path / str(workers))
+        plotter = GraphPlotter(ScaleType.linear, ScaleType.log, render_workers=workers)
+        submit = plotter._submit
+        submitted = []
+        monkeypatch.setattr(plotter, "_submit", lambda task, *args, submit=submit, submitted=submitted, **kwargs: submitted.append(args) or submit(task, *args, **kwargs))
+
+        for region_index in (1, 2):
+            plotter.plot_main(make_data(50_000, offset=region_index), resource_paths, Path("sample.ras"), 2, region_index=region_index)
+        plotter.multiplot_main(resource_paths, Path("sample.ras"))
+        plotter.wait()
+
+        assert not any(isinstance(arg, pd.DataFrame) or (isinstance(arg, list) and any(isinstance(item, pd.DataFrame) for item in arg)) for args in submitted for arg in args)
+        outputs[workers] = {path.relative_to(resource_paths.struct.parent): path.read_bytes() for path in resource_paths.struct.parent.rglob("*.png")}
+
+    assert outputs[1] == outputs[2]
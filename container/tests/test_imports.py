@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import re
+import subprocess
+import sys
+
+from modules_xrd.models import ScaleType
+from modules_xrd.scale_type import ScaleType as LightScaleType
+from tests.conftest import TESTS_DIR
+
+# Packages every run imports anyway (rdetoolkit itself imports numpy and pandas); their import time is not counted.
+REQUIRED_PACKAGES = {"rdetoolkit", "pandas", "numpy", "yaml"}
+
+# Packages that must be imported only when a file needs them.
+DEFERRED_PACKAGES = {"matplotlib", "plotly", "pydantic_xml"}
+
+# Budget of the import time of modules_xrd.factory outside REQUIRED_PACKAGES, in microseconds.
+# It was about 420 ms when matplotlib and the rasx models were imported at startup and is about 20 ms without them.
+STARTUP_BUDGET_US = 150_000
+
+
+def import_times(module: str) -> list[tuple[int, str, int]]:
+    """Import a module in a new interpreter with -X importtime and get the indent, name and self time (us) of each import."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], cwd=TESTS_DIR.parent, capture_output=True, text=True, check=True)
+    return [(len(m[2]), m[3], int(m[1])) for m in re.finditer(r"^import time:\s+(\d+) \|\s+\d+ \|( *)(\S+)$", result.stderr, re.MULTILINE)]
+
+
+def own_import_time(entries: list[tuple[int, str, int]], module: str) -> int:
+    """Sum the self time of the imports under module, leaving out the subtrees of REQUIRED_PACKAGES.
+
+    -X importtime lists an import after those it caused, indented one level less, so the entries are walked backwards.
+    """
+    start = max(i for i, (_, name, _) in enumerate(entries) if name == module)
+    stack: list[tuple[int, bool]] = []
+    total = 0
+    for indent, name, self_us in reversed(entries[:start + 1]):
+        if stack and indent <= entries[start][0]:
+            break
+        while stack and stack[-1][0] >= indent:
+            stack.pop()
+        excluded = bool(stack and stack[-1][1]) or name.partition(".")[0] in REQUIRED_PACKAGES
+        stack.append((indent, excluded))
+        if not excluded:
+            total += self_us
+    return total
+
+
+def test_factory_does_not_import_the_rasx_models():
+    code = "import sys, modules_xrd.factory; print(sorted(name for name in sys.modules if name.split('.')[0] == 'pydantic_xml'))"
+
+    result = subprocess.run([sys.executable, "-c", code], cwd=TESTS_DIR.parent, capture_output=True, text=True, check=True)
+
+    assert result.stdout.strip() == "[]"
+
+
+def test_factory_import_time_is_within_budget():
+    entries = import_times("modules_xrd.factory")
+
+    assert not {name.partition(".")[0] for _, name, _ in entries} & DEFERRED_PACKAGES
+    assert own_import_time(entries, "modules_xrd.factory") < STARTUP_BUDGET_US
+
+
+def test_scale_type_is_still_imported_from_models():
+    assert ScaleType is LightScaleType
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import logging
+import shutil
+from pathlib import Path
+
+import pytest
+from rdetoolkit.exceptions import StructuredError
+
+from modules_xrd.output_naming import OutputNames, region_filepath
+from modules_xrd.structured_handler import StructuredDataProcessor
+from tests.conftest import INPUTS_DIR
+
+
+@pytest.fixture(autouse=True)
+def clear_output_names():
+    OutputNames.clear()
+    yield
+    OutputNames.clear()
+
+
+def test_region_filepath():
+    assert region_filepath(Path("out/a.csv"), 1) == Path("out/a.csv")
+    assert region_filepath(Path("out/a.png"), 3, region_index=2, scale_suffix="_log") == Path("out/a_2_log.png")
+    with pytest.raises(StructuredError, match="illegal region number"):
+        region_filepath(Path("out/a.csv"), 2, region_index=3)
+
+
+def test_path_of_another_input_is_a_collision(tmp_path):
+    OutputNames.set_owner(Path("a.ras"))
+    OutputNames.claim(tmp_path / "a.csv", policy="error")
+    OutputNames.claim(tmp_path / "a.csv", policy="error")
+
+    OutputNames.set_owner(Path("a.txt"))
+    with pytest.raises(StructuredError, match=r"a\.csv is written by more than one input file \(a\.ras, a\.txt\)"):
+        OutputNames.claim(tmp_path / "a.csv", policy="error")
+
+
+def test_outputs_of_an_input_are_the_paths_it_claimed(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    OutputNames.set_owner(Path("a.ras"))
+    OutputNames.claim(tmp_path / "a.csv")
+    OutputNames.claim(tmp_path / "a_b.csv")
+    OutputNames.set_owner(Path("a_b.ras"))
+    OutputNames.claim(tmp_path / "a_b.csv")
+    OutputNames.claim(tmp_path / "a_b_1.csv")
+
+    assert OutputNames.outputs_of(Path("a.ras")) == [tmp_path / "a.csv"]
+    assert OutputNames.outputs_of(Path("a_b.ras")) == [tmp_path / "a_b.csv", tmp_path / "a_b_1.csv"]
+    assert OutputNames.outputs_of(Path("c.ras")) == []
+
+
+def test_overwrite_collision_is_logged(tmp_path, caplog, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    OutputNames.set_owner(Path("a.ras"))
+    OutputNames.claim(tmp_path / "a.csv", policy="overwrite")
+    OutputNames.set_owner(Path("a.txt"))
+
+    with caplog.at_level(logging.WARNING):
+        assert OutputNames.claim(tmp_path / "a.csv", policy="overwrite") == tmp_path / "a.csv"
+
+    assert "a.csv of a.txt overwrites that of a.ras" in caplog.text
+
+
+def batch_with_same_basename(tmp_path: Path) -> list[Path]:
+    """Make a ras and a rasx input sharing a basename."""
+    inputs = [tmp_path / "sample.ras", tmp_path / "sample.rasx"]
+    shutil.copy(INPUTS_DIR / "two_regions.ras", inputs[0])
+    shutil.copy(INPUTS_DIR / "two_regions.rasx", inputs[1])
+    return inputs
+
+
+def test_error_policy_stops_a_batch_writing_a_name_twice(tmp_path, run_structuring):
+    _, status = run_structuring(batch_with_same_basename(tmp_path), settings={"batch_mode": True, "output_name_collision": "error"})
+
+    assert status["status"] == "failed"
+    assert "Output file name collision: sample_1.csv" in status["error_message"]
+
+
+def test_overwrite_policy_keeps_the_later_output_and_warns(tmp_path, run_structuring, caplog):
+    with caplog.at_level(logging.WARNING):
+        data_dir, status = run_structuring(batch_with_same_basename(tmp_path), settings={"batch_mode": True})
+
+    assert status["status"] == "success", status
+    assert "sample_1.csv of sample.ras overwrites that of sample.rasx" in caplog.text
+    assert (data_dir / "structured" / "sample_1.csv").read_bytes() == (INPUTS_DIR.parent / "expected" / "two_regions.ras" / "two_regions_1.csv").read_bytes()
+
+
+def test_error_policy_covers_extracted_rasx_files(tmp_path):
+    resource_paths = type("ResourcePaths", (), {"struct": tmp_path})()
+    processor = StructuredDataProcessor(collision_policy="error")
+    OutputNames.set_owner(Path("other.rasx"))
+    OutputNames.claim(tmp_path / "Profile0.txt")
+
+    OutputNames.set_owner(INPUTS_DIR / "one_region.rasx")
+    with pytest.raises(StructuredError, match="Profile0.txt is written by more than one input file"):
+        processor.save_structured_contents(resource_paths, INPUTS_DIR / "one_region.rasx", ["Data0/Profile0.txt"])
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import pytest
+
+from tests.conftest import EXPECTED_DIR
+
+INPUTS = [
+    ("one_region.ras", "rigaku"),
+    ("two_regions.ras", "rigaku"),
+    ("one_region.rasx", "rigaku"),
+    ("two_regions.rasx", "rigaku"),
+    ("attenuated.ras", "rigaku"),
+    ("attenuated.rasx", "rigaku"),
+    ("tab.txt", "rigaku"),
+    ("space.txt", "rigaku"),
+    ("sample.uxd", "bruker"),
+]
+
+
+def expected_csv(name: str, csv_name: str) -> bytes:
+    """Get the csv written by the original implementation (tests/data/expected)."""
+    return (EXPECTED_DIR / name / csv_name).read_bytes()
+
+
+@pytest.mark.parametrize(("name", "manufacturer"), INPUTS)
+def test_csv_matches_baseline(run_structuring, name, manufacturer):
+    """The structured csv files are byte-identical to those written by the original implementation."""
+    data_dir, status = run_structuring([name], manufacturer=manufacturer)
+
+    assert status["status"] == "success", status
+    expected = sorted((EXPECTED_DIR / name).iterdir())
+    assert sorted(path.name for path in (data_dir / "structured").glob("*.csv")) == [path.name for path in expected]
+    for path in expected:
+        assert (data_dir / "structured" / path.name).read_bytes() == expected_csv(name, path.name), path.name
+
+
+@pytest.mark.parametrize(("name", "manufacturer"), INPUTS)
+def test_images_and_metadata_are_written(run_structuring, name, manufacturer):
+    data_dir, status = run_structuring([name], manufacturer=manufacturer)
+
+    assert status["status"] == "success", status
+    assert list((data_dir / "main_image").glob("*.png"))
+    assert (data_dir / "meta" / "metadata.json").is_file()
+
+
+def test_batch_mode_processes_every_file(run_structuring):
+    data_dir, status = run_structuring(["one_region.ras", "two_regions.rasx", "tab.txt"], settings={"batch_mode": True})
+
+    assert status["status"] == "success", status
+    csv_names = {path.name for path in (data_dir / "structured").glob("*.csv")}
+    assert csv_names == {"one_region.csv", "two_regions_1.csv", "two_regions_2.csv", "tab.csv"}
+    for name, csv_name in [("one_region.ras", "one_region.csv"), ("two_regions.rasx", "two_regions_2.csv"), ("tab.txt", "tab.csv")]:
+        assert (data_dir / "structured" / csv_name).read_bytes() == expected_csv(name, csv_name)
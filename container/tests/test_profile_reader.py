@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+from rdetoolkit.exceptions import StructuredError
+
+from modules_xrd.rigaku.rasx import profile_handler
+from modules_xrd.rigaku.rasx.profile_handler import read_profile
+
+PROFILE = "".join(f"{10 + k * 0.02:.4f}\t{k * 7 % 50}\t{1 + k % 3}\r\n" for k in range(100)).encode()
+
+
+@pytest.mark.parametrize("data_count", [None, 100, 10, 1000])
+def test_profile_is_read_like_read_csv(monkeypatch, data_count):
+    monkeypatch.setattr(profile_handler, "CHUNK_ROWS", 7)
+    expected = pd.read_csv(io.BytesIO(PROFILE), sep="\t", header=None)
+
+    angle, intensity = read_profile(io.BytesIO(PROFILE), data_count=data_count)
+
+    np.testing.assert_array_equal(angle, expected[0].to_numpy())
+    np.testing.assert_array_equal(intensity, (expected[1] * expected[2]).to_numpy())
+    assert (angle.dtype, intensity.dtype) == (np.float64, np.int64)
+
+
+def test_float_attenuation_gives_float_intensity():
+    angle, intensity = read_profile(io.BytesIO(b"1\t10\t1.5\n2\t20\t1\n"))
+
+    assert angle.dtype == np.int64
+    assert intensity.tolist() == [15.0, 20.0]
+
+
+@pytest.mark.parametrize("contents", [b"1.0\t10\n", b"1.0\tabc\t1\n"])
+def test_non_numeric_profile_is_rejected(contents):
+    with pytest.raises(StructuredError, match="Profile\\*.txt needs numeric"):
+        read_profile(io.BytesIO(contents))
+
+
+def test_data_count_larger_than_the_profile_is_not_allocated():
+    """An overstated DataCount allocates at most MAX_INITIAL_CAPACITY points and the arrays are trimmed to the lines read."""
+    angle, intensity = read_profile(io.BytesIO(PROFILE), data_count=10**12)
+
+    assert len(angle) == len(intensity) == 100
+    assert angle.base is None
+    assert intensity.base is None
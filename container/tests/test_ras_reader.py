@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import io
+
+import pytest
+from rdetoolkit.exceptions import StructuredError
+from rdetoolkit.rde2util import CharDecEncoding
+
+from modules_xrd.rigaku.ras.inputfile_handler import FileReader
+from modules_xrd.rigaku.txt.inputfile_handler import FileReader as TxtFileReader
+from tests.conftest import INPUTS_DIR
+
+CONFIG = {"xrd": {"meas_scan_axis_x": None, "meas_scan_unit_x": None, "meas_scan_axis_y": None, "meas_scan_unit_y": None}}
+
+HEADER = ["*RAS_HEADER_START", '*MEAS_SCAN_AXIS_X "TwoThetaTheta"', "*RAS_HEADER_END"]
+DATA = ["*RAS_INT_START", "10.0 1.0 1.0", "10.1 2.0 1.0", "*RAS_INT_END"]
+
+
+def scan(lines: list[str]) -> list[tuple[list[str], list[str]]]:
+    return list(FileReader(CONFIG).scan_regions(io.StringIO("\n".join(lines))))
+
+
+def test_regions_pair_each_header_with_the_following_data():
+    regions = scan(["*RAS_DATA_START", *HEADER, *DATA, *HEADER, *DATA, "*RAS_DATA_END"])
+
+    assert len(regions) == 2
+    assert regions[0] == (['*MEAS_SCAN_AXIS_X "TwoThetaTheta"'], ["10.0 1.0 1.0", "10.1 2.0 1.0"])
+
+
+@pytest.mark.parametrize(
+    ("lines", "message"),
+    [
+        ([*DATA], "RAS_INT_START appears without"),
+        ([*HEADER, *HEADER, *DATA], "RAS_HEADER_START appears twice"),
+        ([*HEADER, *DATA, *DATA], "RAS_INT_START appears without"),
+        ([*HEADER, *DATA[:-1]], "data block is not closed"),
+        (HEADER[:-1], "header block is not closed"),
+    ],
+)
+def test_unpaired_blocks_are_rejected(lines, message):
+    with pytest.raises(StructuredError, match=message):
+        scan(lines)
+
+
+def test_non_numeric_values_are_rejected():
+    with pytest.raises(StructuredError, match="Failed to convert measured values"):
+        FileReader(CONFIG).parse_numeric_block(["10.0 abc 1.0"])
+
+
+def test_regions_are_counted_without_reading_the_values():
+    assert FileReader(CONFIG).count_regions(INPUTS_DIR / "two_regions.ras") == 2
+
+
+def test_region_counts_are_kept_by_each_reader(tmp_path, monkeypatch):
+    """A reader counts the regions of a file once; another reader (or a changed file) is counted again."""
+    counted = []
+    count_regions = FileReader.count_regions
+    monkeypatch.setattr(FileReader, "count_regions", lambda self, srcpath: counted.append(srcpath) or count_regions(self, srcpath))
+    path = tmp_path / "sample.ras"
+    path.write_bytes((INPUTS_DIR / "two_regions.ras").read_bytes())
+    reader = FileReader(CONFIG)
+
+    assert [reader.get_region_number(input_path=path) for _ in range(2)] == [2, 2]
+    assert FileReader(CONFIG).get_region_number(input_path=path) == 2
+    path.write_bytes((INPUTS_DIR / "one_region.ras").read_bytes())
+    assert reader.get_region_number(input_path=path) == 1
+    assert len(counted) == 3
+
+
+def test_txt_regions_are_not_counted_without_a_delimiter():
+    with pytest.raises(StructuredError, match="delimiter_type is not set"):
+        TxtFileReader({"xrd": {}}).count_regions(INPUTS_DIR / "tab.txt")
+
+
+def test_rasx_regions_pair_profiles_with_their_conditions(run_structuring):
+    data_dir, status = run_structuring(["two_regions.rasx"])
+
+    assert status["status"] == "success", status
+    metadata = (data_dir / "meta" / "metadata.json").read_text(encoding="utf-8")
+    # The sample names of the two Data folders stay with their regions.
+    assert metadata.index('"S0"') < metadata.index('"S1"')
+
+
+def test_encoding_is_decided_from_the_leading_bytes(monkeypatch):
+    def detect_whole_file(_path):
+        err_msg = "the whole file is read"
+        raise AssertionError(err_msg)
+
+    monkeypatch.setattr(CharDecEncoding, "detect_text_file_encoding", detect_whole_file)
+
+    regions = list(FileReader(CONFIG).read(INPUTS_DIR / "two_regions.ras"))
+
+    assert len(regions) == 2
+
+
+def test_characters_past_the_leading_bytes_are_decoded(tmp_path, monkeypatch):
+    monkeypatch.setattr(FileReader, "SNIFF_SIZE", 256)
+    comment = "酸化チタン粉末試料を大気中で測定した。"
+    contents = (INPUTS_DIR / "two_regions.ras").read_text(encoding="utf-8")
+    before, _, after = contents.rpartition('*FILE_COMMENT "hello"')
+    path = tmp_path / "sample.ras"
+    path.write_bytes(f'{before}*FILE_COMMENT "{comment}"{after}'.encode("cp932"))
+
+    regions = list(FileReader(CONFIG).read(path))
+    original = list(FileReader(CONFIG).read(INPUTS_DIR / "two_regions.ras"))
+
+    assert [meta for _, meta in regions][1] == [line.replace("hello", comment) for line in original[1][1]]
+    for (data, _), (original_data, _) in zip(regions, original, strict=True):
+        assert data.equals(original_data)
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+import copy
+import zipfile
+
+import pytest
+
+from modules_xrd.rigaku.rasx.conditions_handler import parse_measurement_conditions
+from modules_xrd.rigaku.rasx.meta_handler import MetaParser
+from tests.conftest import INPUTS_DIR, TEMPLATE_DIR
+
+METADATA_DEF = TEMPLATE_DIR / "rigaku" / "tasksupport" / "metadata-def_rigaku_rasx.json"
+
+
+def read_conditions(name: str) -> list[dict]:
+    with zipfile.ZipFile(INPUTS_DIR / name) as archive:
+        return [parse_measurement_conditions(archive.read(member)) for member in archive.namelist() if "MesurementConditions" in member]
+
+
+def without_optics(conditions: dict) -> dict:
+    conditions = copy.deepcopy(conditions)
+    conditions["hwconfigurations"]["optics"] = ""
+    return conditions
+
+
+@pytest.mark.parametrize("name", ["one_region.rasx", "two_regions.rasx"])
+@pytest.mark.parametrize("change", [lambda conditions: conditions, without_optics])
+def test_key_paths_collect_what_the_recursive_search_collects(name, change):
+    parser = MetaParser(metadata_def_json_path=METADATA_DEF, config={})
+    recursive_parser = MetaParser(metadata_def_json_path=METADATA_DEF, config={})
+
+    for conditions in map(change, read_conditions(name)):
+        parser.parse(conditions)
+        recursive_parser._MetaParser__recuresive_search_dict(conditions)
+
+    assert parser.const_meta_info == recursive_parser.const_meta_info
+    assert parser.repeated_meta_info == recursive_parser.repeated_meta_info
+    assert parser.repeated_meta_info["rasx.specimen"]